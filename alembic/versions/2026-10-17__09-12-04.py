@@ -0,0 +1,30 @@
+"""index user_sessions by user_id and expire_at
+
+Revision ID: cee655b6b027
+Revises: 6d4f997c7180
+Create Date: 2026-10-17 09:12:04.318207
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'cee655b6b027'
+down_revision: Union[str, None] = '6d4f997c7180'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # --- CONCURRENTLY cannot run inside a transaction
+    with op.get_context().autocommit_block():
+        op.create_index('ix_user_sessions_user_id_expire_at', 'user_sessions', ['user_id', 'expire_at'], unique=False, postgresql_concurrently=True, if_not_exists=True)
+        op.create_index('ix_user_sessions_expire_at', 'user_sessions', ['expire_at'], unique=False, postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_user_sessions_expire_at', table_name='user_sessions', postgresql_concurrently=True, if_exists=True)
+        op.drop_index('ix_user_sessions_user_id_expire_at', table_name='user_sessions', postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,41 @@
+"""email outbox
+
+Revision ID: 8fd9ccc17ee3
+Revises: cee655b6b027
+Create Date: 2026-10-17 11:40:27.604113
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8fd9ccc17ee3'
+down_revision: Union[str, None] = 'cee655b6b027'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('email_outbox',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('recipient', sa.String(), nullable=False),
+    sa.Column('subject', sa.String(), nullable=False),
+    sa.Column('message', sa.String(), nullable=False),
+    sa.Column('status', sa.String(), nullable=False),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('next_attempt_at', sa.DateTime(), nullable=False),
+    sa.Column('last_error', sa.String(), nullable=True),
+    sa.Column('provider_message_id', sa.String(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('sent_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_email_outbox_status_next_attempt_at', 'email_outbox', ['status', 'next_attempt_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_email_outbox_status_next_attempt_at', table_name='email_outbox')
+    op.drop_table('email_outbox')
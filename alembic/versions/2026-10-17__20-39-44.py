@@ -0,0 +1,64 @@
+"""index hot filter columns and association foreign keys
+
+Revision ID: 157485a69219
+Revises: 8fd9ccc17ee3
+Create Date: 2026-10-17 20:39:44.064053
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '157485a69219'
+down_revision: Union[str, None] = '8fd9ccc17ee3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = [
+    ('ix_attendances_school_id_date', 'attendances', ['school_id', 'date'], False),
+    ('ix_attendances_classroom_id_date', 'attendances', ['classroom_id', 'date'], False),
+    ('uq_attendances_student_id_date', 'attendances', ['student_id', 'date'], True),
+    ('ix_exam_results_exam_id_class_room_id', 'exam_results', ['exam_id', 'class_room_id'], False),
+    ('ix_payments_school_id_date', 'payments', ['school_id', 'date'], False),
+    ('ix_time_slots_timetable_id_day_of_week', 'time_slots', ['timetable_id', 'day_of_week'], False),
+    ('ix_students_classroom_id', 'students', ['classroom_id'], False),
+    # --- association tables, the first primary key column is already covered by the primary key
+    ('ix_user_permission_associations_user_permission_id', 'user_permission_associations', ['user_permission_id'], False),
+    ('ix_user_permission_associations_school_id', 'user_permission_associations', ['school_id'], False),
+    ('ix_role_permission_associations_user_permission_id', 'role_permission_associations', ['user_permission_id'], False),
+    ('ix_user_role_associations_role_id', 'user_role_associations', ['role_id'], False),
+    ('ix_user_role_associations_school_id', 'user_role_associations', ['school_id'], False),
+    ('ix_school_parent_associations_parent_id', 'school_parent_associations', ['parent_id'], False),
+    ('ix_school_student_associations_student_id', 'school_student_associations', ['student_id'], False),
+    ('ix_payment_user_associations_user_id', 'payment_user_associations', ['user_id'], False),
+    ('ix_module_enrollments_module_id', 'module_enrollments', ['module_id'], False),
+    ('ix_teacher_module_association_module_id', 'teacher_module_association', ['module_id'], False),
+    ('ix_class_teacher_associations_classroom_id', 'class_teacher_associations', ['classroom_id'], False),
+    ('ix_parent_student_associations_student_id', 'parent_student_associations', ['student_id'], False),
+]
+
+
+def upgrade() -> None:
+    # --- keep the most recently written attendance of every (student_id, date) pair
+    op.execute("""
+        DELETE FROM attendances AS duplicate
+        USING attendances AS kept
+        WHERE duplicate.student_id = kept.student_id
+          AND duplicate.date = kept.date
+          AND (COALESCE(duplicate.updated_at, duplicate.created_at), duplicate.id)
+            < (COALESCE(kept.updated_at, kept.created_at), kept.id)
+    """)
+
+    # --- CONCURRENTLY cannot run inside a transaction. A failed concurrent build
+    # --- leaves an INVALID index behind, drop it before re-running the upgrade.
+    with op.get_context().autocommit_block():
+        for name, table, columns, unique in INDEXES:
+            op.create_index(name, table, columns, unique=unique, postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, _, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,63 @@
+"""attendance daily rollups
+
+Revision ID: f466a42fad16
+Revises: 157485a69219
+Create Date: 2026-10-17 20:58:49.784083
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f466a42fad16'
+down_revision: Union[str, None] = '157485a69219'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('attendance_daily_rollups',
+    sa.Column('school_id', sa.UUID(), nullable=False),
+    sa.Column('classroom_id', sa.UUID(), nullable=False),
+    sa.Column('date', sa.Date(), nullable=False),
+    sa.Column('present_total', sa.Integer(), nullable=False),
+    sa.Column('present_male', sa.Integer(), nullable=False),
+    sa.Column('present_female', sa.Integer(), nullable=False),
+    sa.Column('absent_total', sa.Integer(), nullable=False),
+    sa.Column('absent_male', sa.Integer(), nullable=False),
+    sa.Column('absent_female', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['classroom_id'], ['classrooms.id'], ),
+    sa.ForeignKeyConstraint(['school_id'], ['schools.id'], ),
+    sa.PrimaryKeyConstraint('school_id', 'classroom_id', 'date')
+    )
+    op.create_index('ix_attendance_daily_rollups_school_id_date', 'attendance_daily_rollups', ['school_id', 'date'], unique=False)
+
+    # --- backfill, same aggregation as rebuild_attendance_rollups
+    op.execute("""
+        INSERT INTO attendance_daily_rollups (
+            school_id, classroom_id, date,
+            present_total, present_male, present_female,
+            absent_total, absent_male, absent_female
+        )
+        SELECT
+            attendances.school_id,
+            attendances.classroom_id,
+            CAST(attendances.date AS DATE),
+            count(*) FILTER (WHERE attendances.status = 'present'),
+            count(*) FILTER (WHERE attendances.status = 'present' AND students.gender = 'male'),
+            count(*) FILTER (WHERE attendances.status = 'present' AND students.gender = 'female'),
+            count(*) FILTER (WHERE attendances.status = 'absent'),
+            count(*) FILTER (WHERE attendances.status = 'absent' AND students.gender = 'male'),
+            count(*) FILTER (WHERE attendances.status = 'absent' AND students.gender = 'female')
+        FROM attendances
+        JOIN students ON students.id = attendances.student_id
+        GROUP BY attendances.school_id, attendances.classroom_id, CAST(attendances.date AS DATE)
+    """)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_attendance_daily_rollups_school_id_date', table_name='attendance_daily_rollups')
+    op.drop_table('attendance_daily_rollups')
@@ -0,0 +1,109 @@
+"""attendance term bitmaps
+
+Revision ID: 73c827eb41b9
+Revises: f466a42fad16
+Create Date: 2026-10-17 21:11:33.412907
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '73c827eb41b9'
+down_revision: Union[str, None] = 'f466a42fad16'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('attendance_term_bitmaps',
+    sa.Column('student_id', sa.UUID(), nullable=False),
+    sa.Column('academic_term_id', sa.UUID(), nullable=False),
+    sa.Column('school_id', sa.UUID(), nullable=False),
+    sa.Column('classroom_id', sa.UUID(), nullable=False),
+    sa.Column('present_days', sa.LargeBinary(), nullable=False),
+    sa.Column('absent_days', sa.LargeBinary(), nullable=False),
+    sa.ForeignKeyConstraint(['academic_term_id'], ['academic_terms.id'], ),
+    sa.ForeignKeyConstraint(['classroom_id'], ['classrooms.id'], ),
+    sa.ForeignKeyConstraint(['school_id'], ['schools.id'], ),
+    sa.ForeignKeyConstraint(['student_id'], ['students.id'], ),
+    sa.PrimaryKeyConstraint('student_id', 'academic_term_id')
+    )
+    op.create_index('ix_attendance_term_bitmaps_school_id_academic_term_id', 'attendance_term_bitmaps', ['school_id', 'academic_term_id'], unique=False)
+
+    # --- backfill, same query as rebuild_attendance_bitmaps
+    op.execute("""
+    WITH marks AS (
+        SELECT
+            attendances.student_id,
+            attendances.academic_term_id,
+            attendances.school_id,
+            attendances.classroom_id,
+            attendances.date,
+            attendances.status,
+            CAST(attendances.date AS DATE) - CAST(academic_terms.start_date AS DATE) AS day
+        FROM attendances
+        JOIN academic_terms ON academic_terms.id = attendances.academic_term_id
+        WHERE CAST(attendances.date AS DATE) >= CAST(academic_terms.start_date AS DATE)
+    ),
+    bitmap_bytes AS (
+        SELECT
+            student_id,
+            academic_term_id,
+            day / 8 AS byte_index,
+            bit_or(1 << (day % 8)) FILTER (WHERE status = 'present') AS present_byte,
+            bit_or(1 << (day % 8)) FILTER (WHERE status = 'absent') AS absent_byte
+        FROM marks
+        GROUP BY student_id, academic_term_id, day / 8
+    ),
+    bitmap_sizes AS (
+        SELECT student_id, academic_term_id, max(byte_index) AS last_byte
+        FROM bitmap_bytes
+        GROUP BY student_id, academic_term_id
+    ),
+    latest AS (
+        SELECT DISTINCT ON (student_id, academic_term_id)
+            student_id, academic_term_id, school_id, classroom_id
+        FROM marks
+        ORDER BY student_id, academic_term_id, date DESC
+    )
+    INSERT INTO attendance_term_bitmaps (
+        student_id, academic_term_id, school_id, classroom_id,
+        present_days, absent_days
+    )
+    SELECT
+        latest.student_id,
+        latest.academic_term_id,
+        latest.school_id,
+        latest.classroom_id,
+        decode(string_agg(
+            lpad(to_hex(COALESCE(bitmap_bytes.present_byte, 0)), 2, '0'),
+            '' ORDER BY byte_index.i
+        ), 'hex'),
+        decode(string_agg(
+            lpad(to_hex(COALESCE(bitmap_bytes.absent_byte, 0)), 2, '0'),
+            '' ORDER BY byte_index.i
+        ), 'hex')
+    FROM latest
+    JOIN bitmap_sizes
+        ON bitmap_sizes.student_id = latest.student_id
+        AND bitmap_sizes.academic_term_id = latest.academic_term_id
+    CROSS JOIN LATERAL generate_series(0, bitmap_sizes.last_byte) AS byte_index(i)
+    LEFT JOIN bitmap_bytes
+        ON bitmap_bytes.student_id = latest.student_id
+        AND bitmap_bytes.academic_term_id = latest.academic_term_id
+        AND bitmap_bytes.byte_index = byte_index.i
+    GROUP BY
+        latest.student_id,
+        latest.academic_term_id,
+        latest.school_id,
+        latest.classroom_id
+    """)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_attendance_term_bitmaps_school_id_academic_term_id', table_name='attendance_term_bitmaps')
+    op.drop_table('attendance_term_bitmaps')
@@ -0,0 +1,70 @@
+"""attendance sync
+
+Revision ID: db80b386cbc5
+Revises: 73c827eb41b9
+Create Date: 2026-10-17 21:17:47.206519
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'db80b386cbc5'
+down_revision: Union[str, None] = '73c827eb41b9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('attendances', sa.Column('recorded_at', sa.DateTime(), nullable=True))
+    op.add_column('attendances', sa.Column('sync_txid', sa.BigInteger(), nullable=True))
+    op.execute("""
+        UPDATE attendances
+        SET recorded_at = COALESCE(updated_at, created_at),
+            sync_txid = txid_current()
+    """)
+    op.alter_column('attendances', 'recorded_at', nullable=False)
+    op.alter_column('attendances', 'sync_txid', nullable=False)
+    op.create_index('ix_attendances_classroom_id_sync_txid', 'attendances', ['classroom_id', 'sync_txid'], unique=False)
+
+    op.create_table('attendance_deletions',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('attendance_id', sa.UUID(), nullable=True),
+    sa.Column('date', sa.DateTime(), nullable=False),
+    sa.Column('recorded_at', sa.DateTime(), nullable=False),
+    sa.Column('sync_txid', sa.BigInteger(), nullable=False),
+    sa.Column('student_id', sa.UUID(), nullable=False),
+    sa.Column('school_id', sa.UUID(), nullable=False),
+    sa.Column('classroom_id', sa.UUID(), nullable=False),
+    sa.ForeignKeyConstraint(['classroom_id'], ['classrooms.id'], ),
+    sa.ForeignKeyConstraint(['school_id'], ['schools.id'], ),
+    sa.ForeignKeyConstraint(['student_id'], ['students.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_attendance_deletions_classroom_id_sync_txid', 'attendance_deletions', ['classroom_id', 'sync_txid'], unique=False)
+    op.create_index('ix_attendance_deletions_student_id_date', 'attendance_deletions', ['student_id', 'date'], unique=False)
+
+    op.create_table('attendance_sync_receipts',
+    sa.Column('school_id', sa.UUID(), nullable=False),
+    sa.Column('idempotency_key', sa.String(), nullable=False),
+    sa.Column('outcome', sa.String(), nullable=True),
+    sa.Column('attendance_id', sa.UUID(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['school_id'], ['schools.id'], ),
+    sa.PrimaryKeyConstraint('school_id', 'idempotency_key')
+    )
+    op.create_index('ix_attendance_sync_receipts_created_at', 'attendance_sync_receipts', ['created_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_attendance_sync_receipts_created_at', table_name='attendance_sync_receipts')
+    op.drop_table('attendance_sync_receipts')
+    op.drop_index('ix_attendance_deletions_student_id_date', table_name='attendance_deletions')
+    op.drop_index('ix_attendance_deletions_classroom_id_sync_txid', table_name='attendance_deletions')
+    op.drop_table('attendance_deletions')
+    op.drop_index('ix_attendances_classroom_id_sync_txid', table_name='attendances')
+    op.drop_column('attendances', 'sync_txid')
+    op.drop_column('attendances', 'recorded_at')
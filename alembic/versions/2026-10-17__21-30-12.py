@@ -0,0 +1,66 @@
+"""school counters
+
+Revision ID: cf2fda4606f3
+Revises: db80b386cbc5
+Create Date: 2026-10-17 21:30:12.284613
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'cf2fda4606f3'
+down_revision: Union[str, None] = 'db80b386cbc5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('school_counters',
+    sa.Column('school_id', sa.UUID(), nullable=False),
+    sa.Column('students', sa.Integer(), nullable=False),
+    sa.Column('active_students', sa.Integer(), nullable=False),
+    sa.Column('teachers', sa.Integer(), nullable=False),
+    sa.Column('parents', sa.Integer(), nullable=False),
+    sa.Column('classrooms', sa.Integer(), nullable=False),
+    sa.Column('enrollments', sa.Integer(), nullable=False),
+    sa.Column('enrollment_year', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['school_id'], ['schools.id'], ),
+    sa.PrimaryKeyConstraint('school_id')
+    )
+
+    # --- backfill, same counts as reconcile_school_counters
+    op.execute("""
+    INSERT INTO school_counters (
+        school_id, students, active_students, teachers, parents, classrooms,
+        enrollments, enrollment_year, updated_at
+    )
+    SELECT
+        schools.id,
+        (SELECT count(*) FROM school_student_associations
+            WHERE school_student_associations.school_id = schools.id),
+        (SELECT count(*) FROM school_student_associations
+            WHERE school_student_associations.school_id = schools.id
+                AND school_student_associations.is_active),
+        (SELECT count(*) FROM teachers WHERE teachers.school_id = schools.id),
+        (SELECT count(*) FROM school_parent_associations
+            WHERE school_parent_associations.school_id = schools.id),
+        (SELECT count(*) FROM classrooms WHERE classrooms.school_id = schools.id),
+        (SELECT count(*) FROM students
+            JOIN school_student_associations
+                ON school_student_associations.student_id = students.id
+            WHERE school_student_associations.school_id = schools.id
+                AND students.created_at >= date_trunc('year', now())
+                AND students.created_at < date_trunc('year', now()) + interval '1 year'),
+        CAST(extract(year FROM now()) AS INTEGER),
+        now()
+    FROM schools
+    """)
+
+
+def downgrade() -> None:
+    op.drop_table('school_counters')
@@ -0,0 +1,28 @@
+"""email outbox idempotency key
+
+Revision ID: abbd6cd91ea6
+Revises: cf2fda4606f3
+Create Date: 2026-10-17 21:58:15.530218
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'abbd6cd91ea6'
+down_revision: Union[str, None] = 'cf2fda4606f3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('email_outbox', sa.Column('idempotency_key', sa.String(), nullable=True))
+    op.create_index('ix_email_outbox_idempotency_key', 'email_outbox', ['idempotency_key'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_email_outbox_idempotency_key', table_name='email_outbox')
+    op.drop_column('email_outbox', 'idempotency_key')
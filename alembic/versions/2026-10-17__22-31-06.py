@@ -0,0 +1,152 @@
+"""truncate attendance dates to the day
+
+Revision ID: 5c1231926beb
+Revises: abbd6cd91ea6
+Create Date: 2026-10-17 22:31:06.214470
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5c1231926beb'
+down_revision: Union[str, None] = 'abbd6cd91ea6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # --- keep the last written attendance of every (student_id, day), the
+    # --- others get a tombstone so sync clients drop them; recorded_at is the
+    # --- removed row's, older than the kept one, so it never wins over it
+    op.execute("""
+        WITH duplicates AS (
+            DELETE FROM attendances AS duplicate
+            USING attendances AS kept
+            WHERE duplicate.student_id = kept.student_id
+              AND date_trunc('day', duplicate.date) = date_trunc('day', kept.date)
+              AND (duplicate.recorded_at, duplicate.id) < (kept.recorded_at, kept.id)
+            RETURNING duplicate.*
+        )
+        INSERT INTO attendance_deletions (
+            id, attendance_id, date, recorded_at, sync_txid,
+            student_id, school_id, classroom_id
+        )
+        SELECT
+            gen_random_uuid(), id, date_trunc('day', date), recorded_at, txid_current(),
+            student_id, school_id, classroom_id
+        FROM duplicates
+    """)
+
+    # --- a new sync_txid so sync clients pull the moved rows again
+    op.execute("""
+        UPDATE attendances
+        SET date = date_trunc('day', date), sync_txid = txid_current()
+        WHERE date <> date_trunc('day', date)
+    """)
+    op.execute("""
+        UPDATE attendance_deletions
+        SET date = date_trunc('day', date)
+        WHERE date <> date_trunc('day', date)
+    """)
+
+    # --- the duplicates were counted twice, rebuild with the same aggregation
+    # --- as rebuild_attendance_rollups
+    op.execute("DELETE FROM attendance_daily_rollups")
+    op.execute("""
+        INSERT INTO attendance_daily_rollups (
+            school_id, classroom_id, date,
+            present_total, present_male, present_female,
+            absent_total, absent_male, absent_female
+        )
+        SELECT
+            attendances.school_id,
+            attendances.classroom_id,
+            CAST(attendances.date AS DATE),
+            count(*) FILTER (WHERE attendances.status = 'present'),
+            count(*) FILTER (WHERE attendances.status = 'present' AND students.gender = 'male'),
+            count(*) FILTER (WHERE attendances.status = 'present' AND students.gender = 'female'),
+            count(*) FILTER (WHERE attendances.status = 'absent'),
+            count(*) FILTER (WHERE attendances.status = 'absent' AND students.gender = 'male'),
+            count(*) FILTER (WHERE attendances.status = 'absent' AND students.gender = 'female')
+        FROM attendances
+        JOIN students ON students.id = attendances.student_id
+        GROUP BY attendances.school_id, attendances.classroom_id, CAST(attendances.date AS DATE)
+    """)
+
+    # --- and the bitmaps, same query as rebuild_attendance_bitmaps
+    op.execute("DELETE FROM attendance_term_bitmaps")
+    op.execute("""
+    WITH marks AS (
+        SELECT
+            attendances.student_id,
+            attendances.academic_term_id,
+            attendances.school_id,
+            attendances.classroom_id,
+            attendances.date,
+            attendances.status,
+            CAST(attendances.date AS DATE) - CAST(academic_terms.start_date AS DATE) AS day
+        FROM attendances
+        JOIN academic_terms ON academic_terms.id = attendances.academic_term_id
+        WHERE CAST(attendances.date AS DATE) >= CAST(academic_terms.start_date AS DATE)
+    ),
+    bitmap_bytes AS (
+        SELECT
+            student_id,
+            academic_term_id,
+            day / 8 AS byte_index,
+            bit_or(1 << (day % 8)) FILTER (WHERE status = 'present') AS present_byte,
+            bit_or(1 << (day % 8)) FILTER (WHERE status = 'absent') AS absent_byte
+        FROM marks
+        GROUP BY student_id, academic_term_id, day / 8
+    ),
+    bitmap_sizes AS (
+        SELECT student_id, academic_term_id, max(byte_index) AS last_byte
+        FROM bitmap_bytes
+        GROUP BY student_id, academic_term_id
+    ),
+    latest AS (
+        SELECT DISTINCT ON (student_id, academic_term_id)
+            student_id, academic_term_id, school_id, classroom_id
+        FROM marks
+        ORDER BY student_id, academic_term_id, date DESC
+    )
+    INSERT INTO attendance_term_bitmaps (
+        student_id, academic_term_id, school_id, classroom_id,
+        present_days, absent_days
+    )
+    SELECT
+        latest.student_id,
+        latest.academic_term_id,
+        latest.school_id,
+        latest.classroom_id,
+        decode(string_agg(
+            lpad(to_hex(COALESCE(bitmap_bytes.present_byte, 0)), 2, '0'),
+            '' ORDER BY byte_index.i
+        ), 'hex'),
+        decode(string_agg(
+            lpad(to_hex(COALESCE(bitmap_bytes.absent_byte, 0)), 2, '0'),
+            '' ORDER BY byte_index.i
+        ), 'hex')
+    FROM latest
+    JOIN bitmap_sizes
+        ON bitmap_sizes.student_id = latest.student_id
+        AND bitmap_sizes.academic_term_id = latest.academic_term_id
+    CROSS JOIN LATERAL generate_series(0, bitmap_sizes.last_byte) AS byte_index(i)
+    LEFT JOIN bitmap_bytes
+        ON bitmap_bytes.student_id = latest.student_id
+        AND bitmap_bytes.academic_term_id = latest.academic_term_id
+        AND bitmap_bytes.byte_index = byte_index.i
+    GROUP BY
+        latest.student_id,
+        latest.academic_term_id,
+        latest.school_id,
+        latest.classroom_id
+    """)
+
+
+def downgrade() -> None:
+    # --- the removed duplicates and times of day are not kept
+    pass
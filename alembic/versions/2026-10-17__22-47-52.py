@@ -0,0 +1,37 @@
+"""cache invalidations
+
+Revision ID: 6f17c2604a78
+Revises: 5c1231926beb
+Create Date: 2026-10-17 22:47:52.903118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6f17c2604a78'
+down_revision: Union[str, None] = '5c1231926beb'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('cache_invalidations',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('channel', sa.String(), nullable=False),
+    sa.Column('key', sa.String(), nullable=True),
+    sa.Column('published_at', sa.DateTime(), nullable=False),
+    sa.Column('txid', sa.BigInteger(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_cache_invalidations_published_at', 'cache_invalidations', ['published_at'], unique=False)
+    op.create_index('ix_cache_invalidations_txid', 'cache_invalidations', ['txid'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_cache_invalidations_txid', table_name='cache_invalidations')
+    op.drop_index('ix_cache_invalidations_published_at', table_name='cache_invalidations')
+    op.drop_table('cache_invalidations')
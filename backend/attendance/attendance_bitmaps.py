@@ -0,0 +1,302 @@
+import datetime
+import typing
+import uuid
+from dataclasses import dataclass
+from sqlalchemy import Uuid, bindparam, delete, select, text, tuple_
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from backend.academic_term.academic_term_model import AcademicTerm
+from backend.attendance.attendance_models import AttendanceStatus, AttendanceTermBitmap
+
+BitmapKey = tuple[uuid.UUID, uuid.UUID]
+
+
+@dataclass
+class _DayMark:
+    student_id: uuid.UUID
+    academic_term_id: uuid.UUID
+    school_id: uuid.UUID
+    classroom_id: uuid.UUID
+    date: datetime.datetime
+    # --- None clears the day
+    status: typing.Optional[str]
+
+
+class AttendanceBitmapChanges:
+    """
+    The days a request marks or clears, applied in order to the students'
+    term bitmaps inside the same transaction as the attendance writes.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.marks: list[_DayMark] = []
+
+    def mark(
+        self,
+        student_id: uuid.UUID,
+        academic_term_id: uuid.UUID,
+        school_id: uuid.UUID,
+        classroom_id: uuid.UUID,
+        date: datetime.datetime,
+        status: str,
+    ) -> None:
+        self.marks.append(
+            _DayMark(
+                student_id, academic_term_id, school_id, classroom_id, date, status
+            )
+        )
+
+    def clear(
+        self,
+        student_id: uuid.UUID,
+        academic_term_id: uuid.UUID,
+        school_id: uuid.UUID,
+        classroom_id: uuid.UUID,
+        date: datetime.datetime,
+    ) -> None:
+        self.marks.append(
+            _DayMark(student_id, academic_term_id, school_id, classroom_id, date, None)
+        )
+
+
+def _with_bit(bits: bytes, day: int, value: bool) -> bytes:
+    data = bytearray(bits)
+    byte_index, mask = day // 8, 1 << (day % 8)
+    if len(data) <= byte_index:
+        data.extend(bytes(byte_index + 1 - len(data)))
+    if value:
+        data[byte_index] |= mask
+    else:
+        data[byte_index] &= ~mask & 0xFF
+    return bytes(data)
+
+
+def apply_attendance_bitmap_changes(
+    db: Session, changes: AttendanceBitmapChanges
+) -> None:
+    if not changes.marks:
+        return
+
+    first_marks: dict[BitmapKey, _DayMark] = {}
+    for day_mark in changes.marks:
+        first_marks.setdefault(
+            (day_mark.student_id, day_mark.academic_term_id), day_mark
+        )
+    keys = sorted(first_marks, key=lambda key: tuple(map(str, key)))
+
+    # --- create missing rows first so both paths below lock an existing row
+    db.execute(
+        insert(AttendanceTermBitmap)
+        .values(
+            [
+                {
+                    "student_id": student_id,
+                    "academic_term_id": academic_term_id,
+                    "school_id": first_marks[(student_id, academic_term_id)].school_id,
+                    "classroom_id": first_marks[
+                        (student_id, academic_term_id)
+                    ].classroom_id,
+                    "present_days": b"",
+                    "absent_days": b"",
+                }
+                for student_id, academic_term_id in keys
+            ]
+        )
+        .on_conflict_do_nothing()
+    )
+
+    bitmaps = {
+        (bitmap.student_id, bitmap.academic_term_id): bitmap
+        for bitmap in db.scalars(
+            select(AttendanceTermBitmap)
+            .where(
+                tuple_(
+                    AttendanceTermBitmap.student_id,
+                    AttendanceTermBitmap.academic_term_id,
+                ).in_(keys)
+            )
+            .order_by(
+                AttendanceTermBitmap.student_id, AttendanceTermBitmap.academic_term_id
+            )
+            .with_for_update()
+            .execution_options(populate_existing=True)
+        )
+    }
+    term_starts = dict(
+        db.execute(
+            select(AcademicTerm.id, AcademicTerm.start_date).where(
+                AcademicTerm.id.in_({key[1] for key in keys})
+            )
+        ).tuples()
+    )
+
+    for day_mark in changes.marks:
+        bitmap = bitmaps[(day_mark.student_id, day_mark.academic_term_id)]
+        day = (
+            day_mark.date.date() - term_starts[day_mark.academic_term_id].date()
+        ).days
+        if day < 0:
+            # --- recorded before the term started, outside the bitmap
+            continue
+
+        bitmap.present_days = _with_bit(
+            bitmap.present_days,
+            day,
+            day_mark.status == AttendanceStatus.PRESENT.value,
+        )
+        bitmap.absent_days = _with_bit(
+            bitmap.absent_days,
+            day,
+            day_mark.status == AttendanceStatus.ABSENT.value,
+        )
+        if day_mark.status is not None:
+            bitmap.school_id = day_mark.school_id
+            bitmap.classroom_id = day_mark.classroom_id
+
+
+@dataclass
+class AttendanceTermSummary:
+    present_days: int
+    absent_days: int
+    attendance_rate: typing.Optional[float]
+    longest_absent_streak: int
+    # --- consecutive absences up to the latest day marked
+    current_absent_streak: int
+
+
+def summarize_attendance_bitmap(
+    present_days: bytes, absent_days: bytes
+) -> AttendanceTermSummary:
+    """
+    Counts with popcounts and measures absence streaks over the days that
+    had attendance taken, so weekends and holidays do not break a streak.
+    """
+    present = int.from_bytes(present_days, "little")
+    absent = int.from_bytes(absent_days, "little")
+    present_count = present.bit_count()
+    absent_count = absent.bit_count()
+
+    longest_streak = current_streak = 0
+    marked = present | absent
+    while marked:
+        day = marked & -marked
+        if absent & day:
+            current_streak += 1
+            longest_streak = max(longest_streak, current_streak)
+        else:
+            current_streak = 0
+        marked ^= day
+
+    marked_count = present_count + absent_count
+    return AttendanceTermSummary(
+        present_days=present_count,
+        absent_days=absent_count,
+        attendance_rate=present_count / marked_count if marked_count else None,
+        longest_absent_streak=longest_streak,
+        current_absent_streak=current_streak,
+    )
+
+
+# --- one bitmap per student and term: each marked day sets bit (day % 8) of
+# --- byte (day / 8), the bytes are hex-encoded in order with gaps as 00
+REBUILD_ATTENDANCE_BITMAPS = text("""
+    WITH marks AS (
+        SELECT
+            attendances.student_id,
+            attendances.academic_term_id,
+            attendances.school_id,
+            attendances.classroom_id,
+            attendances.date,
+            attendances.status,
+            CAST(attendances.date AS DATE) - CAST(academic_terms.start_date AS DATE) AS day
+        FROM attendances
+        JOIN academic_terms ON academic_terms.id = attendances.academic_term_id
+        WHERE CAST(attendances.date AS DATE) >= CAST(academic_terms.start_date AS DATE)
+            AND (CAST(:school_id AS UUID) IS NULL OR attendances.school_id = :school_id)
+            AND (
+                CAST(:academic_term_id AS UUID) IS NULL
+                OR attendances.academic_term_id = :academic_term_id
+            )
+    ),
+    bitmap_bytes AS (
+        SELECT
+            student_id,
+            academic_term_id,
+            day / 8 AS byte_index,
+            bit_or(1 << (day % 8)) FILTER (WHERE status = 'present') AS present_byte,
+            bit_or(1 << (day % 8)) FILTER (WHERE status = 'absent') AS absent_byte
+        FROM marks
+        GROUP BY student_id, academic_term_id, day / 8
+    ),
+    bitmap_sizes AS (
+        SELECT student_id, academic_term_id, max(byte_index) AS last_byte
+        FROM bitmap_bytes
+        GROUP BY student_id, academic_term_id
+    ),
+    latest AS (
+        SELECT DISTINCT ON (student_id, academic_term_id)
+            student_id, academic_term_id, school_id, classroom_id
+        FROM marks
+        ORDER BY student_id, academic_term_id, date DESC
+    )
+    INSERT INTO attendance_term_bitmaps (
+        student_id, academic_term_id, school_id, classroom_id,
+        present_days, absent_days
+    )
+    SELECT
+        latest.student_id,
+        latest.academic_term_id,
+        latest.school_id,
+        latest.classroom_id,
+        decode(string_agg(
+            lpad(to_hex(COALESCE(bitmap_bytes.present_byte, 0)), 2, '0'),
+            '' ORDER BY byte_index.i
+        ), 'hex'),
+        decode(string_agg(
+            lpad(to_hex(COALESCE(bitmap_bytes.absent_byte, 0)), 2, '0'),
+            '' ORDER BY byte_index.i
+        ), 'hex')
+    FROM latest
+    JOIN bitmap_sizes
+        ON bitmap_sizes.student_id = latest.student_id
+        AND bitmap_sizes.academic_term_id = latest.academic_term_id
+    CROSS JOIN LATERAL generate_series(0, bitmap_sizes.last_byte) AS byte_index(i)
+    LEFT JOIN bitmap_bytes
+        ON bitmap_bytes.student_id = latest.student_id
+        AND bitmap_bytes.academic_term_id = latest.academic_term_id
+        AND bitmap_bytes.byte_index = byte_index.i
+    GROUP BY
+        latest.student_id,
+        latest.academic_term_id,
+        latest.school_id,
+        latest.classroom_id
+    """).bindparams(
+    bindparam("school_id", type_=Uuid),
+    bindparam("academic_term_id", type_=Uuid),
+)
+
+
+def rebuild_attendance_bitmaps(
+    db: Session,
+    school_id: typing.Optional[uuid.UUID] = None,
+    academic_term_id: typing.Optional[uuid.UUID] = None,
+) -> None:
+    """
+    Recomputes the term bitmaps from `attendances`, under the same kind of
+    EXCLUSIVE lock as rebuild_attendance_rollups.
+    """
+    db.execute(text("LOCK TABLE attendance_term_bitmaps IN EXCLUSIVE MODE"))
+
+    filters = []
+    if school_id is not None:
+        filters.append(AttendanceTermBitmap.school_id == school_id)
+    if academic_term_id is not None:
+        filters.append(AttendanceTermBitmap.academic_term_id == academic_term_id)
+    db.execute(delete(AttendanceTermBitmap).where(*filters))
+
+    db.execute(
+        REBUILD_ATTENDANCE_BITMAPS,
+        {"school_id": school_id, "academic_term_id": academic_term_id},
+    )
@@ -2,25 +2,71 @@ import datetime
 import uuid
 import typing
 import enum
-from sqlalchemy import desc, asc
+from sqlalchemy import Date, and_, cast, func, literal_column, select, tuple_, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel
-from fastapi import APIRouter, HTTPException, status, Query
+from fastapi import APIRouter, Cookie, HTTPException, status, Query
+from fastapi.responses import StreamingResponse
 
-from backend.paginated_response import PaginatedResponse
-from backend.attendance.attendance_models import AttendanceStatus
+from backend.cursor_pagination import Keyset
+from backend.paginated_response import (
+    CountMode,
+    PaginatedResponse,
+    fetch_page,
+)
+from backend.academic_term.academic_term_model import AcademicTerm
+from backend.attendance.attendance_models import (
+    AttendanceDailyRollup,
+    AttendanceStatus,
+    AttendanceTermBitmap,
+)
 from backend.database.database import DatabaseDependency
+from backend.database.replica_database import (
+    ReadOnlyAsyncDatabaseDependency,
+    read_only_async_session_local,
+)
 
+from backend.classroom.classroom_model import Classroom
 from backend.school.school_model import School
+from backend.school.school_data_version import mark_school_data_written
 from backend.user.user_models import (
     RoleType,
-    User,
 )
 
 from backend.student.student_model import Student
+from backend.teacher.teacher_model import ClassTeacherAssociation
 
-from backend.attendance.attendance_models import Attendance
+from backend.attendance.attendance_models import (
+    Attendance,
+    AttendanceDeletion,
+    AttendanceSyncReceipt,
+)
+from backend.attendance.attendance_export import (
+    ATTENDANCE_EXPORT_BATCH_SIZE,
+    EXPORT_MEDIA_TYPES,
+    EXPORT_WRITERS,
+    ExportFormat,
+    register_header,
+    register_rows,
+)
+from backend.attendance.attendance_bitmaps import (
+    AttendanceBitmapChanges,
+    apply_attendance_bitmap_changes,
+    summarize_attendance_bitmap,
+)
+from backend.attendance.attendance_sync import (
+    ATTENDANCE_SYNC_MAX_MUTATIONS,
+    AttendanceDay,
+    UtcNaiveDatetime,
+    pull_attendance_changes,
+)
+from backend.attendance.attendance_rollups import (
+    AttendanceRollupChanges,
+    apply_attendance_changes,
+)
 
-from backend.user.user_authentication import UserAuthenticationContextDependency
+from backend.user.user_authentication import AuthPrincipal, AuthPrincipalDependency
 
 router = APIRouter()
 
@@ -36,6 +82,7 @@ class AttendanceResponse(BaseModel):
     academic_term_id: uuid.UUID
     created_at: datetime.datetime
     updated_at: typing.Optional[datetime.datetime]
+    recorded_at: datetime.datetime
 
 
 def attendance_to_dto(attendance: Attendance) -> AttendanceResponse:
@@ -50,6 +97,7 @@ def attendance_to_dto(attendance: Attendance) -> AttendanceResponse:
         academic_term_id=attendance.academic_term_id,
         created_at=attendance.created_at,
         updated_at=attendance.updated_at,
+        recorded_at=attendance.recorded_at,
     )
 
 
@@ -66,9 +114,9 @@ class AttendanceSortableFields(enum.Enum):
 
 
 @router.get("/attendance/list")
-def get_all_attendance_for_a_specific_classroom_in_a_date_range(
-    db: DatabaseDependency,
-    auth_context: UserAuthenticationContextDependency,
+async def get_all_attendance_for_a_specific_classroom_in_a_date_range(
+    db: ReadOnlyAsyncDatabaseDependency,
+    auth_context: AuthPrincipalDependency,
     page: int = Query(1, ge=1),
     limit: int = Query(10, ge=1),
     order_field: typing.Optional[AttendanceSortableFields] = None,
@@ -79,54 +127,401 @@ def get_all_attendance_for_a_specific_classroom_in_a_date_range(
     start_date: typing.Optional[datetime.datetime] = None,
     end_date: typing.Optional[datetime.datetime] = None,
     student_id: typing.Optional[uuid.UUID] = None,
+    cursor: typing.Optional[str] = None,
+    count_mode: CountMode = CountMode.EXACT,
 ):
-    user = db.query(User).filter(User.id == auth_context.user_id).first()
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN, detail="unauthorized"
-        )
 
     query = (
-        db.query(Attendance)
+        select(Attendance)
         .join(Student)
-        .filter(Attendance.school_id == user.school_id)
+        .where(Attendance.school_id == auth_context.school_id)
     )
 
     if attendance_status:
-        query = query.filter(Attendance.status == attendance_status.value)
+        query = query.where(Attendance.status == attendance_status.value)
 
     if classroom_id is not None:
-        query = query.filter(Attendance.classroom_id == classroom_id)
+        query = query.where(Attendance.classroom_id == classroom_id)
 
     if start_date is not None and end_date is not None:
-        query = query.filter(Attendance.date.between(start_date, end_date))
+        query = query.where(Attendance.date.between(start_date, end_date))
 
     if academic_term_id is not None:
-        query = query.filter(Attendance.academic_term_id == academic_term_id)
+        query = query.where(Attendance.academic_term_id == academic_term_id)
 
     if student_id is not None:
-        query = query.filter(Attendance.student_id == student_id)
-
-    total_count = query.count()
+        query = query.where(Attendance.student_id == student_id)
 
-    if order_field and order_direction:
-        sort_column = getattr(Attendance, order_field.value)
-        if order_direction == OrderBy.DESC:
-            query = query.order_by(desc(sort_column))
-        else:
-            query = query.order_by(asc(sort_column))
-    else:
-
-        query = query.order_by(desc(Attendance.date))
+    keyset = Keyset.from_order(
+        Attendance, order_field, order_direction, default=[(Attendance.date, True)]
+    )
+    page_query = keyset.apply(query, cursor)
+    if not cursor:
+        page_query = page_query.offset((page - 1) * limit)
 
-    offset = (page - 1) * limit
-    attendance_records = query.offset(offset).limit(limit).all()
+    attendance_records, total_count = await fetch_page(
+        db, query, page_query, limit, count_mode, auth_context.school_id
+    )
 
     return PaginatedResponse[AttendanceResponse](
         total=total_count,
         page=page,
         limit=limit,
         data=[attendance_to_dto(attendance) for attendance in attendance_records],
+        next_cursor=keyset.next_cursor(attendance_records, limit),
+    )
+
+
+async def get_readable_classroom_ids(
+    db: AsyncSession,
+    auth_context: AuthPrincipal,
+    classroom_ids: typing.Optional[typing.Iterable[uuid.UUID]] = None,
+) -> typing.Optional[set[uuid.UUID]]:
+    """
+    The classrooms an attendance report may cover: the requested ones, or
+    None for the whole school. School admins read any classroom, teachers
+    only the classrooms they are assigned to.
+    """
+    requested = set(classroom_ids) if classroom_ids else None
+
+    if auth_context.has_role_type(RoleType.SCHOOL_ADMIN):
+        return requested
+
+    if not (
+        auth_context.teacher_id
+        or auth_context.has_role_type(RoleType.TEACHER)
+        or auth_context.has_role_type(RoleType.CLASS_TEACHER)
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN, detail="unauthorized"
+        )
+
+    assigned = set(
+        await db.scalars(
+            select(ClassTeacherAssociation.classroom_id).where(
+                ClassTeacherAssociation.teacher_id == auth_context.teacher_id
+            )
+        )
+    )
+    if requested is None:
+        return assigned
+    if not requested <= assigned:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN, detail="classroom-not-assigned"
+        )
+    return requested
+
+
+class TrendBucket(enum.Enum):
+    DAY = "day"
+    WEEK = "week"
+    MONTH = "month"
+
+
+class AttendanceTrendPoint(BaseModel):
+    bucket_start: datetime.date
+    present: int
+    absent: int
+    attendance_rate: typing.Optional[float]
+
+
+class ClassroomAttendanceTrend(BaseModel):
+    classroom_id: uuid.UUID
+    points: list[AttendanceTrendPoint]
+
+
+class AttendanceTrendsResponse(BaseModel):
+    bucket: TrendBucket
+    start_date: datetime.date
+    end_date: datetime.date
+    classrooms: list[ClassroomAttendanceTrend]
+
+
+@router.get("/attendance/trends")
+async def get_attendance_trends(
+    db: ReadOnlyAsyncDatabaseDependency,
+    auth_context: AuthPrincipalDependency,
+    bucket: TrendBucket = TrendBucket.DAY,
+    classroom_ids: typing.Annotated[
+        typing.Optional[list[uuid.UUID]], Query(alias="classroom_id")
+    ] = None,
+    academic_term_id: typing.Optional[uuid.UUID] = None,
+    start_date: typing.Optional[datetime.date] = None,
+    end_date: typing.Optional[datetime.date] = None,
+):
+    """
+    Attendance per classroom bucketed by day, week or month, over an
+    academic term or an explicit [start_date, end_date] range. Bucketed with
+    date_trunc over the daily rollups, so the database returns one row per
+    classroom and bucket.
+    """
+    readable_classroom_ids = await get_readable_classroom_ids(
+        db, auth_context, classroom_ids
+    )
+
+    if academic_term_id is not None:
+        academic_term = await db.scalar(
+            select(AcademicTerm).where(
+                AcademicTerm.id == academic_term_id,
+                AcademicTerm.school_id == auth_context.school_id,
+            )
+        )
+        if not academic_term:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="academic-term-not-found",
+            )
+        start_date = start_date or academic_term.start_date.date()
+        end_date = end_date or academic_term.end_date.date()
+
+    if start_date is None or end_date is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="date-range-or-academic-term-required",
+        )
+    if start_date > end_date:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="invalid-date-range",
+        )
+
+    bucket_start = cast(
+        func.date_trunc(bucket.value, AttendanceDailyRollup.date), Date
+    ).label("bucket_start")
+    query = (
+        select(
+            AttendanceDailyRollup.classroom_id,
+            bucket_start,
+            func.sum(AttendanceDailyRollup.present_total),
+            func.sum(AttendanceDailyRollup.absent_total),
+        )
+        .where(
+            AttendanceDailyRollup.school_id == auth_context.school_id,
+            AttendanceDailyRollup.date.between(start_date, end_date),
+        )
+        .group_by(AttendanceDailyRollup.classroom_id, bucket_start)
+        .order_by(AttendanceDailyRollup.classroom_id, bucket_start)
+    )
+    if readable_classroom_ids is not None:
+        query = query.where(
+            AttendanceDailyRollup.classroom_id.in_(readable_classroom_ids)
+        )
+
+    trends: dict[uuid.UUID, list[AttendanceTrendPoint]] = {}
+    for classroom_id, point_start, present, absent in await db.execute(query):
+        marked = present + absent
+        trends.setdefault(classroom_id, []).append(
+            AttendanceTrendPoint(
+                bucket_start=point_start,
+                present=present,
+                absent=absent,
+                attendance_rate=present / marked if marked else None,
+            )
+        )
+
+    return AttendanceTrendsResponse(
+        bucket=bucket,
+        start_date=start_date,
+        end_date=end_date,
+        classrooms=[
+            ClassroomAttendanceTrend(classroom_id=classroom_id, points=points)
+            for classroom_id, points in trends.items()
+        ],
+    )
+
+
+class StudentAbsenteeism(BaseModel):
+    student_id: uuid.UUID
+    first_name: str
+    last_name: str
+    classroom_id: uuid.UUID
+    present_days: int
+    absent_days: int
+    attendance_rate: typing.Optional[float]
+    longest_absent_streak: int
+    current_absent_streak: int
+
+
+@router.get("/attendance/absenteeism")
+async def get_absenteeism_for_an_academic_term(
+    db: ReadOnlyAsyncDatabaseDependency,
+    auth_context: AuthPrincipalDependency,
+    academic_term_id: uuid.UUID,
+    classroom_id: typing.Optional[uuid.UUID] = None,
+    min_absent_streak: typing.Optional[int] = Query(None, ge=1),
+    max_attendance_rate: typing.Optional[float] = Query(None, ge=0, le=1),
+):
+    """
+    Students matching any of the given criteria, e.g. absent 3+ consecutive
+    days or attending less than 80% of the term; every student of the term
+    when none is given. Reads one bitmap row per student.
+    """
+    readable_classroom_ids = await get_readable_classroom_ids(
+        db, auth_context, [classroom_id] if classroom_id else None
+    )
+
+    query = (
+        select(
+            AttendanceTermBitmap.student_id,
+            Student.first_name,
+            Student.last_name,
+            AttendanceTermBitmap.classroom_id,
+            AttendanceTermBitmap.present_days,
+            AttendanceTermBitmap.absent_days,
+        )
+        .join(Student, Student.id == AttendanceTermBitmap.student_id)
+        .where(
+            AttendanceTermBitmap.school_id == auth_context.school_id,
+            AttendanceTermBitmap.academic_term_id == academic_term_id,
+        )
+        .order_by(Student.last_name, Student.first_name, Student.id)
+    )
+    if readable_classroom_ids is not None:
+        query = query.where(
+            AttendanceTermBitmap.classroom_id.in_(readable_classroom_ids)
+        )
+
+    students = []
+    for (
+        student_id,
+        first_name,
+        last_name,
+        student_classroom_id,
+        present_days,
+        absent_days,
+    ) in await db.execute(query):
+        summary = summarize_attendance_bitmap(present_days, absent_days)
+        criteria = []
+        if min_absent_streak is not None:
+            criteria.append(summary.longest_absent_streak >= min_absent_streak)
+        if max_attendance_rate is not None:
+            criteria.append(
+                summary.attendance_rate is not None
+                and summary.attendance_rate < max_attendance_rate
+            )
+        if criteria and not any(criteria):
+            continue
+
+        students.append(
+            StudentAbsenteeism(
+                student_id=student_id,
+                first_name=first_name,
+                last_name=last_name,
+                classroom_id=student_classroom_id,
+                present_days=summary.present_days,
+                absent_days=summary.absent_days,
+                attendance_rate=summary.attendance_rate,
+                longest_absent_streak=summary.longest_absent_streak,
+                current_absent_streak=summary.current_absent_streak,
+            )
+        )
+
+    return students
+
+
+@router.get("/attendance/export")
+async def export_attendance_register(
+    db: ReadOnlyAsyncDatabaseDependency,
+    auth_context: AuthPrincipalDependency,
+    export_format: ExportFormat = Query(ExportFormat.CSV, alias="format"),
+    classroom_id: typing.Optional[uuid.UUID] = None,
+    academic_term_id: typing.Optional[uuid.UUID] = None,
+    start_date: typing.Optional[datetime.date] = None,
+    end_date: typing.Optional[datetime.date] = None,
+    read_your_writes_until: typing.Annotated[
+        float | None, Cookie(include_in_schema=False)
+    ] = None,
+):
+    """
+    A student x day attendance register, streamed as csv or xlsx from a
+    server-side cursor so a term of school-wide attendance is never held in
+    memory.
+    """
+    readable_classroom_ids = await get_readable_classroom_ids(
+        db, auth_context, [classroom_id] if classroom_id else None
+    )
+
+    if academic_term_id is not None:
+        academic_term = await db.scalar(
+            select(AcademicTerm).where(
+                AcademicTerm.id == academic_term_id,
+                AcademicTerm.school_id == auth_context.school_id,
+            )
+        )
+        if not academic_term:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="academic-term-not-found",
+            )
+        start_date = start_date or academic_term.start_date.date()
+        end_date = end_date or academic_term.end_date.date()
+
+    if start_date is None or end_date is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="date-range-or-academic-term-required",
+        )
+    if start_date > end_date:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="invalid-date-range",
+        )
+
+    # --- the register columns: every day with any attendance taken
+    days_query = (
+        select(AttendanceDailyRollup.date)
+        .distinct()
+        .where(
+            AttendanceDailyRollup.school_id == auth_context.school_id,
+            AttendanceDailyRollup.date.between(start_date, end_date),
+        )
+        .order_by(AttendanceDailyRollup.date)
+    )
+    if readable_classroom_ids is not None:
+        days_query = days_query.where(
+            AttendanceDailyRollup.classroom_id.in_(readable_classroom_ids)
+        )
+    days = list((await db.scalars(days_query)).all())
+
+    records_query = (
+        select(
+            Student.id,
+            Student.nemis_number,
+            Student.first_name,
+            Student.last_name,
+            Attendance.date,
+            Attendance.status,
+        )
+        .join(Student, Student.id == Attendance.student_id)
+        .where(
+            Attendance.school_id == auth_context.school_id,
+            Attendance.date >= start_date,
+            Attendance.date < end_date + datetime.timedelta(days=1),
+        )
+        .order_by(Student.last_name, Student.first_name, Student.id, Attendance.date)
+        .execution_options(yield_per=ATTENDANCE_EXPORT_BATCH_SIZE)
+    )
+    if readable_classroom_ids is not None:
+        records_query = records_query.where(
+            Attendance.classroom_id.in_(readable_classroom_ids)
+        )
+
+    # --- the request's session is closed before the body is sent, so the
+    # --- stream opens its own
+    async def stream_register():
+        session_local = read_only_async_session_local(read_your_writes_until)
+        async with session_local() as export_db:
+            records = await export_db.stream(records_query)
+            async for chunk in EXPORT_WRITERS[export_format](
+                register_header(days), register_rows(records, days)
+            ):
+                yield chunk
+
+    filename = f"attendance-register-{start_date}-{end_date}.{export_format.value}"
+    return StreamingResponse(
+        stream_register(),
+        media_type=EXPORT_MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
     )
 
 
@@ -136,27 +531,21 @@ class SchoolAttendanceDTO(BaseModel):
     academic_term_id: uuid.UUID
     remarks: str
     status: AttendanceStatus
-    date: datetime.datetime
+    date: AttendanceDay
 
 
 @router.post("/attendance/create")
 def create_student_class_attendance(
     db: DatabaseDependency,
-    auth_context: UserAuthenticationContextDependency,
+    auth_context: AuthPrincipalDependency,
     body: SchoolAttendanceDTO,
 ):
-    user = db.query(User).filter(User.id == auth_context.user_id).first()
-
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN, detail="unauthorized"
-        )
 
     if not (
-        user.teacher_user
-        or user.has_role_type(RoleType.TEACHER)
-        or user.has_role_type(RoleType.CLASS_TEACHER)
-        or user.has_role_type(RoleType.SCHOOL_ADMIN)
+        auth_context.teacher_id
+        or auth_context.has_role_type(RoleType.TEACHER)
+        or auth_context.has_role_type(RoleType.CLASS_TEACHER)
+        or auth_context.has_role_type(RoleType.SCHOOL_ADMIN)
     ):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN, detail="unauthorized"
@@ -185,7 +574,7 @@ def create_student_class_attendance(
             detail="student-attendance-already-recorded",
         )
 
-    school = db.query(School).filter(School.id == user.school_id).first()
+    school = db.query(School).filter(School.id == auth_context.school_id).first()
 
     if not school:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
@@ -200,15 +589,265 @@ def create_student_class_attendance(
         remarks=body.remarks,
     )
     db.add(attendance)
+
+    changes = AttendanceRollupChanges()
+    changes.add(
+        school.id, body.classroom_id, body.date, body.status.value, student.gender
+    )
+    apply_attendance_changes(db, changes)
+
+    bitmap_changes = AttendanceBitmapChanges()
+    bitmap_changes.mark(
+        body.student_id,
+        body.academic_term_id,
+        school.id,
+        body.classroom_id,
+        body.date,
+        body.status.value,
+    )
+    apply_attendance_bitmap_changes(db, bitmap_changes)
+
     db.flush()
     db.commit()
     return {"message": "attendance-for-the-day-added-successfully"}
 
 
+class RollCallEntryDTO(BaseModel):
+    student_id: uuid.UUID
+    status: AttendanceStatus
+    remarks: typing.Optional[str] = None
+
+
+class RollCallDTO(BaseModel):
+    date: AttendanceDay
+    academic_term_id: uuid.UUID
+    students: list[RollCallEntryDTO]
+
+
+class RollCallOutcome(enum.Enum):
+    CREATED = "created"
+    UPDATED = "updated"
+    STUDENT_NOT_IN_CLASSROOM = "student-not-in-classroom"
+    DUPLICATE_STUDENT = "duplicate-student"
+
+
+class RollCallResult(BaseModel):
+    student_id: uuid.UUID
+    outcome: RollCallOutcome
+    attendance_id: typing.Optional[uuid.UUID] = None
+
+
+@router.post("/attendance/classroom/{classroom_id}/roll-call")
+def record_classroom_roll_call(
+    classroom_id: uuid.UUID,
+    db: DatabaseDependency,
+    auth_context: AuthPrincipalDependency,
+    body: RollCallDTO,
+) -> list[RollCallResult]:
+    """
+    Records a whole class for one date: one query validates membership and
+    one INSERT ... ON CONFLICT (student_id, date) DO UPDATE writes every row,
+    so re-submitting a roll call corrects it instead of failing.
+    """
+
+    if not (
+        auth_context.teacher_id
+        or auth_context.has_role_type(RoleType.TEACHER)
+        or auth_context.has_role_type(RoleType.CLASS_TEACHER)
+        or auth_context.has_role_type(RoleType.SCHOOL_ADMIN)
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN, detail="unauthorized"
+        )
+
+    if not auth_context.school_id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN, detail="user-must-be-in-a-school"
+        )
+
+    academic_term_id = db.scalar(
+        select(AcademicTerm.id).where(
+            AcademicTerm.id == body.academic_term_id,
+            AcademicTerm.school_id == auth_context.school_id,
+        )
+    )
+    if not academic_term_id:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="academic-term-not-found",
+        )
+
+    # --- one row per matching student, or a single row without a student when
+    # --- the classroom exists but none of them are in it
+    members = db.execute(
+        select(Classroom.id, Student.id, Student.gender)
+        .outerjoin(
+            Student,
+            and_(
+                Student.classroom_id == Classroom.id,
+                Student.id.in_([entry.student_id for entry in body.students]),
+            ),
+        )
+        .where(
+            Classroom.id == classroom_id,
+            Classroom.school_id == auth_context.school_id,
+        )
+    ).all()
+    if not members:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="classroom-not-found"
+        )
+    member_genders = {
+        student_id: gender for _, student_id, gender in members if student_id
+    }
+
+    # --- the rows about to be overwritten, locked so their rollup counts can
+    # --- be moved reliably
+    existing = {
+        student_id: (existing_classroom_id, existing_term_id, existing_status)
+        for student_id, existing_classroom_id, existing_term_id, existing_status in db.execute(
+            select(
+                Attendance.student_id,
+                Attendance.classroom_id,
+                Attendance.academic_term_id,
+                Attendance.status,
+            )
+            .where(
+                Attendance.student_id.in_(member_genders),
+                Attendance.date == body.date,
+            )
+            .with_for_update()
+        )
+    }
+
+    results: dict[uuid.UUID, RollCallResult] = {}
+    rows = []
+    for entry in body.students:
+        if entry.student_id in results:
+            # --- ON CONFLICT cannot touch the same row twice in one statement
+            results[entry.student_id] = RollCallResult(
+                student_id=entry.student_id,
+                outcome=RollCallOutcome.DUPLICATE_STUDENT,
+            )
+        elif entry.student_id not in member_genders:
+            results[entry.student_id] = RollCallResult(
+                student_id=entry.student_id,
+                outcome=RollCallOutcome.STUDENT_NOT_IN_CLASSROOM,
+            )
+        else:
+            results[entry.student_id] = RollCallResult(
+                student_id=entry.student_id, outcome=RollCallOutcome.CREATED
+            )
+            rows.append(
+                {
+                    "id": uuid.uuid4(),
+                    "date": body.date,
+                    "status": entry.status.value,
+                    "remarks": entry.remarks,
+                    "student_id": entry.student_id,
+                    "school_id": auth_context.school_id,
+                    "classroom_id": classroom_id,
+                    "academic_term_id": body.academic_term_id,
+                }
+            )
+
+    # --- a duplicate voids the whole entry, not just its second occurrence
+    rows = [
+        row
+        for row in rows
+        if results[row["student_id"]].outcome != RollCallOutcome.DUPLICATE_STUDENT
+    ]
+
+    if rows:
+        statement = insert(Attendance).values(rows)
+        statement = statement.on_conflict_do_update(
+            index_elements=[Attendance.student_id, Attendance.date],
+            set_={
+                "status": statement.excluded.status,
+                "remarks": statement.excluded.remarks,
+                "classroom_id": statement.excluded.classroom_id,
+                "academic_term_id": statement.excluded.academic_term_id,
+                "updated_at": func.now(),
+                "recorded_at": func.now(),
+                "sync_txid": func.txid_current(),
+            },
+        ).returning(
+            Attendance.id,
+            Attendance.student_id,
+            # --- xmax is 0 only on a freshly inserted row version
+            literal_column("xmax = 0").label("inserted"),
+            Attendance.status,
+        )
+
+        changes = AttendanceRollupChanges()
+        bitmap_changes = AttendanceBitmapChanges()
+        recount_rollups = False
+        for attendance_id, student_id, inserted, new_status in db.execute(statement):
+            results[student_id] = RollCallResult(
+                student_id=student_id,
+                outcome=(
+                    RollCallOutcome.CREATED if inserted else RollCallOutcome.UPDATED
+                ),
+                attendance_id=attendance_id,
+            )
+
+            # --- overwrites the day, also when its old row is unknown below
+            bitmap_changes.mark(
+                student_id,
+                body.academic_term_id,
+                auth_context.school_id,
+                classroom_id,
+                body.date,
+                new_status,
+            )
+
+            gender = member_genders[student_id]
+            if not inserted:
+                if student_id not in existing:
+                    # --- inserted by someone else after the read above, its old
+                    # --- counts are unknown
+                    recount_rollups = True
+                    continue
+                old_classroom_id, old_term_id, old_status = existing[student_id]
+                changes.remove(
+                    auth_context.school_id,
+                    old_classroom_id,
+                    body.date,
+                    old_status,
+                    gender,
+                )
+                if old_term_id != body.academic_term_id:
+                    bitmap_changes.clear(
+                        student_id,
+                        old_term_id,
+                        auth_context.school_id,
+                        old_classroom_id,
+                        body.date,
+                    )
+            changes.add(
+                auth_context.school_id, classroom_id, body.date, new_status, gender
+            )
+
+        apply_attendance_changes(
+            db,
+            changes,
+            recount_days=(
+                [(auth_context.school_id, body.date.date())] if recount_rollups else []
+            ),
+        )
+        apply_attendance_bitmap_changes(db, bitmap_changes)
+
+        # --- core inserts bypass the session events that track written schools
+        mark_school_data_written(db, [auth_context.school_id])
+        db.commit()
+
+    return list(results.values())
+
+
 class AttendanceUpdateDTO(BaseModel):
     status: typing.Optional[AttendanceStatus]
     remarks: typing.Optional[str]
-    date: typing.Optional[datetime.datetime]
+    date: typing.Optional[AttendanceDay]
 
 
 @router.patch("/attendance/by-attendance-id/{attendance_id}")
@@ -216,19 +855,40 @@ def partial_update_student_attendance(
     attendance_id: uuid.UUID,
     body: AttendanceUpdateDTO,
     db: DatabaseDependency,
-    authentication_context: UserAuthenticationContextDependency,
+    authentication_context: AuthPrincipalDependency,
 ):
 
-    user = db.query(User).filter(User.id == authentication_context.user_id).first()
-    if not user:
-        raise HTTPException(404, detail="user-not-found")
-    if not user.teacher_user:
+    if not authentication_context.teacher_id:
         raise HTTPException(403, detail="needs-to-be-teacher")
 
-    attendance = db.query(Attendance).filter(Attendance.id == attendance_id).first()
+    # --- locked like in the roll call, the rollup and bitmap changes below
+    # --- remove the status read here
+    attendance = db.scalar(
+        select(Attendance).where(Attendance.id == attendance_id).with_for_update()
+    )
     if not attendance:
         raise HTTPException(404, detail="attendance-record-not-found")
 
+    gender = db.scalar(
+        select(Student.gender).where(Student.id == attendance.student_id)
+    )
+    changes = AttendanceRollupChanges()
+    changes.remove(
+        attendance.school_id,
+        attendance.classroom_id,
+        attendance.date,
+        attendance.status,
+        gender,
+    )
+    bitmap_changes = AttendanceBitmapChanges()
+    bitmap_changes.clear(
+        attendance.student_id,
+        attendance.academic_term_id,
+        attendance.school_id,
+        attendance.classroom_id,
+        attendance.date,
+    )
+
     if body.date and body.date != attendance.date:
         existing_attendance = (
             db.query(Attendance)
@@ -251,6 +911,25 @@ def partial_update_student_attendance(
     if body.date:
         attendance.date = body.date
 
+    changes.add(
+        attendance.school_id,
+        attendance.classroom_id,
+        attendance.date,
+        attendance.status,
+        gender,
+    )
+    apply_attendance_changes(db, changes)
+
+    bitmap_changes.mark(
+        attendance.student_id,
+        attendance.academic_term_id,
+        attendance.school_id,
+        attendance.classroom_id,
+        attendance.date,
+        attendance.status,
+    )
+    apply_attendance_bitmap_changes(db, bitmap_changes)
+
     db.flush()
     db.commit()
 
@@ -261,20 +940,460 @@ def partial_update_student_attendance(
 def delete_student_attendance(
     attendance_id: uuid.UUID,
     db: DatabaseDependency,
-    authentication_context: UserAuthenticationContextDependency,
+    authentication_context: AuthPrincipalDependency,
 ):
 
-    user = db.query(User).filter(User.id == authentication_context.user_id).first()
-    if not user:
-        raise HTTPException(404, detail="user-not-found")
-    if not user.teacher_user:
+    if not authentication_context.teacher_id:
         raise HTTPException(403, detail="needs-to-be-teacher")
 
-    attendance = db.query(Attendance).filter(Attendance.id == attendance_id).first()
+    # --- locked for the same reason as in the PATCH above
+    attendance = db.scalar(
+        select(Attendance).where(Attendance.id == attendance_id).with_for_update()
+    )
     if not attendance:
         raise HTTPException(404, detail="attendance-record-not-found")
 
+    gender = db.scalar(
+        select(Student.gender).where(Student.id == attendance.student_id)
+    )
+    changes = AttendanceRollupChanges()
+    changes.remove(
+        attendance.school_id,
+        attendance.classroom_id,
+        attendance.date,
+        attendance.status,
+        gender,
+    )
+    apply_attendance_changes(db, changes)
+
+    bitmap_changes = AttendanceBitmapChanges()
+    bitmap_changes.clear(
+        attendance.student_id,
+        attendance.academic_term_id,
+        attendance.school_id,
+        attendance.classroom_id,
+        attendance.date,
+    )
+    apply_attendance_bitmap_changes(db, bitmap_changes)
+
+    db.add(
+        AttendanceDeletion(
+            attendance_id=attendance.id,
+            date=attendance.date,
+            student_id=attendance.student_id,
+            school_id=attendance.school_id,
+            classroom_id=attendance.classroom_id,
+        )
+    )
     db.delete(attendance)
     db.commit()
 
     return {"message": "attendance-record-deleted-successfully"}
+
+
+class AttendanceSyncOperation(enum.Enum):
+    UPSERT = "upsert"
+    DELETE = "delete"
+
+
+class AttendanceSyncMutationDTO(BaseModel):
+    idempotency_key: str
+    # --- when the teacher made the change on the device
+    client_timestamp: UtcNaiveDatetime
+    operation: AttendanceSyncOperation = AttendanceSyncOperation.UPSERT
+    student_id: uuid.UUID
+    date: AttendanceDay
+    status: typing.Optional[AttendanceStatus] = None
+    remarks: typing.Optional[str] = None
+
+
+class AttendanceSyncDTO(BaseModel):
+    academic_term_id: uuid.UUID
+    # --- the cursor of the previous sync, None on a device's first sync
+    cursor: typing.Optional[int] = None
+    mutations: list[AttendanceSyncMutationDTO] = []
+
+
+class AttendanceSyncOutcome(enum.Enum):
+    APPLIED = "applied"
+    # --- a write recorded at the same time or later already won
+    STALE = "stale"
+    STUDENT_NOT_IN_CLASSROOM = "student-not-in-classroom"
+    STATUS_REQUIRED = "status-required"
+
+
+class AttendanceSyncResult(BaseModel):
+    idempotency_key: str
+    outcome: AttendanceSyncOutcome
+    attendance_id: typing.Optional[uuid.UUID] = None
+    # --- the key was seen before, the outcome is the one recorded then
+    replayed: bool = False
+
+
+class AttendanceDeletionResponse(BaseModel):
+    attendance_id: typing.Optional[uuid.UUID]
+    student_id: uuid.UUID
+    date: datetime.datetime
+    recorded_at: datetime.datetime
+
+
+class AttendanceSyncResponse(BaseModel):
+    results: list[AttendanceSyncResult]
+    attendances: list[AttendanceResponse]
+    deletions: list[AttendanceDeletionResponse]
+    # --- send back as `cursor` on the next sync
+    cursor: int
+    # --- more changes are waiting, sync again straight away
+    has_more: bool
+
+
+@router.post("/attendance/classroom/{classroom_id}/sync")
+def sync_classroom_attendance(
+    classroom_id: uuid.UUID,
+    db: DatabaseDependency,
+    auth_context: AuthPrincipalDependency,
+    body: AttendanceSyncDTO,
+) -> AttendanceSyncResponse:
+    """
+    Applies a device's queued attendance changes in one transaction and
+    returns the classroom's changes since the device's last sync.
+
+    Each mutation carries an idempotency key, so a retried batch replays the
+    recorded outcomes instead of applying twice. Conflicting writes to one
+    (student_id, date) resolve last-writer-wins on the device timestamp,
+    deletions included.
+    """
+
+    if not (
+        auth_context.teacher_id
+        or auth_context.has_role_type(RoleType.TEACHER)
+        or auth_context.has_role_type(RoleType.CLASS_TEACHER)
+        or auth_context.has_role_type(RoleType.SCHOOL_ADMIN)
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN, detail="unauthorized"
+        )
+
+    if not auth_context.school_id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN, detail="user-must-be-in-a-school"
+        )
+    school_id = auth_context.school_id
+
+    if len(body.mutations) > ATTENDANCE_SYNC_MAX_MUTATIONS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="too-many-mutations"
+        )
+
+    academic_term_id = db.scalar(
+        select(AcademicTerm.id).where(
+            AcademicTerm.id == body.academic_term_id,
+            AcademicTerm.school_id == school_id,
+        )
+    )
+    if not academic_term_id:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="academic-term-not-found",
+        )
+
+    members = db.execute(
+        select(Classroom.id, Student.id, Student.gender)
+        .outerjoin(
+            Student,
+            and_(
+                Student.classroom_id == Classroom.id,
+                Student.id.in_([mutation.student_id for mutation in body.mutations]),
+            ),
+        )
+        .where(
+            Classroom.id == classroom_id,
+            Classroom.school_id == school_id,
+        )
+    ).all()
+    if not members:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="classroom-not-found"
+        )
+    member_genders = {
+        student_id: gender for _, student_id, gender in members if student_id
+    }
+
+    mutations: dict[str, AttendanceSyncMutationDTO] = {}
+    for mutation in body.mutations:
+        mutations.setdefault(mutation.idempotency_key, mutation)
+
+    results: dict[str, AttendanceSyncResult] = {}
+    if mutations:
+        # --- claim the keys first: a concurrent retry of the same batch waits
+        # --- here until this transaction ends, then sees them as replayed
+        claimed_keys = set(
+            db.scalars(
+                insert(AttendanceSyncReceipt)
+                .values(
+                    [
+                        {"school_id": school_id, "idempotency_key": key}
+                        for key in mutations
+                    ]
+                )
+                .on_conflict_do_nothing()
+                .returning(AttendanceSyncReceipt.idempotency_key)
+            )
+        )
+        for receipt in db.scalars(
+            select(AttendanceSyncReceipt).where(
+                AttendanceSyncReceipt.school_id == school_id,
+                AttendanceSyncReceipt.idempotency_key.in_(
+                    set(mutations) - claimed_keys
+                ),
+            )
+        ):
+            results[receipt.idempotency_key] = AttendanceSyncResult(
+                idempotency_key=receipt.idempotency_key,
+                outcome=AttendanceSyncOutcome(receipt.outcome),
+                attendance_id=receipt.attendance_id,
+                replayed=True,
+            )
+        mutations = {key: mutations[key] for key in claimed_keys}
+
+    # --- the latest change per (student_id, date) wins within the batch too
+    latest: dict[tuple[uuid.UUID, datetime.datetime], str] = {}
+    for key, mutation in sorted(
+        mutations.items(),
+        key=lambda item: item[1].client_timestamp,
+    ):
+        if mutation.student_id not in member_genders:
+            outcome = AttendanceSyncOutcome.STUDENT_NOT_IN_CLASSROOM
+        elif (
+            mutation.operation == AttendanceSyncOperation.UPSERT
+            and mutation.status is None
+        ):
+            outcome = AttendanceSyncOutcome.STATUS_REQUIRED
+        else:
+            day_key = (mutation.student_id, mutation.date)
+            superseded = latest.get(day_key)
+            if superseded:
+                results[superseded] = AttendanceSyncResult(
+                    idempotency_key=superseded, outcome=AttendanceSyncOutcome.STALE
+                )
+            latest[day_key] = key
+            continue
+        results[key] = AttendanceSyncResult(idempotency_key=key, outcome=outcome)
+
+    changes = AttendanceRollupChanges()
+    bitmap_changes = AttendanceBitmapChanges()
+    recount_days: set[datetime.date] = set()
+
+    if latest:
+        # --- the rows about to be overwritten or deleted, locked like in the
+        # --- roll call, and the newest deletion of each day
+        existing = {
+            (attendance.student_id, attendance.date): attendance
+            for attendance in db.scalars(
+                select(Attendance)
+                .where(tuple_(Attendance.student_id, Attendance.date).in_(latest))
+                .with_for_update()
+            )
+        }
+        deleted_at = {
+            (student_id, date): last_deleted_at
+            for student_id, date, last_deleted_at in db.execute(
+                select(
+                    AttendanceDeletion.student_id,
+                    AttendanceDeletion.date,
+                    func.max(AttendanceDeletion.recorded_at),
+                )
+                .where(
+                    tuple_(AttendanceDeletion.student_id, AttendanceDeletion.date).in_(
+                        latest
+                    )
+                )
+                .group_by(AttendanceDeletion.student_id, AttendanceDeletion.date)
+            )
+        }
+
+        upserts = []
+        for (student_id, date), key in latest.items():
+            mutation = mutations[key]
+            recorded_at = mutation.client_timestamp
+            attendance = existing.get((student_id, date))
+            newest_writes = []
+            if attendance:
+                newest_writes.append(attendance.recorded_at)
+            if (student_id, date) in deleted_at:
+                newest_writes.append(deleted_at[(student_id, date)])
+            if newest_writes and recorded_at < max(newest_writes):
+                results[key] = AttendanceSyncResult(
+                    idempotency_key=key,
+                    outcome=AttendanceSyncOutcome.STALE,
+                    attendance_id=attendance.id if attendance else None,
+                )
+                continue
+
+            if mutation.operation == AttendanceSyncOperation.UPSERT:
+                upserts.append(
+                    {
+                        "id": uuid.uuid4(),
+                        "date": date,
+                        "status": typing.cast(AttendanceStatus, mutation.status).value,
+                        "remarks": mutation.remarks,
+                        "student_id": student_id,
+                        "school_id": school_id,
+                        "classroom_id": classroom_id,
+                        "academic_term_id": body.academic_term_id,
+                        "recorded_at": recorded_at,
+                    }
+                )
+                continue
+
+            gender = member_genders[student_id]
+            if attendance:
+                changes.remove(
+                    attendance.school_id,
+                    attendance.classroom_id,
+                    attendance.date,
+                    attendance.status,
+                    gender,
+                )
+                bitmap_changes.clear(
+                    student_id,
+                    attendance.academic_term_id,
+                    attendance.school_id,
+                    attendance.classroom_id,
+                    attendance.date,
+                )
+                db.delete(attendance)
+            db.add(
+                AttendanceDeletion(
+                    attendance_id=attendance.id if attendance else None,
+                    date=date,
+                    student_id=student_id,
+                    school_id=school_id,
+                    classroom_id=classroom_id,
+                    recorded_at=recorded_at,
+                )
+            )
+            results[key] = AttendanceSyncResult(
+                idempotency_key=key,
+                outcome=AttendanceSyncOutcome.APPLIED,
+                attendance_id=attendance.id if attendance else None,
+            )
+
+        if upserts:
+            statement = insert(Attendance).values(upserts)
+            statement = statement.on_conflict_do_update(
+                index_elements=[Attendance.student_id, Attendance.date],
+                set_={
+                    "status": statement.excluded.status,
+                    "remarks": statement.excluded.remarks,
+                    "classroom_id": statement.excluded.classroom_id,
+                    "academic_term_id": statement.excluded.academic_term_id,
+                    "recorded_at": statement.excluded.recorded_at,
+                    "updated_at": func.now(),
+                    "sync_txid": func.txid_current(),
+                },
+                # --- a row inserted concurrently after the read above may be newer
+                where=Attendance.recorded_at <= statement.excluded.recorded_at,
+            ).returning(
+                Attendance.id,
+                Attendance.student_id,
+                Attendance.date,
+                literal_column("xmax = 0").label("inserted"),
+                Attendance.status,
+            )
+
+            written = {}
+            for attendance_id, student_id, date, inserted, new_status in db.execute(
+                statement
+            ):
+                written[(student_id, date)] = attendance_id
+                gender = member_genders[student_id]
+                attendance = existing.get((student_id, date))
+                bitmap_changes.mark(
+                    student_id,
+                    body.academic_term_id,
+                    school_id,
+                    classroom_id,
+                    date,
+                    new_status,
+                )
+                if not inserted:
+                    if attendance is None:
+                        # --- inserted by someone else after the read above
+                        recount_days.add(date.date())
+                        continue
+                    changes.remove(
+                        attendance.school_id,
+                        attendance.classroom_id,
+                        attendance.date,
+                        attendance.status,
+                        gender,
+                    )
+                    if attendance.academic_term_id != body.academic_term_id:
+                        bitmap_changes.clear(
+                            student_id,
+                            attendance.academic_term_id,
+                            attendance.school_id,
+                            attendance.classroom_id,
+                            date,
+                        )
+                changes.add(school_id, classroom_id, date, new_status, gender)
+
+            for row in upserts:
+                key = latest[(row["student_id"], row["date"])]
+                attendance_id = written.get((row["student_id"], row["date"]))
+                results[key] = AttendanceSyncResult(
+                    idempotency_key=key,
+                    outcome=(
+                        AttendanceSyncOutcome.APPLIED
+                        if attendance_id
+                        else AttendanceSyncOutcome.STALE
+                    ),
+                    attendance_id=attendance_id,
+                )
+
+    # --- the session does not autoflush, and a recount must not see the rows
+    # --- deleted above
+    db.flush()
+    apply_attendance_changes(
+        db, changes, recount_days=[(school_id, day) for day in recount_days]
+    )
+    apply_attendance_bitmap_changes(db, bitmap_changes)
+
+    if mutations:
+        db.execute(
+            update(AttendanceSyncReceipt),
+            [
+                {
+                    "school_id": school_id,
+                    "idempotency_key": key,
+                    "outcome": results[key].outcome.value,
+                    "attendance_id": results[key].attendance_id,
+                }
+                for key in mutations
+            ],
+        )
+
+    # --- core writes bypass the session events that track written schools
+    mark_school_data_written(db, [school_id])
+    db.commit()
+
+    pulled = pull_attendance_changes(db, classroom_id, body.cursor or 0)
+
+    return AttendanceSyncResponse(
+        results=[results[mutation.idempotency_key] for mutation in body.mutations],
+        attendances=[
+            attendance_to_dto(attendance) for attendance in pulled.attendances
+        ],
+        deletions=[
+            AttendanceDeletionResponse(
+                attendance_id=deletion.attendance_id,
+                student_id=deletion.student_id,
+                date=deletion.date,
+                recorded_at=deletion.recorded_at,
+            )
+            for deletion in pulled.deletions
+        ],
+        cursor=pulled.cursor,
+        has_more=pulled.has_more,
+    )
@@ -0,0 +1,200 @@
+import csv
+import datetime
+import enum
+import io
+import os
+import typing
+import zipfile
+from xml.sax.saxutils import escape
+
+from backend.attendance.attendance_models import AttendanceStatus
+
+ATTENDANCE_EXPORT_BATCH_SIZE = int(
+    os.environ.get("ATTENDANCE_EXPORT_BATCH_SIZE", "1000")
+)
+
+# --- flush the csv buffer to the client once it holds this many characters
+CSV_CHUNK_SIZE = 64 * 1024
+
+STATUS_CODES = {
+    AttendanceStatus.PRESENT.value: "P",
+    AttendanceStatus.ABSENT.value: "A",
+}
+
+REGISTER_HEADER = ["student_id", "nemis_number", "first_name", "last_name"]
+
+
+class ExportFormat(enum.Enum):
+    CSV = "csv"
+    XLSX = "xlsx"
+
+
+EXPORT_MEDIA_TYPES = {
+    ExportFormat.CSV: "text/csv",
+    ExportFormat.XLSX: "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+
+
+def register_header(days: list[datetime.date]) -> list[str]:
+    return [
+        *REGISTER_HEADER,
+        *(day.isoformat() for day in days),
+        "present",
+        "absent",
+    ]
+
+
+async def register_rows(
+    records: typing.AsyncIterator[typing.Any], days: list[datetime.date]
+) -> typing.AsyncIterator[list[str]]:
+    """
+    Pivots (student_id, nemis_number, first_name, last_name, date, status)
+    records, ordered by student, into one register row per student with a
+    P/A cell per day. Only the current student's row is held in memory.
+    """
+    day_columns = {day: index for index, day in enumerate(days)}
+    current_student = None
+    student: list[str] = []
+    cells: list[str] = []
+
+    def finish_row() -> list[str]:
+        return [
+            *student,
+            *cells,
+            str(cells.count(STATUS_CODES[AttendanceStatus.PRESENT.value])),
+            str(cells.count(STATUS_CODES[AttendanceStatus.ABSENT.value])),
+        ]
+
+    async for student_id, nemis_number, first_name, last_name, date, status in records:
+        if student_id != current_student:
+            if current_student is not None:
+                yield finish_row()
+            current_student = student_id
+            student = [str(student_id), nemis_number or "", first_name, last_name]
+            cells = [""] * len(days)
+
+        column = day_columns.get(date.date())
+        if column is not None:
+            cells[column] = STATUS_CODES.get(status) or status
+
+    if current_student is not None:
+        yield finish_row()
+
+
+async def stream_csv(
+    header: list[str], rows: typing.AsyncIterator[list[str]]
+) -> typing.AsyncIterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(header)
+
+    async for row in rows:
+        writer.writerow(row)
+        if buffer.tell() >= CSV_CHUNK_SIZE:
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+
+    yield buffer.getvalue().encode()
+
+
+_XLSX_PARTS = {
+    "[Content_Types].xml": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        "</Types>"
+    ),
+    "_rels/.rels": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="xl/workbook.xml"/>'
+        "</Relationships>"
+    ),
+    "xl/workbook.xml": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+        'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+        '<sheets><sheet name="Register" sheetId="1" r:id="rId1"/></sheets>'
+        "</workbook>"
+    ),
+    "xl/_rels/workbook.xml.rels": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" Target="worksheets/sheet1.xml"/>'
+        "</Relationships>"
+    ),
+}
+
+_XLSX_SHEET_START = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+    "<sheetData>"
+)
+_XLSX_SHEET_END = "</sheetData></worksheet>"
+
+
+def _xlsx_row(row: list[str]) -> bytes:
+    cells = "".join(
+        f'<c t="inlineStr"><is><t>{escape(value)}</t></is></c>' for value in row
+    )
+    return f"<row>{cells}</row>".encode()
+
+
+class _ZipChunks:
+    """
+    A write-only sink for zipfile; without seek/tell zipfile writes data
+    descriptors instead of seeking back, so the archive can be streamed.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.chunks: list[bytes] = []
+
+    def write(self, data: bytes) -> int:
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self.chunks)
+        self.chunks.clear()
+        return data
+
+
+async def stream_xlsx(
+    header: list[str], rows: typing.AsyncIterator[list[str]]
+) -> typing.AsyncIterator[bytes]:
+    """
+    A single-sheet workbook with inline strings, written row by row so memory
+    stays constant however many students are exported.
+    """
+    sink = _ZipChunks()
+    with zipfile.ZipFile(
+        typing.cast(typing.IO[bytes], sink), "w", zipfile.ZIP_DEFLATED
+    ) as archive:
+        for name, content in _XLSX_PARTS.items():
+            archive.writestr(name, content)
+        yield sink.drain()
+
+        with archive.open("xl/worksheets/sheet1.xml", "w") as sheet:
+            sheet.write(_XLSX_SHEET_START.encode())
+            sheet.write(_xlsx_row(header))
+            async for row in rows:
+                sheet.write(_xlsx_row(row))
+                if sink.chunks:
+                    yield sink.drain()
+            sheet.write(_XLSX_SHEET_END.encode())
+
+    yield sink.drain()
+
+
+EXPORT_WRITERS = {
+    ExportFormat.CSV: stream_csv,
+    ExportFormat.XLSX: stream_xlsx,
+}
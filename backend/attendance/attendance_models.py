@@ -1,5 +1,15 @@
 import datetime
-from sqlalchemy import String, DateTime, ForeignKey, UUID, func
+from sqlalchemy import (
+    BigInteger,
+    Date,
+    String,
+    DateTime,
+    ForeignKey,
+    Index,
+    LargeBinary,
+    UUID,
+    func,
+)
 from sqlalchemy.orm import relationship, mapped_column, Mapped
 import uuid
 from backend.database.base import Base
@@ -23,6 +33,7 @@ class Attendance(Base):
     __tablename__ = "attendances"
 
     id: Mapped[uuid.UUID] = mapped_column(UUID, primary_key=True, default=uuid.uuid4)
+    # --- midnight of the day marked, the write DTOs truncate it
     date: Mapped[datetime.datetime] = mapped_column()
     status: Mapped[str] = mapped_column()  # Present, Absent, Late, etc.
     remarks: Mapped[typing.Optional[str]] = mapped_column(String)
@@ -33,6 +44,18 @@ class Attendance(Base):
     updated_at: Mapped[datetime.datetime | None] = mapped_column(
         DateTime, onupdate=func.now(), nullable=True
     )
+    # --- when the mark was taken: the device clock for synced writes, the
+    # --- server clock otherwise; last writer wins on (student_id, date)
+    recorded_at: Mapped[datetime.datetime] = mapped_column(
+        DateTime, default=func.now(), onupdate=func.now(), nullable=False
+    )
+    # --- the writing transaction, sync clients pull rows past their cursor
+    sync_txid: Mapped[int] = mapped_column(
+        BigInteger,
+        default=func.txid_current(),
+        onupdate=func.txid_current(),
+        nullable=False,
+    )
 
     student_id: Mapped[uuid.UUID] = mapped_column(UUID, ForeignKey("students.id"))
     student: Mapped["Student"] = relationship("Student", back_populates="attendances")
@@ -52,6 +75,14 @@ class Attendance(Base):
         "AcademicTerm", back_populates="attendances"
     )
 
+    __table_args__ = (
+        Index("ix_attendances_school_id_date", "school_id", "date"),
+        Index("ix_attendances_classroom_id_date", "classroom_id", "date"),
+        # --- one attendance per student per day
+        Index("uq_attendances_student_id_date", "student_id", "date", unique=True),
+        Index("ix_attendances_classroom_id_sync_txid", "classroom_id", "sync_txid"),
+    )
+
     def __init__(
         self,
         date: datetime.datetime,
@@ -70,3 +101,141 @@ class Attendance(Base):
         self.classroom_id = classroom_id
         self.academic_term_id = academic_term_id
         self.remarks = remarks
+
+
+class AttendanceDailyRollup(Base):
+    """
+    Attendance counts per classroom per day, kept in step with `attendances`
+    by the attendance handlers so dashboards sum days instead of rows.
+    """
+
+    __tablename__ = "attendance_daily_rollups"
+
+    school_id: Mapped[uuid.UUID] = mapped_column(
+        UUID, ForeignKey("schools.id"), primary_key=True
+    )
+    classroom_id: Mapped[uuid.UUID] = mapped_column(
+        UUID, ForeignKey("classrooms.id"), primary_key=True
+    )
+    date: Mapped[datetime.date] = mapped_column(Date, primary_key=True)
+
+    present_total: Mapped[int] = mapped_column(default=0, nullable=False)
+    present_male: Mapped[int] = mapped_column(default=0, nullable=False)
+    present_female: Mapped[int] = mapped_column(default=0, nullable=False)
+    absent_total: Mapped[int] = mapped_column(default=0, nullable=False)
+    absent_male: Mapped[int] = mapped_column(default=0, nullable=False)
+    absent_female: Mapped[int] = mapped_column(default=0, nullable=False)
+
+    __table_args__ = (
+        Index("ix_attendance_daily_rollups_school_id_date", "school_id", "date"),
+    )
+
+
+class AttendanceTermBitmap(Base):
+    """
+    One student's attendance over an academic term as two bitmaps, bit n
+    being day n counted from the term's start date (little-endian: byte
+    n // 8, bit n % 8). A day with neither bit set had no attendance taken.
+    """
+
+    __tablename__ = "attendance_term_bitmaps"
+
+    student_id: Mapped[uuid.UUID] = mapped_column(
+        UUID, ForeignKey("students.id"), primary_key=True
+    )
+    academic_term_id: Mapped[uuid.UUID] = mapped_column(
+        UUID, ForeignKey("academic_terms.id"), primary_key=True
+    )
+    school_id: Mapped[uuid.UUID] = mapped_column(UUID, ForeignKey("schools.id"))
+    # --- the classroom of the student's latest attendance in the term
+    classroom_id: Mapped[uuid.UUID] = mapped_column(UUID, ForeignKey("classrooms.id"))
+
+    present_days: Mapped[bytes] = mapped_column(LargeBinary, default=b"")
+    absent_days: Mapped[bytes] = mapped_column(LargeBinary, default=b"")
+
+    __table_args__ = (
+        Index(
+            "ix_attendance_term_bitmaps_school_id_academic_term_id",
+            "school_id",
+            "academic_term_id",
+        ),
+    )
+
+
+class AttendanceDeletion(Base):
+    """
+    A tombstone per deleted attendance, so sync clients pull deletions too
+    and an older offline write cannot bring a deleted mark back.
+    """
+
+    __tablename__ = "attendance_deletions"
+
+    id: Mapped[uuid.UUID] = mapped_column(UUID, primary_key=True, default=uuid.uuid4)
+    # --- None when a synced delete found no row to delete
+    attendance_id: Mapped[typing.Optional[uuid.UUID]] = mapped_column(
+        UUID, nullable=True
+    )
+    # --- midnight of the day, like attendances.date
+    date: Mapped[datetime.datetime] = mapped_column()
+    recorded_at: Mapped[datetime.datetime] = mapped_column(
+        DateTime, default=func.now(), nullable=False
+    )
+    sync_txid: Mapped[int] = mapped_column(
+        BigInteger, default=func.txid_current(), nullable=False
+    )
+
+    student_id: Mapped[uuid.UUID] = mapped_column(UUID, ForeignKey("students.id"))
+    school_id: Mapped[uuid.UUID] = mapped_column(UUID, ForeignKey("schools.id"))
+    classroom_id: Mapped[uuid.UUID] = mapped_column(UUID, ForeignKey("classrooms.id"))
+
+    __table_args__ = (
+        Index(
+            "ix_attendance_deletions_classroom_id_sync_txid",
+            "classroom_id",
+            "sync_txid",
+        ),
+        Index("ix_attendance_deletions_student_id_date", "student_id", "date"),
+    )
+
+    def __init__(
+        self,
+        attendance_id: typing.Optional[uuid.UUID],
+        date: datetime.datetime,
+        student_id: uuid.UUID,
+        school_id: uuid.UUID,
+        classroom_id: uuid.UUID,
+        recorded_at: typing.Optional[datetime.datetime] = None,
+    ):
+        super().__init__()
+        self.attendance_id = attendance_id
+        self.date = date
+        self.student_id = student_id
+        self.school_id = school_id
+        self.classroom_id = classroom_id
+        if recorded_at is not None:
+            self.recorded_at = recorded_at
+
+
+class AttendanceSyncReceipt(Base):
+    """
+    The outcome of every synced attendance mutation by its client
+    idempotency key, so a retried batch replays outcomes instead of
+    applying twice.
+    """
+
+    __tablename__ = "attendance_sync_receipts"
+
+    school_id: Mapped[uuid.UUID] = mapped_column(
+        UUID, ForeignKey("schools.id"), primary_key=True
+    )
+    idempotency_key: Mapped[str] = mapped_column(String, primary_key=True)
+    # --- None until the mutation has been applied in the same transaction
+    outcome: Mapped[typing.Optional[str]] = mapped_column(String, nullable=True)
+    attendance_id: Mapped[typing.Optional[uuid.UUID]] = mapped_column(
+        UUID, nullable=True
+    )
+    created_at: Mapped[datetime.datetime] = mapped_column(
+        DateTime, default=func.now(), nullable=False
+    )
+
+    __table_args__ = (Index("ix_attendance_sync_receipts_created_at", "created_at"),)
@@ -0,0 +1,228 @@
+import datetime
+import hashlib
+import typing
+import uuid
+from collections import Counter, defaultdict
+from sqlalchemy import CursorResult, Date, and_, cast, delete, func, select, text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from backend.attendance.attendance_models import (
+    Attendance,
+    AttendanceDailyRollup,
+    AttendanceStatus,
+)
+from backend.student.student_model import Gender, Student
+
+ROLLUP_COUNTERS = [
+    "present_total",
+    "present_male",
+    "present_female",
+    "absent_total",
+    "absent_male",
+    "absent_female",
+]
+
+RollupKey = tuple[uuid.UUID, uuid.UUID, datetime.date]
+RollupDay = tuple[uuid.UUID, datetime.date]
+
+
+def rollup_counters(status: str, gender: typing.Optional[str]) -> list[str]:
+    """
+    The counters one attendance row contributes to.
+    """
+    if status == AttendanceStatus.PRESENT.value:
+        prefix = "present"
+    elif status == AttendanceStatus.ABSENT.value:
+        prefix = "absent"
+    else:
+        return []
+
+    counters = [f"{prefix}_total"]
+    if gender in (Gender.MALE.value, Gender.FEMALE.value):
+        counters.append(f"{prefix}_{gender}")
+    return counters
+
+
+class AttendanceRollupChanges:
+    """
+    Collects +1/-1 deltas for the attendance rows a request writes, so they
+    reach `attendance_daily_rollups` in one upsert inside the same
+    transaction as the attendance writes.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.deltas: defaultdict[RollupKey, Counter[str]] = defaultdict(Counter)
+
+    def add(
+        self,
+        school_id: uuid.UUID,
+        classroom_id: uuid.UUID,
+        date: datetime.datetime,
+        status: str,
+        gender: typing.Optional[str],
+        delta: int = 1,
+    ) -> None:
+        key = (school_id, classroom_id, date.date())
+        for counter in rollup_counters(status, gender):
+            self.deltas[key][counter] += delta
+
+    def remove(
+        self,
+        school_id: uuid.UUID,
+        classroom_id: uuid.UUID,
+        date: datetime.datetime,
+        status: str,
+        gender: typing.Optional[str],
+    ) -> None:
+        self.add(school_id, classroom_id, date, status, gender, delta=-1)
+
+
+def rollup_day_lock_key(school_id: uuid.UUID, date: datetime.date) -> int:
+    # --- 64-bit advisory lock key, a collision only serializes two days
+    digest = hashlib.blake2b(
+        f"attendance-rollups/{school_id}/{date}".encode(), digest_size=8
+    ).digest()
+    return int.from_bytes(digest, "big", signed=True)
+
+
+def apply_attendance_changes(
+    db: Session,
+    changes: AttendanceRollupChanges,
+    recount_days: typing.Iterable[RollupDay] = (),
+) -> None:
+    """
+    Applies the deltas, except on `recount_days`: (school_id, date) days
+    whose old counts are unknown, recounted from `attendances` instead.
+
+    Every day written is advisory-locked until commit, shared for deltas and
+    exclusive for a recount, in one sorted pass so no transaction upgrades a
+    lock or takes them out of order. A recount thus waits for the deltas in
+    flight on its day, and later deltas apply on top of it.
+    """
+    recount_days = set(recount_days)
+
+    # --- sorted so concurrent writers lock the rollup rows in the same order
+    rows = [
+        {
+            "school_id": school_id,
+            "classroom_id": classroom_id,
+            "date": date,
+            **{counter: deltas[counter] for counter in ROLLUP_COUNTERS},
+        }
+        for (school_id, classroom_id, date), deltas in sorted(
+            changes.deltas.items(), key=lambda item: tuple(map(str, item[0]))
+        )
+        if any(deltas.values()) and (school_id, date) not in recount_days
+    ]
+
+    day_locks = {(row["school_id"], row["date"]): False for row in rows}
+    day_locks.update({day: True for day in recount_days})
+    for (school_id, date), exclusive in sorted(
+        day_locks.items(), key=lambda item: tuple(map(str, item[0]))
+    ):
+        lock = (
+            func.pg_advisory_xact_lock
+            if exclusive
+            else func.pg_advisory_xact_lock_shared
+        )
+        db.execute(select(lock(rollup_day_lock_key(school_id, date))))
+
+    if rows:
+        statement = insert(AttendanceDailyRollup).values(rows)
+        statement = statement.on_conflict_do_update(
+            index_elements=[
+                AttendanceDailyRollup.school_id,
+                AttendanceDailyRollup.classroom_id,
+                AttendanceDailyRollup.date,
+            ],
+            set_={
+                counter: getattr(AttendanceDailyRollup, counter)
+                + statement.excluded[counter]
+                for counter in ROLLUP_COUNTERS
+            },
+        )
+        db.execute(statement)
+
+    for school_id, date in sorted(recount_days, key=lambda day: tuple(map(str, day))):
+        _recount_attendance_rollups(
+            db,
+            school_id=school_id,
+            start_date=date,
+            end_date=date + datetime.timedelta(days=1),
+        )
+
+
+def rebuild_attendance_rollups(
+    db: Session,
+    school_id: typing.Optional[uuid.UUID] = None,
+    start_date: typing.Optional[datetime.date] = None,
+    end_date: typing.Optional[datetime.date] = None,
+) -> int:
+    """
+    Recomputes the rollups of [start_date, end_date) from `attendances`, for
+    the CLI and backfills. Holds an EXCLUSIVE lock on the rollup table until
+    the caller commits, so handlers applying deltas meanwhile wait and then
+    apply on top of the rebuilt rows. Request handlers recount single days
+    through apply_attendance_changes instead.
+    """
+    db.execute(text("LOCK TABLE attendance_daily_rollups IN EXCLUSIVE MODE"))
+    return _recount_attendance_rollups(db, school_id, start_date, end_date)
+
+
+def _recount_attendance_rollups(
+    db: Session,
+    school_id: typing.Optional[uuid.UUID],
+    start_date: typing.Optional[datetime.date],
+    end_date: typing.Optional[datetime.date],
+) -> int:
+    day = cast(Attendance.date, Date)
+    rollup_filters = []
+    attendance_filters = []
+    if school_id is not None:
+        rollup_filters.append(AttendanceDailyRollup.school_id == school_id)
+        attendance_filters.append(Attendance.school_id == school_id)
+    # --- on the raw column, so ix_attendances_school_id_date bounds the scan
+    if start_date is not None:
+        rollup_filters.append(AttendanceDailyRollup.date >= start_date)
+        attendance_filters.append(
+            Attendance.date >= datetime.datetime.combine(start_date, datetime.time.min)
+        )
+    if end_date is not None:
+        rollup_filters.append(AttendanceDailyRollup.date < end_date)
+        attendance_filters.append(
+            Attendance.date < datetime.datetime.combine(end_date, datetime.time.min)
+        )
+
+    db.execute(delete(AttendanceDailyRollup).where(*rollup_filters))
+
+    def count(status: AttendanceStatus, gender: typing.Optional[Gender] = None):
+        condition = Attendance.status == status.value
+        if gender is not None:
+            condition = and_(condition, Student.gender == gender.value)
+        return func.count().filter(condition)
+
+    counts = select(
+        Attendance.school_id,
+        Attendance.classroom_id,
+        day,
+        count(AttendanceStatus.PRESENT),
+        count(AttendanceStatus.PRESENT, Gender.MALE),
+        count(AttendanceStatus.PRESENT, Gender.FEMALE),
+        count(AttendanceStatus.ABSENT),
+        count(AttendanceStatus.ABSENT, Gender.MALE),
+        count(AttendanceStatus.ABSENT, Gender.FEMALE),
+    )
+    counts = (
+        counts.join(Student, Student.id == Attendance.student_id)
+        .where(*attendance_filters)
+        .group_by(Attendance.school_id, Attendance.classroom_id, day)
+    )
+
+    result = db.execute(
+        insert(AttendanceDailyRollup).from_select(
+            ["school_id", "classroom_id", "date", *ROLLUP_COUNTERS], counts
+        )
+    )
+    return typing.cast(CursorResult, result).rowcount
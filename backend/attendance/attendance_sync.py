@@ -0,0 +1,187 @@
+import datetime
+import os
+import typing
+import uuid
+from dataclasses import dataclass
+from pydantic import AfterValidator
+from sqlalchemy import CursorResult, delete, func, select
+from sqlalchemy.orm import Session
+
+from backend.attendance.attendance_models import (
+    Attendance,
+    AttendanceDeletion,
+    AttendanceSyncReceipt,
+)
+from backend.database.database import SQLAlchemySessionLocal
+from backend.periodic_tasks import PeriodicTask, register_periodic_task
+
+ATTENDANCE_SYNC_MAX_MUTATIONS = int(
+    os.environ.get("ATTENDANCE_SYNC_MAX_MUTATIONS", "500")
+)
+# --- keep above ATTENDANCE_SYNC_MAX_MUTATIONS so one batch fits in a page
+ATTENDANCE_SYNC_PULL_LIMIT = int(os.environ.get("ATTENDANCE_SYNC_PULL_LIMIT", "1000"))
+ATTENDANCE_SYNC_RECEIPT_TTL_DAYS = float(
+    os.environ.get("ATTENDANCE_SYNC_RECEIPT_TTL_DAYS", "30")
+)
+ATTENDANCE_SYNC_RECEIPT_SWEEP_INTERVAL_SECONDS = float(
+    os.environ.get("ATTENDANCE_SYNC_RECEIPT_SWEEP_INTERVAL_SECONDS", "3600")
+)
+ATTENDANCE_SYNC_RECEIPT_SWEEP_BATCH_SIZE = int(
+    os.environ.get("ATTENDANCE_SYNC_RECEIPT_SWEEP_BATCH_SIZE", "1000")
+)
+
+
+def to_utc_naive(timestamp: datetime.datetime) -> datetime.datetime:
+    # --- the attendance columns are naive UTC, devices send their offset
+    if timestamp.tzinfo is None:
+        return timestamp
+    return timestamp.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+
+
+UtcNaiveDatetime = typing.Annotated[datetime.datetime, AfterValidator(to_utc_naive)]
+
+
+def to_attendance_day(timestamp: datetime.datetime) -> datetime.datetime:
+    # --- the school day as the client wrote it: converting to UTC first would
+    # --- move an early morning mark east of UTC onto the day before
+    return datetime.datetime.combine(timestamp.date(), datetime.time.min)
+
+
+# --- for every attendance write path: `date` holds midnight of the day, so
+# --- (student_id, date) is one row per student per day whichever endpoint
+# --- and time of day carried the mark
+AttendanceDay = typing.Annotated[datetime.datetime, AfterValidator(to_attendance_day)]
+
+
+@dataclass
+class AttendanceChanges:
+    attendances: list[Attendance]
+    deletions: list[AttendanceDeletion]
+    cursor: int
+    has_more: bool
+
+
+def pull_attendance_changes(
+    db: Session, classroom_id: uuid.UUID, cursor: int
+) -> AttendanceChanges:
+    """
+    The classroom's attendances and deletions written by transactions
+    numbered `cursor` or later, oldest first.
+
+    The next cursor is the oldest transaction still running when the pull
+    started, not the newest one seen: a transaction that began earlier but
+    commits later is then still picked up by the next pull. Rows may be
+    pulled twice, which last-writer-wins makes harmless.
+    """
+    snapshot_xmin = db.scalar(
+        select(func.txid_snapshot_xmin(func.txid_current_snapshot()))
+    )
+    assert snapshot_xmin is not None
+
+    attendances = list(
+        db.scalars(
+            select(Attendance)
+            .where(
+                Attendance.classroom_id == classroom_id,
+                Attendance.sync_txid >= cursor,
+            )
+            .order_by(Attendance.sync_txid, Attendance.id)
+            .limit(ATTENDANCE_SYNC_PULL_LIMIT + 1)
+        )
+    )
+
+    next_cursor = snapshot_xmin
+    until_txid = None
+    if len(attendances) > ATTENDANCE_SYNC_PULL_LIMIT:
+        # --- never split one transaction's rows across pages
+        until_txid = attendances[ATTENDANCE_SYNC_PULL_LIMIT].sync_txid
+        attendances = [
+            attendance
+            for attendance in attendances
+            if attendance.sync_txid < until_txid
+        ]
+        if not attendances:
+            attendances = list(
+                db.scalars(
+                    select(Attendance)
+                    .where(
+                        Attendance.classroom_id == classroom_id,
+                        Attendance.sync_txid == until_txid,
+                    )
+                    .order_by(Attendance.id)
+                )
+            )
+            until_txid += 1
+        next_cursor = min(snapshot_xmin, until_txid)
+
+    deletions_query = (
+        select(AttendanceDeletion)
+        .where(
+            AttendanceDeletion.classroom_id == classroom_id,
+            AttendanceDeletion.sync_txid >= cursor,
+        )
+        .order_by(AttendanceDeletion.sync_txid, AttendanceDeletion.id)
+    )
+    if until_txid is not None:
+        deletions_query = deletions_query.where(
+            AttendanceDeletion.sync_txid < until_txid
+        )
+
+    return AttendanceChanges(
+        attendances=attendances,
+        deletions=list(db.scalars(deletions_query)),
+        cursor=next_cursor,
+        has_more=until_txid is not None,
+    )
+
+
+def sweep_attendance_sync_receipts(
+    batch_size: int = ATTENDANCE_SYNC_RECEIPT_SWEEP_BATCH_SIZE,
+) -> int:
+    """
+    Forgets idempotency keys older than ATTENDANCE_SYNC_RECEIPT_TTL_DAYS, a
+    device retrying a batch that old applies it again under last-writer-wins.
+    """
+    deleted = 0
+    expire_before = datetime.datetime.utcnow() - datetime.timedelta(
+        days=ATTENDANCE_SYNC_RECEIPT_TTL_DAYS
+    )
+
+    while True:
+        expired_receipts = (
+            select(
+                AttendanceSyncReceipt.school_id, AttendanceSyncReceipt.idempotency_key
+            )
+            .where(AttendanceSyncReceipt.created_at < expire_before)
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+            .subquery()
+        )
+
+        with SQLAlchemySessionLocal() as db:
+            result = typing.cast(
+                CursorResult,
+                db.execute(
+                    delete(AttendanceSyncReceipt)
+                    .where(
+                        AttendanceSyncReceipt.school_id == expired_receipts.c.school_id,
+                        AttendanceSyncReceipt.idempotency_key
+                        == expired_receipts.c.idempotency_key,
+                    )
+                    .execution_options(synchronize_session=False)
+                ),
+            )
+            db.commit()
+
+        deleted += result.rowcount
+        if result.rowcount < batch_size:
+            return deleted
+
+
+register_periodic_task(
+    PeriodicTask(
+        name="sweep-attendance-sync-receipts",
+        interval_seconds=ATTENDANCE_SYNC_RECEIPT_SWEEP_INTERVAL_SECONDS,
+        run=sweep_attendance_sync_receipts,
+    )
+)
@@ -0,0 +1,47 @@
+"""
+Backfills or repairs attendance_daily_rollups and attendance_term_bitmaps
+from the attendances table; the date range only limits the daily rollups:
+
+    python -m backend.attendance.rebuild_attendance_rollups \\
+        [--school-id <uuid>] [--start-date 2024-01-01] [--end-date 2025-01-01]
+"""
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from backend.database.all_models import get_all_models
+
+get_all_models()
+
+import argparse
+import datetime
+import uuid
+
+from backend.attendance.attendance_bitmaps import rebuild_attendance_bitmaps
+from backend.attendance.attendance_rollups import rebuild_attendance_rollups
+from backend.database.database import SQLAlchemySessionLocal
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--school-id", type=uuid.UUID)
+    parser.add_argument("--start-date", type=datetime.date.fromisoformat)
+    parser.add_argument("--end-date", type=datetime.date.fromisoformat)
+    args = parser.parse_args()
+
+    with SQLAlchemySessionLocal() as db:
+        rows = rebuild_attendance_rollups(
+            db,
+            school_id=args.school_id,
+            start_date=args.start_date,
+            end_date=args.end_date,
+        )
+        rebuild_attendance_bitmaps(db, school_id=args.school_id)
+        db.commit()
+
+    print(f"rebuilt {rows} attendance rollup rows")
+
+
+if __name__ == "__main__":
+    main()
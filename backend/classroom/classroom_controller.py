@@ -2,16 +2,21 @@ import datetime
 import uuid
 import enum
 import typing
-from sqlalchemy import desc, asc
 from fastapi import APIRouter, HTTPException, status, Query, Depends
 from pydantic import BaseModel
 from backend.database.database import DatabaseDependency
-from backend.user.user_models import RoleType, User
-from backend.user.user_authentication import UserAuthenticationContextDependency
+from backend.database.replica_database import ReadOnlyDatabaseDependency
+from backend.user.user_models import RoleType
+from backend.user.user_authentication import AuthPrincipalDependency
 from backend.teacher.teacher_model import ClassTeacherAssociation, Teacher
 from backend.classroom.classroom_model import Classroom
 from backend.teacher.teacher_schemas import TeacherResponse, to_teacher_dto
-from backend.paginated_response import PaginatedResponse
+from backend.cursor_pagination import Keyset
+from backend.paginated_response import (
+    CountMode,
+    PaginatedResponse,
+    fetch_query_page,
+)
 
 router = APIRouter()
 
@@ -64,26 +69,25 @@ def classroom_to_dto(classroom: Classroom) -> classRoomResponse:
 
 @router.get("/classrooms/by-school-id/list")
 def school_classrooms(
-    db: DatabaseDependency,
-    auth_context: UserAuthenticationContextDependency,
+    db: ReadOnlyDatabaseDependency,
+    auth_context: AuthPrincipalDependency,
     page: int = Query(1, ge=1),
     limit: int = Query(10, ge=1),
     order_field: typing.Optional[ClassroomSortableFields] = None,
     order_direction: typing.Optional[OrderBy] = None,
+    cursor: typing.Optional[str] = None,
+    count_mode: CountMode = CountMode.EXACT,
     filters: ClassroomFilterParams = Depends(),
 ):
-    user = db.query(User).filter(User.id == auth_context.user_id).first()
-    if not user:
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN)
 
     if not (
-        user.has_role_type(RoleType.SCHOOL_ADMIN)
-        or user.has_role_type(RoleType.CLASS_TEACHER)
-        or user.has_role_type(RoleType.TEACHER)
+        auth_context.has_role_type(RoleType.SCHOOL_ADMIN)
+        or auth_context.has_role_type(RoleType.CLASS_TEACHER)
+        or auth_context.has_role_type(RoleType.TEACHER)
     ):
         raise HTTPException(status_code=403, detail="permission-denied")
 
-    query = db.query(Classroom).filter(Classroom.school_id == user.school_id)
+    query = db.query(Classroom).filter(Classroom.school_id == auth_context.school_id)
 
     if filters.grade_level is not None:
         query = query.filter(Classroom.grade_level == filters.grade_level)
@@ -107,25 +111,23 @@ def school_classrooms(
     if filters.created_before:
         query = query.filter(Classroom.created_at <= filters.created_before)
 
-    total_count = query.count()
-
-    if order_field and order_direction:
-        sort_column = getattr(Classroom, order_field.value)
-        if order_direction == OrderBy.DESC:
-            query = query.order_by(desc(sort_column))
-        else:
-            query = query.order_by(asc(sort_column))
-    else:
-        query = query.order_by(asc(Classroom.name))
+    keyset = Keyset.from_order(
+        Classroom, order_field, order_direction, default=[(Classroom.name, False)]
+    )
+    page_query = keyset.apply(query, cursor)
+    if not cursor:
+        page_query = page_query.offset((page - 1) * limit)
 
-    offset = (page - 1) * limit
-    classrooms = query.offset(offset).limit(limit).all()
+    classrooms, total_count = fetch_query_page(
+        query, page_query, limit, count_mode, auth_context.school_id
+    )
 
     return PaginatedResponse[classRoomResponse](
         total=total_count,
         page=page,
         limit=limit,
         data=[classroom_to_dto(classroom) for classroom in classrooms],
+        next_cursor=keyset.next_cursor(classrooms, limit),
     )
 
 
@@ -136,14 +138,11 @@ class classTeacherAssociation(BaseModel):
 @router.post("/classroom/{classrom_id}/teachers/{teacher_id}/add")
 def assign_teacher_to_classroom(
     db: DatabaseDependency,
-    auth_context: UserAuthenticationContextDependency,
+    auth_context: AuthPrincipalDependency,
     teacher_id: uuid.UUID,
     classroom_id: uuid.UUID,
     body: classTeacherAssociation,
 ):
-    user = db.query(User).filter(User.id == auth_context.user_id).first()
-    if not user:
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN)
 
     classroom = db.query(Classroom).filter(Classroom.id == classroom_id).first()
     if not classroom:
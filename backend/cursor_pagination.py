@@ -0,0 +1,154 @@
+import base64
+import binascii
+import datetime
+import decimal
+import enum
+import json
+import typing
+import uuid
+from fastapi import HTTPException, status
+from sqlalchemy import ColumnElement, Select, and_, false, or_, true
+from sqlalchemy.orm import InstrumentedAttribute, Query
+
+QueryT = typing.TypeVar("QueryT", Select, Query)
+
+
+def _to_json_value(value: typing.Any) -> typing.Any:
+    if isinstance(value, (datetime.datetime, datetime.date)):
+        return value.isoformat()
+    if isinstance(value, (uuid.UUID, decimal.Decimal)):
+        return str(value)
+    if isinstance(value, enum.Enum):
+        return value.value
+    return value
+
+
+def _from_json_value(column: InstrumentedAttribute, value: typing.Any) -> typing.Any:
+    if value is None:
+        return None
+
+    python_type = column.type.python_type
+    if python_type is datetime.datetime:
+        return datetime.datetime.fromisoformat(value)
+    if python_type is datetime.date:
+        return datetime.date.fromisoformat(value)
+    if python_type in (uuid.UUID, decimal.Decimal):
+        return python_type(value)
+    return value
+
+
+class Keyset:
+    """
+    Orders a list query by its sort columns plus the primary key, and
+    continues after the last row of the previous page instead of skipping
+    rows with OFFSET. The cursor handed to clients is opaque: the ordering
+    and the last row's sort values, base64 encoded.
+    """
+
+    def __init__(
+        self,
+        columns: list[tuple[InstrumentedAttribute, bool]],
+        id_column: InstrumentedAttribute,
+    ):
+        super().__init__()
+        # --- (column, descending), the id keeps the order total
+        self.columns = [*columns, (id_column, False)]
+        self.ordering = ",".join(
+            f"{column.key}:{'desc' if descending else 'asc'}"
+            for column, descending in self.columns
+        )
+
+    @classmethod
+    def from_order(
+        cls,
+        model: typing.Any,
+        order_field: typing.Optional[enum.Enum],
+        order_direction: typing.Optional[enum.Enum],
+        default: typing.Optional[list[tuple[InstrumentedAttribute, bool]]] = None,
+    ) -> "Keyset":
+        """
+        Accepts the SortableFields / OrderBy enums of the list endpoints.
+        """
+        if order_field and order_direction:
+            columns = [
+                (getattr(model, order_field.value), order_direction.value == "desc")
+            ]
+        else:
+            columns = default or []
+
+        return cls(columns, model.id)
+
+    def order_by(self) -> list[ColumnElement]:
+        order_by = []
+        for column, descending in self.columns:
+            if not getattr(column.expression, "nullable", True):
+                order_by.append(column.desc() if descending else column.asc())
+            elif descending:
+                order_by.append(column.desc().nulls_first())
+            else:
+                order_by.append(column.asc().nulls_last())
+        return order_by
+
+    def encode_cursor(self, row: typing.Any) -> str:
+        payload = {
+            "o": self.ordering,
+            "v": [
+                _to_json_value(getattr(row, column.key)) for column, _ in self.columns
+            ],
+        }
+        return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+
+    def decode_cursor(self, cursor: str) -> list[typing.Any]:
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+            if payload["o"] != self.ordering or len(payload["v"]) != len(self.columns):
+                raise ValueError()
+
+            return [
+                _from_json_value(column, value)
+                for (column, _), value in zip(self.columns, payload["v"])
+            ]
+        except (binascii.Error, UnicodeDecodeError, KeyError, TypeError, ValueError):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST, detail="invalid-cursor"
+            )
+
+    def after(self, cursor: str) -> ColumnElement[bool]:
+        """
+        Rows that sort after the cursor. Expanded into (a > x) OR (a = x AND
+        b > y) ... rather than a row comparison so every column can have its
+        own direction; NULLs sort last ascending and first descending, the
+        Postgres default, which order_by spells out.
+        """
+        values = self.decode_cursor(cursor)
+        conditions = []
+        equal_so_far: list[ColumnElement[bool]] = []
+
+        for (column, descending), value in zip(self.columns, values):
+            if value is None:
+                beyond = column.is_not(None) if descending else false()
+                equal = column.is_(None)
+            elif descending:
+                beyond = column < value
+                equal = column == value
+            else:
+                beyond = column > value
+                if getattr(column.expression, "nullable", True):
+                    beyond = or_(beyond, column.is_(None))
+                equal = column == value
+
+            conditions.append(and_(*equal_so_far, beyond))
+            equal_so_far.append(equal)
+
+        return or_(*conditions) if conditions else true()
+
+    def apply(self, query: QueryT, cursor: typing.Optional[str] = None) -> QueryT:
+        query = query.order_by(*self.order_by())
+        if cursor:
+            query = query.filter(self.after(cursor))
+        return query
+
+    def next_cursor(
+        self, rows: typing.Sequence[typing.Any], limit: int
+    ) -> typing.Optional[str]:
+        return self.encode_cursor(rows[-1]) if len(rows) == limit else None
@@ -12,6 +12,7 @@ from backend.user.user_models import (
 from backend.school.school_model import (
     School,
     SchoolParent,
+    SchoolCounter,
     SchoolParentAssociation,
     SchoolStudentAssociation,
 )
@@ -29,7 +30,13 @@ from backend.teacher.teacher_model import (
     ClassTeacherAssociation,
 )
 from backend.payment.payment_model import Payment, PaymentUserAssociation
-from backend.attendance.attendance_models import Attendance
+from backend.attendance.attendance_models import (
+    Attendance,
+    AttendanceDailyRollup,
+    AttendanceDeletion,
+    AttendanceSyncReceipt,
+    AttendanceTermBitmap,
+)
 from backend.classroom.classroom_model import Classroom
 from backend.academic_term.academic_term_model import AcademicTerm
 from backend.module.module_model import Module, ModuleEnrollment
@@ -37,6 +44,8 @@ from backend.exam.exam_model import Exam
 from backend.exam.exam_results.exam_result_model import ExamResult
 from backend.calendar_events.calendar_events_model import CalendarEvent
 from backend.timetable.timetable_model import TimeSlot, Timetable
+from backend.email_service.email_outbox_model import EmailOutbox
+from backend.database.cache_invalidation_model import CacheInvalidation
 
 
 def get_all_models() -> list[Type[Base]]:
@@ -52,11 +61,16 @@ def get_all_models() -> list[Type[Base]]:
         Module,
         ModuleEnrollment,
         Attendance,
+        AttendanceDailyRollup,
+        AttendanceTermBitmap,
+        AttendanceDeletion,
+        AttendanceSyncReceipt,
         AcademicTerm,
         Exam,
         ExamResult,
         SchoolParentAssociation,
         SchoolStudentAssociation,
+        SchoolCounter,
         Inventory,
         File,
         Payment,
@@ -73,4 +87,6 @@ def get_all_models() -> list[Type[Base]]:
         TimeSlot,
         Timetable,
         CalendarEvent,
+        EmailOutbox,
+        CacheInvalidation,
     ]
@@ -2,25 +2,40 @@ from typing import Annotated
 from fastapi import Depends
 from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 
-from backend.database.database import DATABASE_URL
-
-
-AsyncSQLAlchemyEngine = create_async_engine(DATABASE_URL)
+from backend.database.database_constants import (
+    ASYNC_DATABASE_URL,
+    DATABASE_MAX_OVERFLOW,
+    DATABASE_POOL_PRE_PING,
+    DATABASE_POOL_RECYCLE,
+    DATABASE_POOL_SIZE,
+    DATABASE_POOL_TIMEOUT,
+)
+from backend.database.pool_metrics import InstrumentedAsyncAdaptedQueuePool
+
+
+AsyncSQLAlchemyEngine = create_async_engine(
+    ASYNC_DATABASE_URL,
+    poolclass=InstrumentedAsyncAdaptedQueuePool,
+    pool_size=DATABASE_POOL_SIZE,
+    max_overflow=DATABASE_MAX_OVERFLOW,
+    pool_timeout=DATABASE_POOL_TIMEOUT,
+    pool_recycle=DATABASE_POOL_RECYCLE,
+    pool_pre_ping=DATABASE_POOL_PRE_PING,
+    pool_logging_name="primary-async",
+)
+# --- attributes must stay readable after commit, lazy loads are not possible
 AsyncSQLAlchemySessionLocal = async_sessionmaker(
-    autocommit=False, autoflush=False, bind=AsyncSQLAlchemyEngine
+    autoflush=False, expire_on_commit=False, bind=AsyncSQLAlchemyEngine
 )
 
 
-def get_async_db():
-    return AsyncSession()
+def get_async_db() -> AsyncSession:
+    return AsyncSQLAlchemySessionLocal()
 
 
 async def get_async_db_from_generator():
-    db = AsyncSession()
-    try:
+    async with AsyncSQLAlchemySessionLocal() as db:
         yield db
-    finally:
-        await db.close()
 
 
-AsyncDatabaseDependency = Annotated[AsyncSession, Depends(get_async_db_from_generator)]
\ No newline at end of file
+AsyncDatabaseDependency = Annotated[AsyncSession, Depends(get_async_db_from_generator)]
@@ -0,0 +1,32 @@
+import datetime
+import typing
+import uuid
+from sqlalchemy import BigInteger, DateTime, Index, String, UUID, func
+from sqlalchemy.orm import mapped_column, Mapped
+from backend.database.base import Base
+
+
+class CacheInvalidation(Base):
+    """
+    A write whose cached state every process has to drop, inserted in the
+    writing transaction and applied by each process's poller once committed.
+    """
+
+    __tablename__ = "cache_invalidations"
+
+    id: Mapped[uuid.UUID] = mapped_column(UUID, primary_key=True, default=uuid.uuid4)
+    channel: Mapped[str] = mapped_column(String, nullable=False)
+    key: Mapped[typing.Optional[str]] = mapped_column(String, nullable=True)
+    # --- the publishing process's clock, comparable to the tokens it issues
+    published_at: Mapped[datetime.datetime] = mapped_column(
+        DateTime, default=func.now(), nullable=False
+    )
+    # --- the writing transaction, pollers read rows past their cursor
+    txid: Mapped[int] = mapped_column(
+        BigInteger, default=func.txid_current(), nullable=False
+    )
+
+    __table_args__ = (
+        Index("ix_cache_invalidations_txid", "txid"),
+        Index("ix_cache_invalidations_published_at", "published_at"),
+    )
@@ -0,0 +1,158 @@
+import datetime
+import logging
+import os
+import threading
+import typing
+import uuid
+from collections import defaultdict
+from sqlalchemy import Connection, CursorResult, delete, func, insert, select
+from sqlalchemy.orm import Session
+
+from backend.database.cache_invalidation_model import CacheInvalidation
+from backend.database.database import SQLAlchemySessionLocal
+from backend.periodic_tasks import PeriodicTask, register_periodic_task
+
+logger = logging.getLogger(__name__)
+
+CACHE_INVALIDATION_POLL_INTERVAL_SECONDS = float(
+    os.environ.get("CACHE_INVALIDATION_POLL_INTERVAL_SECONDS", "1")
+)
+# --- keep above ACCESS_TOKEN_TTL_SECONDS and the cache TTLs: a process
+# --- starting up replays this window, revocations included
+CACHE_INVALIDATION_RETENTION_SECONDS = float(
+    os.environ.get("CACHE_INVALIDATION_RETENTION_SECONDS", "3600")
+)
+CACHE_INVALIDATION_SWEEP_INTERVAL_SECONDS = float(
+    os.environ.get("CACHE_INVALIDATION_SWEEP_INTERVAL_SECONDS", "300")
+)
+
+CacheInvalidationHandler = typing.Callable[
+    [typing.Optional[str], datetime.datetime], None
+]
+
+_handlers: defaultdict[str, list[CacheInvalidationHandler]] = defaultdict(list)
+
+
+def on_cache_invalidation(channel: str, handler: CacheInvalidationHandler) -> None:
+    _handlers[channel].append(handler)
+
+
+def publish_cache_invalidation(
+    db: Session | Connection, channel: str, key: typing.Optional[str] = None
+) -> None:
+    """
+    Queues an invalidation in the caller's transaction. Every process, this
+    one included, applies it within CACHE_INVALIDATION_POLL_INTERVAL_SECONDS
+    of the commit; a rollback discards it.
+    """
+    publish_cache_invalidations(db, channel, [key])
+
+
+def publish_cache_invalidations(
+    db: Session | Connection,
+    channel: str,
+    keys: typing.Iterable[typing.Optional[str]],
+) -> None:
+    published_at = datetime.datetime.utcnow()
+    rows = [
+        {
+            "id": uuid.uuid4(),
+            "channel": channel,
+            "key": key,
+            "published_at": published_at,
+        }
+        for key in keys
+    ]
+    if rows:
+        db.execute(insert(CacheInvalidation), rows)
+
+
+class CacheInvalidationPoller:
+    """
+    Reads the invalidations committed since the last poll, with the same
+    cursor as the attendance sync pull: the oldest transaction still running
+    when the poll started, so one committing late is picked up next time.
+    Rows read twice are skipped by id.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.cursor = 0
+        self._applied: dict[uuid.UUID, int] = {}
+        self._lock = threading.Lock()
+
+    def poll(self) -> int:
+        with self._lock:
+            with SQLAlchemySessionLocal() as db:
+                snapshot_xmin = db.scalar(
+                    select(func.txid_snapshot_xmin(func.txid_current_snapshot()))
+                )
+                assert snapshot_xmin is not None
+                invalidations = db.execute(
+                    select(
+                        CacheInvalidation.id,
+                        CacheInvalidation.channel,
+                        CacheInvalidation.key,
+                        CacheInvalidation.published_at,
+                        CacheInvalidation.txid,
+                    )
+                    .where(CacheInvalidation.txid >= self.cursor)
+                    .order_by(CacheInvalidation.txid, CacheInvalidation.id)
+                ).all()
+
+            applied = 0
+            for invalidation_id, channel, key, published_at, txid in invalidations:
+                if invalidation_id in self._applied:
+                    continue
+                for handler in _handlers.get(channel, ()):
+                    try:
+                        handler(key, published_at)
+                    except Exception:
+                        logger.exception("cache invalidation handler failed")
+                self._applied[invalidation_id] = txid
+                applied += 1
+
+            self.cursor = snapshot_xmin
+            self._applied = {
+                invalidation_id: txid
+                for invalidation_id, txid in self._applied.items()
+                if txid >= snapshot_xmin
+            }
+            return applied
+
+
+cache_invalidation_poller = CacheInvalidationPoller()
+
+
+def sweep_cache_invalidations() -> int:
+    with SQLAlchemySessionLocal() as db:
+        result = typing.cast(
+            CursorResult,
+            db.execute(
+                delete(CacheInvalidation).where(
+                    CacheInvalidation.published_at
+                    < datetime.datetime.utcnow()
+                    - datetime.timedelta(seconds=CACHE_INVALIDATION_RETENTION_SECONDS)
+                )
+            ),
+        )
+        db.commit()
+    return result.rowcount
+
+
+register_periodic_task(
+    PeriodicTask(
+        name="poll-cache-invalidations",
+        interval_seconds=CACHE_INVALIDATION_POLL_INTERVAL_SECONDS,
+        run=cache_invalidation_poller.poll,
+        every_process=True,
+    )
+)
+
+register_periodic_task(
+    PeriodicTask(
+        name="sweep-cache-invalidations",
+        interval_seconds=CACHE_INVALIDATION_SWEEP_INTERVAL_SECONDS,
+        run=sweep_cache_invalidations,
+    )
+)
@@ -3,10 +3,27 @@ from fastapi import Depends
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker, Session
 
-from backend.database.database_constants import DATABASE_URL
-
-
-SQLAlchemyEngine = create_engine(DATABASE_URL)
+from backend.database.database_constants import (
+    DATABASE_MAX_OVERFLOW,
+    DATABASE_POOL_PRE_PING,
+    DATABASE_POOL_RECYCLE,
+    DATABASE_POOL_SIZE,
+    DATABASE_POOL_TIMEOUT,
+    DATABASE_URL,
+)
+from backend.database.pool_metrics import InstrumentedQueuePool
+
+
+SQLAlchemyEngine = create_engine(
+    DATABASE_URL,
+    poolclass=InstrumentedQueuePool,
+    pool_size=DATABASE_POOL_SIZE,
+    max_overflow=DATABASE_MAX_OVERFLOW,
+    pool_timeout=DATABASE_POOL_TIMEOUT,
+    pool_recycle=DATABASE_POOL_RECYCLE,
+    pool_pre_ping=DATABASE_POOL_PRE_PING,
+    pool_logging_name="primary",
+)
 SQLAlchemySessionLocal = sessionmaker(
     autocommit=False, autoflush=False, bind=SQLAlchemyEngine
 )
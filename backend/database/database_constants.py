@@ -8,3 +8,34 @@ DATABASE_NAME = os.environ["DATABASE_NAME"]
 DATABASE_USER = os.environ["DATABASE_USER"]
 DATABASE_PASSWORD = os.environ["DATABASE_PASSWORD"]
 DATABASE_URL = f"postgresql://{DATABASE_USER}:{urllib.parse.quote_plus(DATABASE_PASSWORD)}@{DATABASE_HOST}/{DATABASE_NAME}"
+ASYNC_DATABASE_URL = f"postgresql+asyncpg://{DATABASE_USER}:{urllib.parse.quote_plus(DATABASE_PASSWORD)}@{DATABASE_HOST}/{DATABASE_NAME}"
+
+DATABASE_POOL_SIZE = int(os.environ.get("DATABASE_POOL_SIZE", "5"))
+DATABASE_MAX_OVERFLOW = int(os.environ.get("DATABASE_MAX_OVERFLOW", "10"))
+DATABASE_POOL_TIMEOUT = float(os.environ.get("DATABASE_POOL_TIMEOUT", "30"))
+DATABASE_POOL_RECYCLE = int(os.environ.get("DATABASE_POOL_RECYCLE", "1800"))
+DATABASE_POOL_PRE_PING = (
+    os.environ.get("DATABASE_POOL_PRE_PING", "true").lower() == "true"
+)
+
+# --- comma separated, e.g. "replica-1:5432,replica-2:5432"; empty means no replicas
+DATABASE_REPLICA_HOSTS = [
+    host.strip()
+    for host in os.environ.get("DATABASE_REPLICA_HOSTS", "").split(",")
+    if host.strip()
+]
+DATABASE_REPLICA_URLS = [
+    f"postgresql://{DATABASE_USER}:{urllib.parse.quote_plus(DATABASE_PASSWORD)}@{host}/{DATABASE_NAME}"
+    for host in DATABASE_REPLICA_HOSTS
+]
+ASYNC_DATABASE_REPLICA_URLS = [
+    f"postgresql+asyncpg://{DATABASE_USER}:{urllib.parse.quote_plus(DATABASE_PASSWORD)}@{host}/{DATABASE_NAME}"
+    for host in DATABASE_REPLICA_HOSTS
+]
+DATABASE_REPLICA_MAX_LAG_SECONDS = float(
+    os.environ.get("DATABASE_REPLICA_MAX_LAG_SECONDS", "5")
+)
+DATABASE_REPLICA_HEALTH_CHECK_SECONDS = float(
+    os.environ.get("DATABASE_REPLICA_HEALTH_CHECK_SECONDS", "5")
+)
+READ_YOUR_WRITES_SECONDS = int(os.environ.get("READ_YOUR_WRITES_SECONDS", "10"))
@@ -0,0 +1,91 @@
+import threading
+import time
+import typing
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, ConnectionPoolEntry, QueuePool
+
+
+class PoolMetrics:
+    """
+    Checkout counters for one pool. A checkout "waits" when no idle
+    connection was available and it had to open or wait for one.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.checkouts = 0
+        self.waits = 0
+        self.timeouts = 0
+        self.total_checkout_seconds = 0.0
+        self.max_checkout_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float, waited: bool, timed_out: bool) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.waits += waited
+            self.timeouts += timed_out
+            self.total_checkout_seconds += seconds
+            self.max_checkout_seconds = max(self.max_checkout_seconds, seconds)
+
+    def snapshot(self, pool: QueuePool) -> dict:
+        with self._lock:
+            return {
+                "size": pool.size(),
+                "checked_in": pool.checkedin(),
+                "checked_out": pool.checkedout(),
+                "overflow": pool.overflow(),
+                "checkouts": self.checkouts,
+                "waits": self.waits,
+                "timeouts": self.timeouts,
+                "avg_checkout_ms": (
+                    self.total_checkout_seconds / self.checkouts * 1000
+                    if self.checkouts
+                    else 0.0
+                ),
+                "max_checkout_ms": self.max_checkout_seconds * 1000,
+            }
+
+
+# --- keyed by the engine's pool_logging_name
+pool_metrics: dict[str, tuple[QueuePool, PoolMetrics]] = {}
+_pool_metrics_lock = threading.Lock()
+
+
+def timed_checkout(
+    pool: QueuePool, do_get: typing.Callable[[], ConnectionPoolEntry]
+) -> ConnectionPoolEntry:
+    name = pool.logging_name or "default"
+    with _pool_metrics_lock:
+        entry = pool_metrics.get(name)
+        metrics = entry[1] if entry else PoolMetrics()
+        # --- engine.dispose() swaps in a fresh pool, report on the live one
+        if entry is None or entry[0] is not pool:
+            pool_metrics[name] = (pool, metrics)
+
+    waited = pool.checkedin() == 0
+    started_at = time.perf_counter()
+    try:
+        connection = do_get()
+    except PoolTimeoutError:
+        metrics.record(time.perf_counter() - started_at, waited, timed_out=True)
+        raise
+
+    metrics.record(time.perf_counter() - started_at, waited, timed_out=False)
+    return connection
+
+
+class InstrumentedQueuePool(QueuePool):
+    def _do_get(self) -> ConnectionPoolEntry:
+        return timed_checkout(self, super()._do_get)
+
+
+class InstrumentedAsyncAdaptedQueuePool(AsyncAdaptedQueuePool):
+    def _do_get(self) -> ConnectionPoolEntry:
+        return timed_checkout(self, super()._do_get)
+
+
+def get_pool_metrics() -> dict[str, dict]:
+    return {
+        name: metrics.snapshot(pool) for name, (pool, metrics) in pool_metrics.items()
+    }
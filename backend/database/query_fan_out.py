@@ -0,0 +1,51 @@
+import asyncio
+import os
+import time
+import typing
+from dataclasses import dataclass
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+# --- sessions one request may hold at once, keep below DATABASE_POOL_SIZE
+QUERY_FAN_OUT_CONCURRENCY = int(os.environ.get("QUERY_FAN_OUT_CONCURRENCY", "4"))
+
+Section = typing.Callable[[AsyncSession], typing.Awaitable[typing.Any]]
+
+
+@dataclass
+class FanOutResult:
+    results: dict[str, typing.Any]
+    # --- time per section from taking a slot, so waiting is not counted
+    timings_ms: dict[str, float]
+
+    def server_timing(self, prefix: str) -> str:
+        return ", ".join(
+            f"{prefix}-{name};dur={duration:.1f}"
+            for name, duration in self.timings_ms.items()
+        )
+
+
+async def fan_out(
+    session_local: async_sessionmaker[AsyncSession],
+    sections: dict[str, Section],
+    concurrency: int = QUERY_FAN_OUT_CONCURRENCY,
+) -> FanOutResult:
+    """
+    Runs independent read-only sections concurrently. An AsyncSession runs
+    one statement at a time, so each section gets a session of its own from
+    `session_local`, at most `concurrency` of them at once.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run(section: Section) -> tuple[typing.Any, float]:
+        async with semaphore:
+            started_at = time.perf_counter()
+            async with session_local() as db:
+                result = await section(db)
+        return result, (time.perf_counter() - started_at) * 1000
+
+    outcomes = await asyncio.gather(*(run(section) for section in sections.values()))
+
+    return FanOutResult(
+        results={name: result for name, (result, _) in zip(sections, outcomes)},
+        timings_ms={name: duration for name, (_, duration) in zip(sections, outcomes)},
+    )
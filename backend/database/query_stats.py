@@ -0,0 +1,174 @@
+import contextvars
+import hashlib
+import logging
+import os
+import re
+import time
+import typing
+from collections import Counter
+from fastapi import Request, Response
+from fastapi.responses import JSONResponse
+from sqlalchemy import Connection, Engine, event
+from sqlalchemy.engine.interfaces import DBAPICursor, ExceptionContext, ExecutionContext
+
+logger = logging.getLogger(__name__)
+
+QUERY_STATS_ENABLED = os.environ.get("QUERY_STATS_ENABLED", "true").lower() == "true"
+# --- most queries a single request may run
+QUERY_BUDGET = int(os.environ.get("QUERY_BUDGET", "50"))
+# --- more repeats of one statement than this is reported as a likely N+1
+QUERY_REPEAT_LIMIT = int(os.environ.get("QUERY_REPEAT_LIMIT", "5"))
+# --- fail requests that break the budget instead of only logging them, for tests
+QUERY_BUDGET_STRICT = os.environ.get("QUERY_BUDGET_STRICT", "false").lower() == "true"
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def fingerprint_statement(statement: str) -> str:
+    """
+    Statements reach the cursor with bound placeholders, so the same query
+    for different rows has the same text once whitespace is normalised.
+    """
+    normalised = _WHITESPACE.sub(" ", statement).strip()
+    return hashlib.sha1(normalised.encode()).hexdigest()[:12]
+
+
+class RequestQueryStats:
+    def __init__(self, max_queries: int, max_repeats: int):
+        super().__init__()
+        self.max_queries = max_queries
+        self.max_repeats = max_repeats
+        self.query_count = 0
+        self.total_seconds = 0.0
+        self.fingerprints: Counter[str] = Counter()
+        self.statements: dict[str, str] = {}
+
+    def record(self, statement: str, seconds: float) -> None:
+        fingerprint = fingerprint_statement(statement)
+        self.query_count += 1
+        self.total_seconds += seconds
+        self.fingerprints[fingerprint] += 1
+        self.statements.setdefault(fingerprint, statement)
+
+    def repeated_statements(self) -> dict[str, int]:
+        return {
+            fingerprint: count
+            for fingerprint, count in self.fingerprints.items()
+            if count > self.max_repeats
+        }
+
+    def violations(self) -> list[str]:
+        violations = [
+            f"statement {fingerprint} ran {count} times: {self.statements[fingerprint]}"
+            for fingerprint, count in self.repeated_statements().items()
+        ]
+        if self.query_count > self.max_queries:
+            violations.append(
+                f"{self.query_count} queries exceed the budget of {self.max_queries}"
+            )
+        return violations
+
+    def server_timing(self) -> str:
+        return (
+            f'db;dur={self.total_seconds * 1000:.1f};desc="{self.query_count} queries"'
+        )
+
+
+_request_query_stats: contextvars.ContextVar[typing.Optional[RequestQueryStats]] = (
+    contextvars.ContextVar("request_query_stats", default=None)
+)
+
+
+def get_request_query_stats() -> typing.Optional[RequestQueryStats]:
+    return _request_query_stats.get()
+
+
+def query_budget(max_queries: int, max_repeats: int = QUERY_REPEAT_LIMIT):
+    """
+    Route dependency that overrides the default budget for one endpoint,
+    e.g. dependencies=[Depends(query_budget(80))].
+    """
+
+    def set_query_budget() -> None:
+        stats = _request_query_stats.get()
+        if stats:
+            stats.max_queries = max_queries
+            stats.max_repeats = max_repeats
+
+    return set_query_budget
+
+
+# --- listening on the Engine class covers the primary, the replicas and the
+# --- sync engines behind every AsyncEngine
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(
+    conn: Connection,
+    cursor: DBAPICursor,
+    statement: str,
+    parameters: typing.Any,
+    context: typing.Optional[ExecutionContext],
+    executemany: bool,
+):
+    conn.info.setdefault("query_started_at", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(
+    conn: Connection,
+    cursor: DBAPICursor,
+    statement: str,
+    parameters: typing.Any,
+    context: typing.Optional[ExecutionContext],
+    executemany: bool,
+):
+    started_at = conn.info["query_started_at"].pop()
+    stats = _request_query_stats.get()
+    if stats:
+        stats.record(statement, time.perf_counter() - started_at)
+
+
+@event.listens_for(Engine, "handle_error")
+def _handle_error(context: ExceptionContext):
+    # --- the statement failed, after_cursor_execute will not run for it
+    started_at = (
+        context.connection.info.get("query_started_at") if context.connection else None
+    )
+    if started_at and context.statement is not None:
+        started_at.pop()
+
+
+async def query_stats_middleware(
+    request: Request,
+    call_next: typing.Callable[[Request], typing.Awaitable[Response]],
+) -> Response:
+    stats = RequestQueryStats(QUERY_BUDGET, QUERY_REPEAT_LIMIT)
+    token = _request_query_stats.set(stats)
+    try:
+        response = await call_next(request)
+    finally:
+        _request_query_stats.reset(token)
+
+    violations = stats.violations()
+    if violations:
+        logger.warning(
+            "%s %s broke its query budget: %s",
+            request.method,
+            request.url.path,
+            "; ".join(violations),
+        )
+        if QUERY_BUDGET_STRICT:
+            response = JSONResponse(
+                status_code=500,
+                content={"detail": "query-budget-exceeded", "violations": violations},
+            )
+    else:
+        logger.debug(
+            "%s %s ran %d queries in %.1f ms",
+            request.method,
+            request.url.path,
+            stats.query_count,
+            stats.total_seconds * 1000,
+        )
+
+    response.headers.append("Server-Timing", stats.server_timing())
+    return response
@@ -0,0 +1,226 @@
+import itertools
+import logging
+import threading
+import time
+import typing
+from dataclasses import dataclass
+from fastapi import Cookie, Depends, Request, Response
+from sqlalchemy import Engine, create_engine, text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+
+from backend.database.async_database import AsyncSQLAlchemySessionLocal
+from backend.database.database import SQLAlchemySessionLocal
+from backend.database.database_constants import (
+    ASYNC_DATABASE_REPLICA_URLS,
+    DATABASE_MAX_OVERFLOW,
+    DATABASE_POOL_PRE_PING,
+    DATABASE_POOL_RECYCLE,
+    DATABASE_POOL_SIZE,
+    DATABASE_POOL_TIMEOUT,
+    DATABASE_REPLICA_HEALTH_CHECK_SECONDS,
+    DATABASE_REPLICA_MAX_LAG_SECONDS,
+    DATABASE_REPLICA_URLS,
+    READ_YOUR_WRITES_SECONDS,
+)
+from backend.database.pool_metrics import (
+    InstrumentedAsyncAdaptedQueuePool,
+    InstrumentedQueuePool,
+)
+from backend.periodic_tasks import PeriodicTask, register_periodic_task
+
+logger = logging.getLogger(__name__)
+
+# --- set by the read-your-writes middleware after a successful write
+READ_YOUR_WRITES_COOKIE = "read_your_writes_until"
+
+# --- 0 on a primary, and on a replica that has replayed everything it received
+REPLICA_LAG_QUERY = text("""
+    SELECT COALESCE(
+        CASE
+            WHEN NOT pg_is_in_recovery() THEN 0
+            WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+            ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())
+        END,
+        0
+    )
+    """)
+
+
+@dataclass
+class Replica:
+    name: str
+    engine: Engine
+    async_engine: AsyncEngine
+    session_local: sessionmaker[Session]
+    async_session_local: async_sessionmaker[AsyncSession]
+    # --- unhealthy until the first health check says otherwise
+    healthy: bool = False
+    lag_seconds: typing.Optional[float] = None
+    checked_at: typing.Optional[float] = None
+
+
+def create_replica(index: int, url: str, async_url: str) -> Replica:
+    pool_options = dict(
+        pool_size=DATABASE_POOL_SIZE,
+        max_overflow=DATABASE_MAX_OVERFLOW,
+        pool_timeout=DATABASE_POOL_TIMEOUT,
+        pool_recycle=DATABASE_POOL_RECYCLE,
+        pool_pre_ping=DATABASE_POOL_PRE_PING,
+    )
+    engine = create_engine(
+        url,
+        poolclass=InstrumentedQueuePool,
+        pool_logging_name=f"replica-{index}",
+        **pool_options,
+    )
+    async_engine = create_async_engine(
+        async_url,
+        poolclass=InstrumentedAsyncAdaptedQueuePool,
+        pool_logging_name=f"replica-{index}-async",
+        **pool_options,
+    )
+
+    return Replica(
+        name=f"replica-{index}",
+        engine=engine,
+        async_engine=async_engine,
+        session_local=sessionmaker(autoflush=False, bind=engine),
+        async_session_local=async_sessionmaker(
+            autoflush=False, expire_on_commit=False, bind=async_engine
+        ),
+    )
+
+
+replicas = [
+    create_replica(index, url, async_url)
+    for index, (url, async_url) in enumerate(
+        zip(DATABASE_REPLICA_URLS, ASYNC_DATABASE_REPLICA_URLS)
+    )
+]
+_replica_cycle = itertools.cycle(replicas)
+_replica_cycle_lock = threading.Lock()
+
+
+def check_replica_health() -> dict[str, typing.Optional[float]]:
+    """
+    Measures every replica's replication lag; a replica that is down or lags
+    more than DATABASE_REPLICA_MAX_LAG_SECONDS stops receiving reads.
+    """
+    for replica in replicas:
+        try:
+            with replica.engine.connect() as connection:
+                lag_seconds = float(connection.execute(REPLICA_LAG_QUERY).scalar_one())
+        except Exception as error:
+            logger.warning("replica %s is unreachable: %s", replica.name, error)
+            lag_seconds = None
+
+        replica.lag_seconds = lag_seconds
+        replica.healthy = (
+            lag_seconds is not None and lag_seconds <= DATABASE_REPLICA_MAX_LAG_SECONDS
+        )
+        replica.checked_at = time.time()
+
+    return {replica.name: replica.lag_seconds for replica in replicas}
+
+
+def pick_replica(
+    read_your_writes_until: typing.Optional[float] = None,
+) -> typing.Optional[Replica]:
+    """
+    Round-robins over healthy replicas; None means read from the primary,
+    either because no replica is usable or because the client wrote recently
+    and must see its own writes.
+    """
+    if read_your_writes_until and read_your_writes_until > time.time():
+        return None
+
+    with _replica_cycle_lock:
+        for _ in range(len(replicas)):
+            replica = next(_replica_cycle)
+            if replica.healthy:
+                return replica
+
+    return None
+
+
+def get_read_only_db_from_generator(
+    read_your_writes_until: typing.Annotated[
+        float | None, Cookie(include_in_schema=False)
+    ] = None,
+):
+    replica = pick_replica(read_your_writes_until)
+    db = replica.session_local() if replica else SQLAlchemySessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def read_only_async_session_local(
+    read_your_writes_until: typing.Optional[float] = None,
+) -> async_sessionmaker[AsyncSession]:
+    replica = pick_replica(read_your_writes_until)
+    return replica.async_session_local if replica else AsyncSQLAlchemySessionLocal
+
+
+async def get_read_only_async_db_from_generator(
+    read_your_writes_until: typing.Annotated[
+        float | None, Cookie(include_in_schema=False)
+    ] = None,
+):
+    async with read_only_async_session_local(read_your_writes_until)() as db:
+        yield db
+
+
+ReadOnlyDatabaseDependency = typing.Annotated[
+    Session, Depends(get_read_only_db_from_generator)
+]
+ReadOnlyAsyncDatabaseDependency = typing.Annotated[
+    AsyncSession, Depends(get_read_only_async_db_from_generator)
+]
+
+
+async def read_your_writes_middleware(
+    request: Request,
+    call_next: typing.Callable[[Request], typing.Awaitable[Response]],
+) -> Response:
+    """
+    Pins a client to the primary for READ_YOUR_WRITES_SECONDS after any
+    successful write, so it never reads a replica that is behind its write.
+    """
+    response = await call_next(request)
+
+    if request.method not in ("GET", "HEAD", "OPTIONS") and response.status_code < 400:
+        response.set_cookie(
+            key=READ_YOUR_WRITES_COOKIE,
+            value=str(time.time() + READ_YOUR_WRITES_SECONDS),
+            max_age=READ_YOUR_WRITES_SECONDS,
+            httponly=True,
+            secure=True,
+            samesite="none",
+        )
+
+    return response
+
+
+def get_replica_status() -> dict[str, dict]:
+    return {
+        replica.name: {
+            "healthy": replica.healthy,
+            "lag_seconds": replica.lag_seconds,
+            "checked_at": replica.checked_at,
+        }
+        for replica in replicas
+    }
+
+
+if replicas:
+    register_periodic_task(
+        PeriodicTask(
+            name="check-replica-health",
+            interval_seconds=DATABASE_REPLICA_HEALTH_CHECK_SECONDS,
+            run=check_replica_health,
+        )
+    )
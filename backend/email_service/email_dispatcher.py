@@ -0,0 +1,181 @@
+import datetime
+import hashlib
+import logging
+import os
+import typing
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from backend.database.database import SQLAlchemySessionLocal
+from backend.email_service.email_outbox_model import EmailOutbox, EmailOutboxStatus
+from backend.email_service.email_transports import (
+    EmailBatchRejected,
+    EmailTransport,
+    create_email_transport,
+)
+from backend.periodic_tasks import PeriodicTask, register_periodic_task
+
+logger = logging.getLogger(__name__)
+
+EMAIL_DISPATCH_INTERVAL_SECONDS = float(
+    os.environ.get("EMAIL_DISPATCH_INTERVAL_SECONDS", "5")
+)
+EMAIL_MAX_ATTEMPTS = int(os.environ.get("EMAIL_MAX_ATTEMPTS", "6"))
+EMAIL_RETRY_BASE_SECONDS = float(os.environ.get("EMAIL_RETRY_BASE_SECONDS", "30"))
+
+_transport: typing.Optional[EmailTransport] = None
+
+
+def get_email_transport() -> EmailTransport:
+    global _transport
+    if _transport is None:
+        _transport = create_email_transport()
+    return _transport
+
+
+def retry_delay(attempts: int) -> datetime.timedelta:
+    # --- 30s, 1m, 2m, 4m, ... with the defaults
+    return datetime.timedelta(seconds=EMAIL_RETRY_BASE_SECONDS * 2 ** (attempts - 1))
+
+
+def batch_idempotency_key(emails: list[EmailOutbox]) -> str:
+    # --- derived from the rows, so sending the same rows again reuses it
+    ids = ",".join(sorted(str(email.id) for email in emails))
+    return f"email-outbox-{hashlib.sha256(ids.encode()).hexdigest()}"
+
+
+def claim_emails(db: Session, batch_size: int) -> list[EmailOutbox]:
+    """
+    Locks the next batch to send. A due row left with an idempotency key
+    brings back the whole batch it was sent in, so the repeat reaches the
+    provider as the same rows under the same key.
+
+    That batch is locked in id order without SKIP LOCKED and before any of
+    its rows: a second dispatcher waits for the first one to finish instead
+    of deadlocking on it or sending part of the batch under another key.
+    """
+    now = datetime.datetime.utcnow()
+    due = select(EmailOutbox).where(
+        EmailOutbox.status == EmailOutboxStatus.PENDING.value,
+        EmailOutbox.next_attempt_at <= now,
+    )
+
+    while True:
+        next_email = db.execute(
+            select(EmailOutbox.idempotency_key)
+            .where(
+                EmailOutbox.status == EmailOutboxStatus.PENDING.value,
+                EmailOutbox.next_attempt_at <= now,
+            )
+            .order_by(EmailOutbox.next_attempt_at, EmailOutbox.id)
+            .limit(1)
+        ).first()
+        if next_email is None:
+            return []
+
+        if next_email.idempotency_key is None:
+            return list(
+                db.scalars(
+                    due.where(EmailOutbox.idempotency_key.is_(None))
+                    .order_by(EmailOutbox.next_attempt_at, EmailOutbox.id)
+                    .limit(batch_size)
+                    .with_for_update(skip_locked=True)
+                )
+            )
+
+        emails = list(
+            db.scalars(
+                due.where(EmailOutbox.idempotency_key == next_email.idempotency_key)
+                .order_by(EmailOutbox.id)
+                .with_for_update()
+            )
+        )
+        if emails:
+            return emails
+        # --- sent or rescheduled by the dispatcher this one waited for
+
+
+def charge_failed_attempt(
+    emails: list[EmailOutbox],
+    error: Exception,
+    idempotency_key: typing.Optional[str],
+) -> None:
+    # --- rows sharing a key that may have been sent fail together, so none
+    # --- is later sent again under a different key
+    attempts = max(email.attempts for email in emails) + 1
+    next_attempt_at = datetime.datetime.utcnow() + retry_delay(attempts)
+
+    for email in emails:
+        email.attempts += 1
+        email.last_error = str(error)
+        email.idempotency_key = idempotency_key
+        if attempts >= EMAIL_MAX_ATTEMPTS:
+            email.status = EmailOutboxStatus.FAILED.value
+        else:
+            email.next_attempt_at = next_attempt_at
+
+
+def dispatch_pending_emails(transport: typing.Optional[EmailTransport] = None) -> int:
+    """
+    Sends due outbox rows in batches until none are left; returns how many
+    were sent. Rows are claimed with SKIP LOCKED so several dispatchers can
+    run side by side without sending an email twice.
+
+    A batch the provider rejects outright was not sent, so it is split in
+    halves until the rejected rows are alone and only they are charged an
+    attempt. Any other failure may hide an accepted batch: its rows keep the
+    batch's idempotency key and dispatching stops until the next run.
+    """
+    transport = transport or get_email_transport()
+    sent = 0
+
+    while True:
+        with SQLAlchemySessionLocal() as db:
+            emails = claim_emails(db, transport.max_batch_size)
+            if not emails:
+                return sent
+
+            batches = [emails]
+            while batches:
+                batch = batches.pop()
+                idempotency_key = batch_idempotency_key(batch)
+                try:
+                    provider_message_ids = transport.send_batch(batch, idempotency_key)
+                except EmailBatchRejected as error:
+                    if len(batch) > 1:
+                        half = len(batch) // 2
+                        batches += [batch[half:], batch[:half]]
+                        continue
+
+                    logger.warning("email %s was rejected: %s", batch[0].id, error)
+                    # --- nothing was sent, a fresh batch may take it next time
+                    charge_failed_attempt(batch, error, idempotency_key=None)
+                    continue
+                except Exception as error:
+                    logger.warning("sending %d emails failed: %s", len(batch), error)
+                    charge_failed_attempt(batch, error, idempotency_key)
+                    db.commit()
+                    return sent
+
+                now = datetime.datetime.utcnow()
+                for email, provider_message_id in zip(batch, provider_message_ids):
+                    email.attempts += 1
+                    email.status = EmailOutboxStatus.SENT.value
+                    email.provider_message_id = provider_message_id
+                    email.idempotency_key = idempotency_key
+                    email.sent_at = now
+                sent += len(batch)
+
+            db.commit()
+
+        if len(emails) < transport.max_batch_size:
+            return sent
+
+
+register_periodic_task(
+    PeriodicTask(
+        name="dispatch-pending-emails",
+        interval_seconds=EMAIL_DISPATCH_INTERVAL_SECONDS,
+        run=dispatch_pending_emails,
+    )
+)
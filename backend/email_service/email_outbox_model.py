@@ -0,0 +1,46 @@
+import datetime
+import enum
+import typing
+import uuid
+from sqlalchemy import Index, UUID, func
+from sqlalchemy.orm import mapped_column, Mapped
+from backend.database.base import Base
+
+
+class EmailOutboxStatus(enum.Enum):
+    PENDING = "pending"
+    SENT = "sent"
+    FAILED = "failed"
+
+
+class EmailOutbox(Base):
+    __tablename__ = "email_outbox"
+
+    id: Mapped[uuid.UUID] = mapped_column(UUID, primary_key=True, default=uuid.uuid4)
+    recipient: Mapped[str] = mapped_column(nullable=False)
+    subject: Mapped[str] = mapped_column(nullable=False)
+    message: Mapped[str] = mapped_column(nullable=False)
+    status: Mapped[str] = mapped_column(nullable=False)
+    attempts: Mapped[int] = mapped_column(nullable=False, default=0)
+    next_attempt_at: Mapped[datetime.datetime] = mapped_column(nullable=False)
+    last_error: Mapped[typing.Optional[str]] = mapped_column(nullable=True)
+    provider_message_id: Mapped[typing.Optional[str]] = mapped_column(nullable=True)
+    # --- key of the last batch holding this row that may have been sent;
+    # --- the rows sharing it are retried together under it
+    idempotency_key: Mapped[typing.Optional[str]] = mapped_column(nullable=True)
+    created_at: Mapped[datetime.datetime] = mapped_column(default=func.now())
+    sent_at: Mapped[typing.Optional[datetime.datetime]] = mapped_column(nullable=True)
+
+    __table_args__ = (
+        Index("ix_email_outbox_status_next_attempt_at", "status", "next_attempt_at"),
+        Index("ix_email_outbox_idempotency_key", "idempotency_key"),
+    )
+
+    def __init__(self, recipient: str, subject: str, message: str):
+        super().__init__()
+        self.recipient = recipient
+        self.subject = subject
+        self.message = message
+        self.status = EmailOutboxStatus.PENDING.value
+        self.attempts = 0
+        self.next_attempt_at = datetime.datetime.utcnow()
@@ -0,0 +1,106 @@
+import logging
+import os
+import typing
+import uuid
+import requests
+import resend
+
+from backend.email_service.email_outbox_model import EmailOutbox
+
+logger = logging.getLogger(__name__)
+
+EMAIL_TRANSPORT = os.environ.get("EMAIL_TRANSPORT", "resend")
+EMAIL_DOMAIN = os.environ.get("EMAIL_DOMAIN")
+EMAIL_SERVICE_API_KEY = os.environ.get("EMAIL_SERVICE_API_KEY")
+EMAIL_REQUEST_TIMEOUT_SECONDS = float(
+    os.environ.get("EMAIL_REQUEST_TIMEOUT_SECONDS", "10")
+)
+
+# --- the resend batch endpoint accepts at most 100 emails per call
+RESEND_MAX_BATCH_SIZE = 100
+
+
+class EmailBatchRejected(Exception):
+    """
+    The provider refused the batch outright, so none of it was sent.
+    """
+
+
+class EmailTransport(typing.Protocol):
+    max_batch_size: int
+
+    def send_batch(self, emails: list[EmailOutbox], idempotency_key: str) -> list[str]:
+        """
+        Sends every email or raises; returns the provider message ids in the
+        same order as `emails`. Raises EmailBatchRejected only when nothing
+        was sent, any other error may hide a batch the provider accepted.
+        A repeat under the same `idempotency_key` must not send again.
+        """
+        ...
+
+
+class ResendEmailTransport:
+    max_batch_size = RESEND_MAX_BATCH_SIZE
+
+    def __init__(self):
+        super().__init__()
+        # --- one keep-alive session for the life of the dispatcher
+        self.http_session = requests.Session()
+        self.http_session.headers.update(
+            {
+                "Authorization": f"Bearer {EMAIL_SERVICE_API_KEY}",
+                "Content-Type": "application/json",
+            }
+        )
+
+    def send_batch(self, emails: list[EmailOutbox], idempotency_key: str) -> list[str]:
+        response = self.http_session.post(
+            f"{resend.api_url}/emails/batch",
+            headers={"Idempotency-Key": idempotency_key},
+            json=[
+                {
+                    "from": f"donotreply@{EMAIL_DOMAIN}",
+                    "to": [email.recipient],
+                    "subject": email.subject,
+                    "html": f"<strong>{email.message}</strong>",
+                }
+                for email in emails
+            ],
+            timeout=EMAIL_REQUEST_TIMEOUT_SECONDS,
+        )
+        # --- validation errors reject the whole batch; 409 (key in use) and
+        # --- 429 say nothing about whether it went out
+        if 400 <= response.status_code < 500 and response.status_code not in (
+            409,
+            429,
+        ):
+            raise EmailBatchRejected(f"{response.status_code}: {response.text}")
+        response.raise_for_status()
+
+        return [sent_email["id"] for sent_email in response.json()["data"]]
+
+
+class StubEmailTransport:
+    """
+    Offline transport: keeps sent emails in memory and logs them.
+    """
+
+    max_batch_size = RESEND_MAX_BATCH_SIZE
+
+    def __init__(self):
+        super().__init__()
+        self.sent_emails: list[EmailOutbox] = []
+
+    def send_batch(self, emails: list[EmailOutbox], idempotency_key: str) -> list[str]:
+        for email in emails:
+            logger.info("stub email to %s: %s", email.recipient, email.subject)
+        self.sent_emails.extend(emails)
+
+        return [f"stub-{uuid.uuid4()}" for _ in emails]
+
+
+def create_email_transport() -> EmailTransport:
+    if EMAIL_TRANSPORT == "stub":
+        return StubEmailTransport()
+
+    return ResendEmailTransport()
@@ -1,11 +1,10 @@
-import resend
 from pydantic import BaseModel
-import os
 from typing import Annotated
 from fastapi import Depends
+from sqlalchemy.orm import Session
 
-resend.api_key = os.environ.get("EMAIL_SERVICE_API_KEY")
-EMAIL_DOMAIN = os.environ.get("EMAIL_DOMAIN")
+from backend.database.database import DatabaseDependency
+from backend.email_service.email_outbox_model import EmailOutbox
 
 
 class SendEmailParams(BaseModel):
@@ -14,25 +13,30 @@ class SendEmailParams(BaseModel):
     message: str
 
 
-def send_mail(body: SendEmailParams) -> resend.Email:
-    email = resend.Emails.send(
-        {
-            "from": f"donotreply@{EMAIL_DOMAIN}",
-            "to": [body.email],
-            "subject": body.subject,
-            "html": f"<strong>{body.message}</strong>",
-        }
-    )
-    return email
+class EmailService:
+    """
+    Queues emails in the outbox as part of the caller's transaction; the
+    dispatcher in email_dispatcher.py delivers them once it is committed.
+    """
 
+    def __init__(self, db: Session):
+        super().__init__()
+        self.db = db
 
-class EmailService:
-    def send(self, body: SendEmailParams) -> resend.Email:
-        return send_mail(body)
+    def send(self, body: SendEmailParams) -> EmailOutbox:
+        email = EmailOutbox(
+            recipient=body.email,
+            subject=body.subject,
+            message=body.message,
+        )
+        self.db.add(email)
+        self.db.flush()
+
+        return email
 
 
-def get_email_service() -> EmailService:
-    return EmailService()
+def get_email_service(db: DatabaseDependency) -> EmailService:
+    return EmailService(db)
 
 
 EmailServiceDependency = Annotated[EmailService, Depends(get_email_service)]
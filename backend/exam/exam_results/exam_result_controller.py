@@ -6,12 +6,12 @@ from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 
 from backend.database.database import DatabaseDependency
+from backend.database.replica_database import ReadOnlyDatabaseDependency
 
 from backend.exam.exam_results.exam_result_model import ExamResult
-from backend.user.user_models import User
 from backend.module.module_model import ModuleEnrollment
 
-from backend.user.user_authentication import UserAuthenticationContextDependency
+from backend.user.user_authentication import AuthPrincipalDependency
 
 router = APIRouter()
 
@@ -49,16 +49,12 @@ def exam_result_response(exam_result: ExamResult) -> dict:
 
 @router.get("/exam_results/{exam_id}/classroom/{classroom_id}")
 def get_module_exam_result_for_classroom(
-    db: DatabaseDependency,
-    auth_context: UserAuthenticationContextDependency,
+    db: ReadOnlyDatabaseDependency,
+    auth_context: AuthPrincipalDependency,
     classroom_id: uuid.UUID,
     exam_id: uuid.UUID,
 ):
 
-    user = db.query(User).filter(User.id == auth_context.user_id).first()
-
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
     exam_results = (
         db.query(ExamResult)
         .filter(ExamResult.class_room_id == classroom_id, ExamResult.exam_id == exam_id)
@@ -71,18 +67,13 @@ def get_module_exam_result_for_classroom(
 
 @router.get("/exam_results/{exam_id}/student/{student_id}/classroom/{classroom_id}")
 def get_module_exam_result_for_student_in_a_classroom(
-    db: DatabaseDependency,
-    auth_context: UserAuthenticationContextDependency,
+    db: ReadOnlyDatabaseDependency,
+    auth_context: AuthPrincipalDependency,
     classroom_id: uuid.UUID,
     exam_id: uuid.UUID,
     student_id: uuid.UUID,
 ):
 
-    user = db.query(User).filter(User.id == auth_context.user_id).first()
-
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-
     exam_results = (
         db.query(ExamResult)
         .filter(
@@ -99,16 +90,12 @@ def get_module_exam_result_for_student_in_a_classroom(
 
 @router.get("/exam_results/{exam_id}/student/{student_id}/module/{module_id}")
 def get_specific_module_exam_results_for_student(
-    db: DatabaseDependency,
-    auth_context: UserAuthenticationContextDependency,
+    db: ReadOnlyDatabaseDependency,
+    auth_context: AuthPrincipalDependency,
     student_id: uuid.UUID,
     exam_id: uuid.UUID,
     module_id: uuid.UUID,
 ):
-    user = db.query(User).filter(User.id == auth_context.user_id).first()
-
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
     exam_result = (
         db.query(ExamResult)
         .filter(
@@ -123,14 +110,10 @@ def get_specific_module_exam_results_for_student(
 
 @router.get("/exam_results/exam/{exam_id}")
 def get_exam_results_by_student_id(
-    db: DatabaseDependency,
-    auth_context: UserAuthenticationContextDependency,
+    db: ReadOnlyDatabaseDependency,
+    auth_context: AuthPrincipalDependency,
     exam_id: str,
 ):
-    user = db.query(User).filter(User.id == auth_context.user_id).first()
-
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
 
     exams = db.query(ExamResult).filter(ExamResult.exam_id == exam_id).all()
     return exams
@@ -147,13 +130,9 @@ class CreateModuleExamResult(BaseModel):
 @router.post("/exam_results/create")
 def create_exam_results(
     db: DatabaseDependency,
-    auth_context: UserAuthenticationContextDependency,
+    auth_context: AuthPrincipalDependency,
     body: CreateModuleExamResult,
 ):
-    user = db.query(User).filter(User.id == auth_context.user_id).first()
-
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
 
     module_enrollment = (
         db.query(ModuleEnrollment)
@@ -206,13 +185,9 @@ class UpdateModuleExamResult(BaseModel):
 @router.put("/exam_results/update")
 def update_exam_results(
     db: DatabaseDependency,
-    auth_context: UserAuthenticationContextDependency,
+    auth_context: AuthPrincipalDependency,
     body: UpdateModuleExamResult,
 ):
-    user = db.query(User).filter(User.id == auth_context.user_id).first()
-
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
 
     exam_result = (
         db.query(ExamResult)
@@ -1,5 +1,5 @@
 import datetime
-from sqlalchemy import ForeignKey, UUID, func
+from sqlalchemy import ForeignKey, Index, UUID, func
 from sqlalchemy.orm import relationship, mapped_column, Mapped
 import uuid
 from backend.database.base import Base
@@ -35,6 +35,10 @@ class ExamResult(Base):
     module_id: Mapped[uuid.UUID] = mapped_column(UUID, ForeignKey("modules.id"))
     module: Mapped["Module"] = relationship("Module")
 
+    __table_args__ = (
+        Index("ix_exam_results_exam_id_class_room_id", "exam_id", "class_room_id"),
+    )
+
     @property
     def percentage(self):
         return (self.marks_obtained / 100) * 100
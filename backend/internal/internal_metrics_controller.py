@@ -0,0 +1,40 @@
+import dataclasses
+import os
+import secrets
+import typing
+from fastapi import APIRouter, Header, HTTPException, status
+
+from backend.database.pool_metrics import get_pool_metrics
+from backend.database.replica_database import get_replica_status
+from backend.paginated_response import count_cache
+from backend.school.dashboard_cache import dashboard_cache
+from backend.user.user_authentication import (
+    get_session_cache_stats,
+    principal_cache,
+)
+
+# --- unset disables the endpoint
+INTERNAL_METRICS_TOKEN = os.environ.get("INTERNAL_METRICS_TOKEN")
+
+router = APIRouter(include_in_schema=False)
+
+
+@router.get("/internal/metrics")
+def get_internal_metrics(
+    x_internal_metrics_token: typing.Annotated[str | None, Header()] = None,
+):
+    if not INTERNAL_METRICS_TOKEN or not secrets.compare_digest(
+        x_internal_metrics_token or "", INTERNAL_METRICS_TOKEN
+    ):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
+
+    return {
+        "database_pools": get_pool_metrics(),
+        "database_replicas": get_replica_status(),
+        "caches": {
+            "sessions": dataclasses.asdict(get_session_cache_stats()),
+            "auth_principals": dataclasses.asdict(principal_cache.stats()),
+            "list_counts": dataclasses.asdict(count_cache.stats()),
+            "dashboards": dataclasses.asdict(dashboard_cache.stats()),
+        },
+    }
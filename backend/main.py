@@ -6,6 +6,7 @@ from backend.database.all_models import get_all_models
 
 get_all_models()
 
+import contextlib
 import os
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
@@ -26,9 +27,26 @@ from backend.exam.exam_results.exam_result_controller import (
 # from backend.file.file_controller import router as file_router
 from backend.classroom.classroom_controller import router as classroom_router
 from backend.attendance.attendance_controllers import router as attendance_router
+from backend.internal.internal_metrics_controller import router as internal_router
+
+from backend.database.query_stats import QUERY_STATS_ENABLED, query_stats_middleware
+from backend.database.replica_database import read_your_writes_middleware, replicas
+from backend.periodic_tasks import start_periodic_tasks, stop_periodic_tasks
+from backend.user.passwords import shutdown_password_hashing_executor
+import backend.user.session_sweeper  # pyright: ignore [reportUnusedImport]
+import backend.email_service.email_dispatcher  # pyright: ignore [reportUnusedImport]
+
+
+@contextlib.asynccontextmanager
+async def lifespan(_: FastAPI):
+    tasks = start_periodic_tasks()
+    yield
+    await stop_periodic_tasks(tasks)
+    shutdown_password_hashing_executor()
+
 
 # ---
-app = FastAPI(docs_url="/")
+app = FastAPI(docs_url="/", lifespan=lifespan)
 
 origins = [os.environ["FRONTEND_URL"], os.environ["SECURE_FRONTEND_URL"]]
 
@@ -38,9 +56,14 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
-    expose_headers=["X-Authentication-Type"],
+    expose_headers=["X-Authentication-Type", "Server-Timing", "ETag"],
 )
 
+if replicas:
+    app.middleware("http")(read_your_writes_middleware)
+if QUERY_STATS_ENABLED:
+    app.middleware("http")(query_stats_middleware)
+
 # ---
 app.include_router(authentication_router, tags=["authentication"])
 app.include_router(permissions_router, tags=["permissions"])
@@ -57,6 +80,7 @@ app.include_router(student_router, tags=["student"])
 app.include_router(payment_router, tags=["payment"])
 app.include_router(lesson_plan_router, tags=["lesson-plans"])
 # app.include_router(file_router)
+app.include_router(internal_router)
 
 
 @app.get("/health", tags=["health"])
@@ -1,4 +1,4 @@
-from sqlalchemy import String, ForeignKey, UUID
+from sqlalchemy import String, ForeignKey, Index, UUID
 from sqlalchemy.orm import relationship, mapped_column, Mapped
 import uuid
 from backend.database.base import Base
@@ -59,6 +59,8 @@ class ModuleEnrollment(Base):
         "Module", back_populates="module_enrollments"
     )
 
+    __table_args__ = (Index("ix_module_enrollments_module_id", "module_id"),)
+
     def __init__(self, student_id: uuid.UUID, module_id: uuid.UUID):
         super().__init__()
         self.student_id = student_id
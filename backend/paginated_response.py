@@ -1,11 +1,166 @@
+import enum
+import hashlib
+import json
+import os
 import typing
+import uuid
 from pydantic import BaseModel
+from sqlalchemy import ClauseElement, Executable, Select, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import Query
+from sqlalchemy.sql.compiler import SQLCompiler
+
+from backend.school.school_data_version import get_school_data_version
+from backend.ttl_cache import TTLCache
 
 T = typing.TypeVar("T")
 
+COUNT_CACHE_MAX_SIZE = int(os.environ.get("COUNT_CACHE_MAX_SIZE", "10000"))
+COUNT_CACHE_TTL_SECONDS = float(os.environ.get("COUNT_CACHE_TTL_SECONDS", "60"))
+
 
 class PaginatedResponse(BaseModel, typing.Generic[T]):
     total: int
     page: int
     limit: int
     data: list[T]
+    # --- pass back as ?cursor= to fetch the next page, None on the last page
+    next_cursor: typing.Optional[str] = None
+
+
+class CountMode(enum.Enum):
+    """
+    How a list endpoint computes `total`:
+    exact    - a separate COUNT(*) of the filtered query
+    window   - COUNT(*) OVER () in the page query itself, one round-trip;
+               with a cursor it counts the rows from the cursor on
+    cached   - exact, cached per school until one of its rows is written
+    estimate - the planner's row estimate, cheap on large unfiltered lists
+    """
+
+    EXACT = "exact"
+    WINDOW = "window"
+    CACHED = "cached"
+    ESTIMATE = "estimate"
+
+
+count_cache: TTLCache[tuple, int] = TTLCache(
+    max_size=COUNT_CACHE_MAX_SIZE, ttl_seconds=COUNT_CACHE_TTL_SECONDS
+)
+
+
+class Explain(Executable, ClauseElement):
+    inherit_cache = False
+
+    def __init__(self, statement: Select):
+        super().__init__()
+        self.statement = statement
+
+
+@compiles(Explain, "postgresql")
+def _compile_explain(element: Explain, compiler: SQLCompiler, **kw: typing.Any) -> str:
+    return f"EXPLAIN (FORMAT JSON) {compiler.process(element.statement, **kw)}"
+
+
+def _estimated_rows(plan: typing.Any) -> int:
+    # --- psycopg2 decodes the json column, asyncpg returns it as text
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+def _count_statement(statement: Select) -> Select:
+    return select(func.count()).select_from(statement.order_by(None).subquery())
+
+
+def _count_cache_key(statement: Select, school_id: typing.Optional[uuid.UUID]) -> tuple:
+    compiled = statement.compile()
+    digest = hashlib.sha1(
+        f"{compiled}|{sorted(compiled.params.items())}".encode()
+    ).hexdigest()
+    return (school_id, get_school_data_version(school_id), digest)
+
+
+async def count_rows(
+    db: AsyncSession,
+    statement: Select,
+    count_mode: CountMode = CountMode.EXACT,
+    school_id: typing.Optional[uuid.UUID] = None,
+) -> int:
+    if count_mode == CountMode.ESTIMATE:
+        return _estimated_rows(await db.scalar(Explain(statement.order_by(None))))
+
+    if count_mode == CountMode.CACHED:
+        key = _count_cache_key(statement, school_id)
+        total = count_cache.get(key)
+        if total is None:
+            total = await db.scalar(_count_statement(statement)) or 0
+            count_cache.set(key, total)
+        return total
+
+    return await db.scalar(_count_statement(statement)) or 0
+
+
+def count_query_rows(
+    query: Query,
+    count_mode: CountMode = CountMode.EXACT,
+    school_id: typing.Optional[uuid.UUID] = None,
+) -> int:
+    statement = typing.cast(Select, query.statement)
+
+    if count_mode == CountMode.ESTIMATE:
+        return _estimated_rows(query.session.scalar(Explain(statement.order_by(None))))
+
+    if count_mode == CountMode.CACHED:
+        key = _count_cache_key(statement, school_id)
+        total = count_cache.get(key)
+        if total is None:
+            total = query.count()
+            count_cache.set(key, total)
+        return total
+
+    return query.count()
+
+
+async def fetch_page(
+    db: AsyncSession,
+    statement: Select,
+    page_statement: Select,
+    limit: int,
+    count_mode: CountMode = CountMode.EXACT,
+    school_id: typing.Optional[uuid.UUID] = None,
+) -> tuple[list, int]:
+    """
+    Runs the ordered `page_statement` and counts the filtered `statement`
+    according to `count_mode`.
+    """
+    if count_mode != CountMode.WINDOW:
+        total = await count_rows(db, statement, count_mode, school_id)
+        rows = (await db.scalars(page_statement.limit(limit))).all()
+        return list(rows), total
+
+    counted = (
+        await db.execute(page_statement.add_columns(func.count().over()).limit(limit))
+    ).all()
+    if not counted:
+        # --- past the last page the window has no rows to report on
+        return [], await count_rows(db, statement)
+    return [row[0] for row in counted], counted[0][1]
+
+
+def fetch_query_page(
+    query: Query,
+    page_query: Query,
+    limit: int,
+    count_mode: CountMode = CountMode.EXACT,
+    school_id: typing.Optional[uuid.UUID] = None,
+) -> tuple[list, int]:
+    if count_mode != CountMode.WINDOW:
+        total = count_query_rows(query, count_mode, school_id)
+        return page_query.limit(limit).all(), total
+
+    counted = page_query.add_columns(func.count().over()).limit(limit).all()
+    if not counted:
+        return [], query.count()
+    return [row[0] for row in counted], counted[0][1]
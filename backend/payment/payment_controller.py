@@ -8,8 +8,12 @@ from sqlalchemy import or_, and_, asc, desc
 from sqlalchemy.orm import Query as SQLQUERY
 import datetime
 from backend.database.database import DatabaseDependency
+from backend.database.replica_database import ReadOnlyDatabaseDependency
 from backend.teacher.teacher_model import Teacher
-from backend.user.user_authentication import UserAuthenticationContextDependency
+from backend.user.user_authentication import (
+    AuthPrincipalDependency,
+    UserAuthenticationContextDependency,
+)
 from backend.payment.payment_model import (
     Payment,
     PaymentCategory,
@@ -19,6 +23,12 @@ from backend.payment.payment_model import (
     PaymentUserAssociation,
     PaymentUserType,
 )
+from backend.payment.payment_summary import (
+    PaymentSummary,
+    payment_totals_statement,
+    to_payment_groups,
+)
+from backend.raise_exception import raise_exception
 from backend.user.user_models import RoleType, User
 from backend.student.student_model import Student
 
@@ -62,8 +72,8 @@ def to_user_dto(user: User) -> dict:
 
 @router.get("/payment/search")
 def search_payments(
-    db: DatabaseDependency,
-    auth_context: UserAuthenticationContextDependency,
+    db: ReadOnlyDatabaseDependency,
+    auth_context: AuthPrincipalDependency,
     offset: int = Query(1, ge=1, description="Page number"),
     limit: int = Query(10, ge=1, le=100, description="payments per page"),
     sort_by: typing.Literal[
@@ -104,8 +114,7 @@ def search_payments(
     ),
 ):
 
-    user = db.query(User).filter(User.id == auth_context.user_id).first()
-    if not user or not user.has_role_type(RoleType.SCHOOL_ADMIN):
+    if not auth_context.has_role_type(RoleType.SCHOOL_ADMIN):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not authorized to view payments",
@@ -117,7 +126,7 @@ def search_payments(
         .join(User)
         .outerjoin(Student)
         .outerjoin(Teacher)
-        .filter(Payment.school_id == user.school_id)
+        .filter(Payment.school_id == auth_context.school_id)
         .options(
             joinedload(Payment.users)
             .joinedload(PaymentUserAssociation.user)
@@ -196,6 +205,32 @@ def search_payments(
     return (transform_payment(payment) for payment in payments)
 
 
+@router.get("/payment/summary")
+def get_payment_summary(
+    db: ReadOnlyDatabaseDependency,
+    auth_context: AuthPrincipalDependency,
+    start_date: typing.Optional[datetime.datetime] = Query(
+        None, description="Include payments dated from this date"
+    ),
+    end_date: typing.Optional[datetime.datetime] = Query(
+        None, description="Include payments dated before this date"
+    ),
+) -> PaymentSummary:
+
+    if not auth_context.has_role_type(RoleType.SCHOOL_ADMIN):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not authorized to view payments",
+        )
+
+    school_id = auth_context.school_id or raise_exception()
+
+    groups = to_payment_groups(
+        db.execute(payment_totals_statement(school_id, start_date, end_date))
+    )
+    return PaymentSummary.from_groups(groups, start_date, end_date)
+
+
 class createPayment(BaseModel):
     amount: str
     student_id: uuid.UUID
@@ -229,12 +264,11 @@ def update_payment():
 @router.delete("/payment/delete/{payment_id}")
 def delete_payment(
     db: DatabaseDependency,
-    auth_context: UserAuthenticationContextDependency,
+    auth_context: AuthPrincipalDependency,
     payment_id: uuid.UUID,
 ):
-    user = db.query(User).filter(User.id == auth_context.user_id).first()
 
-    if not user or not user.has_role_type(RoleType.SCHOOL_ADMIN):
+    if not auth_context.has_role_type(RoleType.SCHOOL_ADMIN):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not authorized to delete payments",
@@ -242,7 +276,7 @@ def delete_payment(
 
     payment = (
         db.query(Payment)
-        .filter(Payment.id == payment_id, Payment.school_id == user.school_id)
+        .filter(Payment.id == payment_id, Payment.school_id == auth_context.school_id)
         .first()
     )
     if not payment:
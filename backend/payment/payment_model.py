@@ -1,5 +1,5 @@
 import datetime
-from sqlalchemy import ForeignKey, UUID, func
+from sqlalchemy import ForeignKey, Index, UUID, func
 from sqlalchemy.orm import relationship, mapped_column, Mapped
 import uuid
 import enum
@@ -79,6 +79,8 @@ class Payment(Base):
         back_populates="payment",
     )
 
+    __table_args__ = (Index("ix_payments_school_id_date", "school_id", "date"),)
+
     @property
     def payee(self):
         association = next(
@@ -152,6 +154,8 @@ class PaymentUserAssociation(Base):
     payment: Mapped["Payment"] = relationship("Payment", back_populates="users")
     user: Mapped["User"] = relationship("User", back_populates="payment_associations")
 
+    __table_args__ = (Index("ix_payment_user_associations_user_id", "user_id"),)
+
     def __init__(
         self, payment_id: uuid.UUID, user_id: uuid.UUID, type: PaymentUserType
     ):
@@ -0,0 +1,127 @@
+import datetime
+import decimal
+import typing
+import uuid
+from pydantic import BaseModel
+from sqlalchemy import Select, func, select
+
+from backend.payment.payment_model import Payment, PaymentDirection, PaymentStatus
+
+
+class PaymentTotals(BaseModel):
+    amount: decimal.Decimal
+    count: int
+
+
+class PaymentGroupTotals(PaymentTotals):
+    method: str
+    direction: str
+    status: str
+
+
+def payment_totals_statement(
+    school_id: uuid.UUID,
+    start_date: typing.Optional[datetime.datetime] = None,
+    end_date: typing.Optional[datetime.datetime] = None,
+) -> Select:
+    """
+    Amount and count per (method, direction, status) of a school's payments
+    dated in [start_date, end_date); a few dozen rows whatever the volume.
+    """
+    statement = (
+        select(
+            Payment.method,
+            Payment.direction,
+            Payment.status,
+            func.coalesce(func.sum(Payment.amount), 0),
+            func.count(),
+        )
+        .where(Payment.school_id == school_id)
+        .group_by(Payment.method, Payment.direction, Payment.status)
+        .order_by(Payment.method, Payment.direction, Payment.status)
+    )
+    if start_date is not None:
+        statement = statement.where(Payment.date >= start_date)
+    if end_date is not None:
+        statement = statement.where(Payment.date < end_date)
+    return statement
+
+
+def to_payment_groups(rows: typing.Iterable[typing.Any]) -> list[PaymentGroupTotals]:
+    return [
+        PaymentGroupTotals(
+            method=method,
+            direction=direction,
+            status=status,
+            amount=decimal.Decimal(amount),
+            count=count,
+        )
+        for method, direction, status, amount, count in rows
+    ]
+
+
+def add_totals(
+    totals: dict[str, PaymentTotals], key: str, group: PaymentGroupTotals
+) -> None:
+    current = totals.setdefault(
+        key, PaymentTotals(amount=decimal.Decimal("0"), count=0)
+    )
+    current.amount += group.amount
+    current.count += group.count
+
+
+class PaymentSummary(BaseModel):
+    start_date: typing.Optional[datetime.datetime]
+    end_date: typing.Optional[datetime.datetime]
+    # --- completed payments only
+    total_received: decimal.Decimal
+    total_paid_out: decimal.Decimal
+    net: decimal.Decimal
+    received_by_method: dict[str, PaymentTotals]
+    # --- every payment, whatever its direction
+    by_status: dict[str, PaymentTotals]
+    groups: list[PaymentGroupTotals]
+
+    @classmethod
+    def from_groups(
+        cls,
+        groups: list[PaymentGroupTotals],
+        start_date: typing.Optional[datetime.datetime] = None,
+        end_date: typing.Optional[datetime.datetime] = None,
+    ) -> "PaymentSummary":
+        completed = [
+            group for group in groups if group.status == PaymentStatus.COMPLETED.value
+        ]
+        received = [
+            group
+            for group in completed
+            if group.direction == PaymentDirection.INBOUND.value
+        ]
+        total_received = sum((group.amount for group in received), decimal.Decimal("0"))
+        total_paid_out = sum(
+            (
+                group.amount
+                for group in completed
+                if group.direction == PaymentDirection.OUTBOUND.value
+            ),
+            decimal.Decimal("0"),
+        )
+
+        received_by_method: dict[str, PaymentTotals] = {}
+        for group in received:
+            add_totals(received_by_method, group.method, group)
+
+        by_status: dict[str, PaymentTotals] = {}
+        for group in groups:
+            add_totals(by_status, group.status, group)
+
+        return cls(
+            start_date=start_date,
+            end_date=end_date,
+            total_received=total_received,
+            total_paid_out=total_paid_out,
+            net=total_received - total_paid_out,
+            received_by_method=received_by_method,
+            by_status=by_status,
+            groups=groups,
+        )
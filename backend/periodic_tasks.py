@@ -0,0 +1,61 @@
+import asyncio
+import logging
+import os
+import typing
+from dataclasses import dataclass
+
+logger = logging.getLogger(__name__)
+
+PERIODIC_TASKS_ENABLED = (
+    os.environ.get("PERIODIC_TASKS_ENABLED", "true").lower() == "true"
+)
+
+
+@dataclass(frozen=True)
+class PeriodicTask:
+    name: str
+    interval_seconds: float
+    # --- blocking callable, run on a worker thread so it can use the sync
+    # --- SQLAlchemy session without stalling the event loop
+    run: typing.Callable[[], typing.Any]
+    # --- keeps this process's own state in step, so it runs on every process
+    # --- even where PERIODIC_TASKS_ENABLED leaves the shared jobs to others
+    every_process: bool = False
+
+
+periodic_tasks: list[PeriodicTask] = []
+
+
+def register_periodic_task(task: PeriodicTask) -> None:
+    periodic_tasks.append(task)
+
+
+async def run_periodically(task: PeriodicTask) -> None:
+    while True:
+        try:
+            result = await asyncio.to_thread(task.run)
+            logger.log(
+                logging.DEBUG if task.every_process else logging.INFO,
+                "periodic task %s finished: %s",
+                task.name,
+                result,
+            )
+        except Exception:
+            logger.exception("periodic task %s failed", task.name)
+
+        await asyncio.sleep(task.interval_seconds)
+
+
+def start_periodic_tasks() -> list[asyncio.Task]:
+    return [
+        asyncio.create_task(run_periodically(task), name=task.name)
+        for task in periodic_tasks
+        if PERIODIC_TASKS_ENABLED or task.every_process
+    ]
+
+
+async def stop_periodic_tasks(tasks: list[asyncio.Task]) -> None:
+    for task in tasks:
+        task.cancel()
+
+    await asyncio.gather(*tasks, return_exceptions=True)
@@ -0,0 +1,53 @@
+import hashlib
+import json
+import os
+import typing
+from dataclasses import dataclass
+from fastapi import Response
+from fastapi.encoders import jsonable_encoder
+
+from backend.ttl_cache import TTLCache
+
+DASHBOARD_CACHE_MAX_SIZE = int(os.environ.get("DASHBOARD_CACHE_MAX_SIZE", "10000"))
+# --- a write elsewhere moves this process's versions within
+# --- CACHE_INVALIDATION_POLL_INTERVAL_SECONDS; the TTL is a backstop
+DASHBOARD_CACHE_TTL_SECONDS = float(os.environ.get("DASHBOARD_CACHE_TTL_SECONDS", "60"))
+
+
+@dataclass(frozen=True)
+class CachedDashboard:
+    content: bytes
+    etag: str
+
+    @classmethod
+    def from_content(cls, content: typing.Any) -> "CachedDashboard":
+        body = json.dumps(jsonable_encoder(content), separators=(",", ":")).encode()
+        return cls(content=body, etag=f'"{hashlib.sha1(body).hexdigest()}"')
+
+
+# --- keyed by (school_id, teacher_id, filter_type, period start, year,
+# --- school data version)
+dashboard_cache: TTLCache[tuple, CachedDashboard] = TTLCache(
+    max_size=DASHBOARD_CACHE_MAX_SIZE, ttl_seconds=DASHBOARD_CACHE_TTL_SECONDS
+)
+
+
+def etag_matches(if_none_match: typing.Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    return any(
+        tag.strip().removeprefix("W/") in (etag, "*")
+        for tag in if_none_match.split(",")
+    )
+
+
+def dashboard_response(
+    dashboard: CachedDashboard, if_none_match: typing.Optional[str]
+) -> Response:
+    # --- no-cache: browsers keep the copy but revalidate it on every poll
+    headers = {"ETag": dashboard.etag, "Cache-Control": "private, no-cache"}
+    if etag_matches(if_none_match, dashboard.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(
+        content=dashboard.content, media_type="application/json", headers=headers
+    )
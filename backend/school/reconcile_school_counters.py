@@ -0,0 +1,46 @@
+"""
+Backfills or repairs school_counters from the counted tables, for one
+school or all of them:
+
+    python -m backend.school.reconcile_school_counters [--school-id <uuid>]
+"""
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from backend.database.all_models import get_all_models
+
+get_all_models()
+
+import argparse
+import uuid
+from sqlalchemy import select
+
+from backend.database.database import SQLAlchemySessionLocal
+from backend.school.school_counters import reconcile_school_counters
+from backend.school.school_model import School
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--school-id", type=uuid.UUID)
+    args = parser.parse_args()
+
+    with SQLAlchemySessionLocal() as db:
+        if args.school_id is not None:
+            school_ids = [args.school_id]
+        else:
+            school_ids = list(db.scalars(select(School.id).order_by(School.id)))
+
+    drifted = 0
+    for school_id in school_ids:
+        with SQLAlchemySessionLocal() as db:
+            drifted += reconcile_school_counters(db, school_id)
+            db.commit()
+
+    print(f"reconciled {len(school_ids)} schools, {drifted} had drifted")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,32 +1,49 @@
 import datetime
+import time
 import typing
 from pydantic import BaseModel
 from dataclasses import dataclass
 import decimal
 import uuid
 from pydantic import BaseModel
-from fastapi import APIRouter, HTTPException, status, Query
-from sqlalchemy import func
+from fastapi import APIRouter, Cookie, Header, HTTPException, status, Query
+from sqlalchemy import Select, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
 
 #
 from backend.classroom.classroom_model import Classroom
 from backend.database.database import DatabaseDependency
+from backend.database.query_fan_out import Section, fan_out
+from backend.database.async_database import AsyncSQLAlchemySessionLocal
 from backend.student.parent.parent_model import ParentStudentAssociation
-from backend.payment.payment_model import Payment
+from backend.payment.payment_summary import (
+    PaymentGroupTotals,
+    payment_totals_statement,
+    to_payment_groups,
+)
 from backend.raise_exception import raise_exception
 from backend.school.school_model import (
     School,
+    SchoolCounter,
     SchoolStudentAssociation,
-    SchoolParentAssociation,
     SchoolParent,
 )
-from backend.student.student_model import Student, Gender
+from backend.student.student_model import Student
 from backend.teacher.teacher_model import ClassTeacherAssociation, Teacher
-from backend.attendance.attendance_models import Attendance, AttendanceStatus
-from backend.user.user_models import User, RoleType
-from backend.user.user_authentication import UserAuthenticationContextDependency
+from backend.attendance.attendance_models import AttendanceDailyRollup
+from backend.attendance.attendance_rollups import ROLLUP_COUNTERS
+from backend.user.user_models import RoleType
+from backend.user.user_authentication import AuthPrincipalDependency
 from backend.teacher.teacher_schemas import to_teacher_dto
 from backend.student.student_schemas import to_student_dto
+from backend.school.dashboard_cache import (
+    CachedDashboard,
+    dashboard_cache,
+    dashboard_response,
+)
+from backend.school.school_counters import school_enrollments
+from backend.school.school_data_version import get_school_data_version
 from backend.school.school_schemas import UpdateSchool
 
 router = APIRouter()
@@ -98,110 +115,42 @@ def calculate_date_range(
     return DateRangeResult(start_date=start_date, end_date=end_date)
 
 
-@dataclass
-class MetricsCounter:
-    total_present: int = 0
-    total_absent: int = 0
-    total_present_male: int = 0
-    total_present_female: int = 0
-    total_absent_male: int = 0
-    total_absent_female: int = 0
-
-
-def get_classroom_attendance_metrics(
-    db: DatabaseDependency,
-    school_id: uuid.UUID,
-    classroom_id: uuid.UUID,
-    filter_type: str = "day",
-    filter_date: typing.Optional[datetime.datetime] = None,
-) -> AttendanceMetrics:
-
-    date_range_result = calculate_date_range(filter_type, filter_date)
-
-    query = db.query(Attendance).filter(
-        Attendance.school_id == school_id,
-        Attendance.classroom_id == classroom_id,
-        Attendance.date >= date_range_result.start_date,
-        Attendance.date < date_range_result.end_date,
-    )
-
-    attendances = query.all()
-
-    metrics = MetricsCounter()
-
-    # Single pass through the data
-    for attendance in attendances:
-        if attendance.status == AttendanceStatus.PRESENT.value:
-            metrics.total_present += 1
-            if attendance.student.gender == Gender.MALE.value:
-                metrics.total_present_male += 1
-            elif attendance.student.gender == Gender.FEMALE.value:
-                metrics.total_present_female += 1
-        elif attendance.status == AttendanceStatus.ABSENT.value:
-            metrics.total_absent += 1
-            if attendance.student.gender == Gender.MALE.value:
-                metrics.total_absent_male += 1
-            elif attendance.student.gender == Gender.FEMALE.value:
-                metrics.total_absent_female += 1
-        else:
-            raise Exception()
-
-    return AttendanceMetrics(
-        total_present=metrics.total_present,
-        total_absent=metrics.total_absent,
-        total_present_male=metrics.total_present_male,
-        total_present_female=metrics.total_present_female,
-        total_absent_male=metrics.total_absent_male,
-        total_absent_female=metrics.total_absent_female,
-        start_date=date_range_result.start_date,
-        end_date=date_range_result.end_date,
-        filter_type=filter_type,
-    )
-
-
-def get_entire_school_attendance_metrics(
-    db: DatabaseDependency,
+async def get_attendance_metrics(
+    db: AsyncSession,
     school_id: uuid.UUID,
+    classroom_id: typing.Optional[uuid.UUID] = None,
     filter_type: str = "day",
     filter_date: typing.Optional[datetime.datetime] = None,
 ) -> AttendanceMetrics:
+    """
+    Attendance totals for the whole school, or for one classroom, summed
+    from the daily rollups: at most one row per classroom per day in range.
+    """
 
     date_range_result = calculate_date_range(filter_type, filter_date)
 
-    query = db.query(Attendance).filter(
-        Attendance.school_id == school_id,
-        Attendance.date >= date_range_result.start_date,
-        Attendance.date < date_range_result.end_date,
+    query = select(
+        *[
+            func.coalesce(func.sum(getattr(AttendanceDailyRollup, counter)), 0)
+            for counter in ROLLUP_COUNTERS
+        ]
+    ).where(
+        AttendanceDailyRollup.school_id == school_id,
+        AttendanceDailyRollup.date >= date_range_result.start_date.date(),
+        AttendanceDailyRollup.date < date_range_result.end_date.date(),
     )
+    if classroom_id is not None:
+        query = query.where(AttendanceDailyRollup.classroom_id == classroom_id)
 
-    attendances = query.all()
-
-    metrics = MetricsCounter()
-
-    for attendance in attendances:
-
-        if attendance.status == AttendanceStatus.PRESENT.value:
-            metrics.total_present += 1
-            if attendance.student.gender == Gender.MALE.value:
-                metrics.total_present_male += 1
-            elif attendance.student.gender == Gender.FEMALE.value:
-                metrics.total_present_female += 1
-        elif attendance.status == AttendanceStatus.ABSENT.value:
-            metrics.total_absent += 1
-            if attendance.student.gender == Gender.MALE.value:
-                metrics.total_absent_male += 1
-            elif attendance.student.gender == Gender.FEMALE.value:
-                metrics.total_absent_female += 1
-        else:
-            raise Exception()
+    totals = dict(zip(ROLLUP_COUNTERS, (await db.execute(query)).one()))
 
     return AttendanceMetrics(
-        total_present=metrics.total_present,
-        total_absent=metrics.total_absent,
-        total_present_male=metrics.total_present_male,
-        total_present_female=metrics.total_present_female,
-        total_absent_male=metrics.total_absent_male,
-        total_absent_female=metrics.total_absent_female,
+        total_present=totals["present_total"],
+        total_absent=totals["absent_total"],
+        total_present_male=totals["present_male"],
+        total_present_female=totals["present_female"],
+        total_absent_male=totals["absent_male"],
+        total_absent_female=totals["absent_female"],
         start_date=date_range_result.start_date,
         end_date=date_range_result.end_date,
         filter_type=filter_type,
@@ -214,20 +163,23 @@ class PaymentStats(BaseModel):
     year: int
 
     @classmethod
-    def from_payments(cls, payments: list[Payment], year: int) -> "PaymentStats":
+    def from_groups(cls, groups: list[PaymentGroupTotals], year: int) -> "PaymentStats":
+        """
+        Folds the per (method, direction, status) totals computed in SQL,
+        counting every payment of the year as before.
+        """
         method_stats: dict[str, PaymentMethodStats] = {}
-        total_received_amount = decimal.Decimal("0")  # Initialize as Decimal
+        total_received_amount = decimal.Decimal("0")
 
-        # Group payments by method and calculate stats
-        for payment in payments:
-            if payment.method not in method_stats:
-                method_stats[payment.method] = PaymentMethodStats(
+        for group in groups:
+            if group.method not in method_stats:
+                method_stats[group.method] = PaymentMethodStats(
                     amount=decimal.Decimal("0"), count=0
                 )
 
-            method_stats[payment.method].amount += payment.amount
-            method_stats[payment.method].count += 1
-            total_received_amount += payment.amount
+            method_stats[group.method].amount += group.amount
+            method_stats[group.method].count += group.count
+            total_received_amount += group.amount
 
         return cls(
             total_received_amount=total_received_amount,
@@ -237,8 +189,8 @@ class PaymentStats(BaseModel):
 
 
 def dashboard_resources_dto(
-    students: list[Student],
-    teachers: list[Teacher],
+    students: typing.Sequence[Student],
+    teachers: typing.Sequence[Teacher],
     total_students_managed: int | None,
     total_current_year_students_enrollment: int | None,
     total_teachers_managed: int | None,
@@ -261,209 +213,224 @@ def dashboard_resources_dto(
     }
 
 
+def scalar_section(statement: Select) -> Section:
+    return lambda db: db.scalar(statement)
+
+
+def scalars_section(statement: Select) -> Section:
+    async def section(db: AsyncSession):
+        return (await db.scalars(statement)).all()
+
+    return section
+
+
 @router.get("/school/dashboard-resources")
 async def get_all_students(
-    db: DatabaseDependency,
-    auth_context: UserAuthenticationContextDependency,
+    auth_context: AuthPrincipalDependency,
     filter_type: str = Query("day", enum=["day", "week", "month", "year"]),
     filter_date: typing.Optional[datetime.datetime] = Query(
         None, description="Filter date, defaults to today"
     ),
+    if_none_match: typing.Annotated[str | None, Header()] = None,
+    read_your_writes_until: typing.Annotated[
+        float | None, Cookie(include_in_schema=False)
+    ] = None,
 ):
-    user = db.query(User).filter(User.id == auth_context.user_id).first()
+    """
+    The dashboard's sections are independent queries run concurrently, each
+    on its own session; their timings are reported as Server-Timing entries.
 
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="User not authorized",
-        )
+    Responses are cached per school, scope and period until the school's
+    data version moves, and carry an ETag: an unchanged dashboard is a 304
+    straight from the cache.
 
-    school_id = user.school_id or raise_exception()
+    The cache is filled from the primary: a replica that has not replayed
+    the write behind a new version would cache a stale body under it. A
+    client that wrote recently skips the cached copy, which another worker
+    keeps until its invalidation poller reads the write.
+    """
+
+    school_id = auth_context.school_id or raise_exception()
+
+    if auth_context.has_role_type(RoleType.SCHOOL_ADMIN):
+        teacher_id = None
+    elif auth_context.has_role_type(RoleType.CLASS_TEACHER):
+        teacher_id = auth_context.teacher_id or raise_exception()
+    else:
+        raise HTTPException(403)
 
     current_year = datetime.datetime.now().year
     year_start = datetime.datetime(current_year, 1, 1)
     year_end = datetime.datetime(current_year + 1, 1, 1)
 
-    all_payments_for_this_year = (
-        db.query(Payment)
-        .filter(
-            Payment.school_id == school_id,
-            Payment.date >= year_start,
-            Payment.date < year_end,
-        )
-        .all()
+    # --- the version is read before any query, so a write landing meanwhile
+    # --- moves later requests to a new key
+    cache_key = (
+        school_id,
+        teacher_id,
+        filter_type,
+        calculate_date_range(filter_type, filter_date).start_date,
+        current_year,
+        get_school_data_version(school_id),
     )
-
-    payment_summary = PaymentStats.from_payments(
-        all_payments_for_this_year, current_year
+    reads_own_writes = bool(
+        read_your_writes_until and read_your_writes_until > time.time()
     )
+    cached_dashboard = None if reads_own_writes else dashboard_cache.get(cache_key)
+    if cached_dashboard:
+        return dashboard_response(cached_dashboard, if_none_match)
 
-    if user.has_role_type(RoleType.SCHOOL_ADMIN):
-        total_students_managed = (
-            db.query(func.count(Student.id))
-            .join(SchoolStudentAssociation)
-            .filter(SchoolStudentAssociation.school_id == school_id)
-            .scalar()
-        )
-        total_parents = (
-            db.query(func.count(SchoolParent.id))
-            .join(SchoolParentAssociation)
-            .filter(SchoolParentAssociation.school_id == school_id)
-            .scalar()
-        )
-        total_teachers_managed = (
-            db.query(func.count(Teacher.id))
-            .filter(Teacher.school_id == school_id)
-            .scalar()
-        )
-        overall_school_students_created_this_year = (
-            db.query(func.count(Student.id))
-            .join(SchoolStudentAssociation)
-            .filter(
-                SchoolStudentAssociation.school_id == school_id,
-                Student.created_at >= year_start,
-                Student.created_at < year_end,
-            )
-            .scalar()
-        )
-
-        students = (
-            db.query(Student)
-            .join(SchoolStudentAssociation)
-            .filter(SchoolStudentAssociation.school_id == school_id)
-            .limit(6)
-            .all()
-        )
-
-        teachers = (
-            db.query(Teacher).filter(Teacher.school_id == school_id).limit(6).all()
-        )
-        #
-        #
-        #
-        attendance_metrics = get_entire_school_attendance_metrics(
-            db,
-            school_id=school_id,
-            filter_type=filter_type,
-            filter_date=filter_date,
+    async def payments_section(db: AsyncSession) -> PaymentStats:
+        groups = to_payment_groups(
+            await db.execute(payment_totals_statement(school_id, year_start, year_end))
         )
+        return PaymentStats.from_groups(groups, current_year)
+
+    if teacher_id is None:
+        sections: dict[str, Section] = {
+            "payments": payments_section,
+            # --- the school-wide totals are one primary-key read
+            "counters": scalar_section(
+                select(SchoolCounter).where(SchoolCounter.school_id == school_id)
+            ),
+            "students": scalars_section(
+                select(Student)
+                .join(SchoolStudentAssociation)
+                .where(SchoolStudentAssociation.school_id == school_id)
+                .options(selectinload(Student.user))
+                .limit(6)
+            ),
+            "teachers": scalars_section(
+                select(Teacher).where(Teacher.school_id == school_id).limit(6)
+            ),
+            "attendance": lambda db: get_attendance_metrics(
+                db,
+                school_id=school_id,
+                filter_type=filter_type,
+                filter_date=filter_date,
+            ),
+        }
 
-    elif user.has_role_type(RoleType.CLASS_TEACHER):
-        teacher_id = user.teacher_user.id or raise_exception()
-
-        total_students_managed = (
-            db.query(func.count(Student.id))
-            .join(Student.classroom)
-            .join(Classroom.teacher_associations)
-            .filter(
-                ClassTeacherAssociation.teacher_id == teacher_id,
-                ClassTeacherAssociation.is_primary == True,
-            )
-            .scalar()
-        )
-
-        overall_school_students_created_this_year = (
-            db.query(func.count(Student.id))
-            .join(Student.classroom)
-            .join(Classroom.teacher_associations)
-            .filter(
-                ClassTeacherAssociation.teacher_id == teacher_id,
-                ClassTeacherAssociation.is_primary == True,
-                Student.created_at >= year_start,
-                Student.created_at < year_end,
-            )
-            .scalar()
-        )
-
-        students = (
-            db.query(Student)
-            .join(Student.classroom)
-            .join(Classroom.teacher_associations)
-            .filter(
-                ClassTeacherAssociation.teacher_id == teacher_id,
-                ClassTeacherAssociation.is_primary == True,
-            )
-            .limit(6)
-            .all()
-        )
-        #
-        # ---
-        #
-        classroom = (
-            db.query(Classroom)
-            .join(ClassTeacherAssociation)
-            .filter(
-                ClassTeacherAssociation.teacher_id == teacher_id,
-                ClassTeacherAssociation.is_primary == True,
+    else:
+        # --- the classroom scopes the remaining sections, so it comes first
+        async with AsyncSQLAlchemySessionLocal() as db:
+            classroom = await db.scalar(
+                select(Classroom)
+                .join(ClassTeacherAssociation)
+                .where(
+                    ClassTeacherAssociation.teacher_id == teacher_id,
+                    ClassTeacherAssociation.is_primary == True,
+                )
+                .limit(1)
             )
-            .first()
-        )
         if not classroom:
             raise Exception()
 
-        total_teachers_managed = (
-            db.query(func.count(Teacher.id))
-            .join(ClassTeacherAssociation)
-            .filter(ClassTeacherAssociation.classroom_id == classroom.id)
-            .scalar()
-        )
-
-        total_parents = (
-            db.query(func.count(SchoolParent.id))
-            .join(ParentStudentAssociation)
-            .join(Student)
-            .filter(Student.classroom_id == classroom.id)
-            .scalar()
-        )
-        teachers = (
-            db.query(Teacher)
-            .join(ClassTeacherAssociation)
-            .filter(ClassTeacherAssociation.classroom_id == classroom.id)
-            .limit(6)
-            .all()
+        sections = {
+            "payments": payments_section,
+            "students-total": scalar_section(
+                select(func.count(Student.id))
+                .join(Student.classroom)
+                .join(Classroom.teacher_associations)
+                .where(
+                    ClassTeacherAssociation.teacher_id == teacher_id,
+                    ClassTeacherAssociation.is_primary == True,
+                )
+            ),
+            "parents-total": scalar_section(
+                select(func.count(SchoolParent.id))
+                .join(ParentStudentAssociation)
+                .join(Student)
+                .where(Student.classroom_id == classroom.id)
+            ),
+            "teachers-total": scalar_section(
+                select(func.count(Teacher.id))
+                .join(ClassTeacherAssociation)
+                .where(ClassTeacherAssociation.classroom_id == classroom.id)
+            ),
+            "enrollment-total": scalar_section(
+                select(func.count(Student.id))
+                .join(Student.classroom)
+                .join(Classroom.teacher_associations)
+                .where(
+                    ClassTeacherAssociation.teacher_id == teacher_id,
+                    ClassTeacherAssociation.is_primary == True,
+                    Student.created_at >= year_start,
+                    Student.created_at < year_end,
+                )
+            ),
+            "students": scalars_section(
+                select(Student)
+                .join(Student.classroom)
+                .join(Classroom.teacher_associations)
+                .where(
+                    ClassTeacherAssociation.teacher_id == teacher_id,
+                    ClassTeacherAssociation.is_primary == True,
+                )
+                .options(selectinload(Student.user))
+                .limit(6)
+            ),
+            "teachers": scalars_section(
+                select(Teacher)
+                .join(ClassTeacherAssociation)
+                .where(ClassTeacherAssociation.classroom_id == classroom.id)
+                .limit(6)
+            ),
+            "attendance": lambda db: get_attendance_metrics(
+                db,
+                school_id=school_id,
+                classroom_id=classroom.id,
+                filter_type=filter_type,
+                filter_date=filter_date,
+            ),
+        }
+
+    dashboard = await fan_out(AsyncSQLAlchemySessionLocal, sections)
+
+    if teacher_id is None:
+        counter: typing.Optional[SchoolCounter] = dashboard.results["counters"]
+        dashboard.results.update(
+            {
+                "students-total": counter.students if counter else 0,
+                "parents-total": counter.parents if counter else 0,
+                "teachers-total": counter.teachers if counter else 0,
+                "enrollment-total": (
+                    school_enrollments(counter, current_year) if counter else 0
+                ),
+            }
         )
 
-        attendance_metrics = get_classroom_attendance_metrics(
-            db,
-            school_id=school_id,
-            classroom_id=classroom.id,
-            filter_type=filter_type,
-            filter_date=filter_date,
+    cached_dashboard = CachedDashboard.from_content(
+        dashboard_resources_dto(
+            students=dashboard.results["students"],
+            total_students_managed=dashboard.results["students-total"],
+            total_current_year_students_enrollment=dashboard.results[
+                "enrollment-total"
+            ],
+            current_year=current_year,
+            payments=dashboard.results["payments"],
+            attendance_metrics=dashboard.results["attendance"],
+            teachers=dashboard.results["teachers"],
+            total_teachers_managed=dashboard.results["teachers-total"],
+            parents_total=dashboard.results["parents-total"],
         )
-
-    else:
-        raise HTTPException(403)
-
-    return dashboard_resources_dto(
-        students=students,
-        total_students_managed=total_students_managed,
-        total_current_year_students_enrollment=overall_school_students_created_this_year,
-        current_year=current_year,
-        payments=payment_summary,
-        attendance_metrics=attendance_metrics,
-        teachers=teachers,
-        total_teachers_managed=total_teachers_managed,
-        parents_total=total_parents,
     )
+    dashboard_cache.set(cache_key, cached_dashboard)
+
+    response = dashboard_response(cached_dashboard, if_none_match)
+    response.headers.append("Server-Timing", dashboard.server_timing("dashboard"))
+    return response
 
 
 @router.get("/school/list", status_code=status.HTTP_200_OK)
 def get_school(
     db: DatabaseDependency,
-    auth_context: UserAuthenticationContextDependency,
+    auth_context: AuthPrincipalDependency,
     limit: int = Query(10, ge=1),
     offset: int = Query(0, ge=0),
 ):
 
-    user = db.query(User).filter(User.id == auth_context.user_id).first()
-
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="User not authorized",
-        )
-
-    if not user.has_role_type(RoleType.SUPER_ADMIN):
+    if not auth_context.has_role_type(RoleType.SUPER_ADMIN):
         raise HTTPException(status_code=403, detail="permission-denied")
 
     schools = db.query(School).offset(offset).limit(limit).all()
@@ -474,27 +441,19 @@ def get_school(
 @router.get("/school/by-school-id/{school_id}")
 def get_school_by_id(
     db: DatabaseDependency,
-    auth_context: UserAuthenticationContextDependency,
+    auth_context: AuthPrincipalDependency,
 ):
 
-    user = db.query(User).filter(User.id == auth_context.user_id).first()
-
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="User not authorized",
-        )
-
     if not (
-        user.has_role_type(RoleType.CLASS_TEACHER)
-        or user.has_role_type(RoleType.TEACHER)
-        or user.has_role_type(RoleType.SCHOOL_ADMIN)
+        auth_context.has_role_type(RoleType.CLASS_TEACHER)
+        or auth_context.has_role_type(RoleType.TEACHER)
+        or auth_context.has_role_type(RoleType.SCHOOL_ADMIN)
     ):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN, detail="permission-denied"
         )
 
-    school = db.query(School).filter(School.id == user.school_id).first()
+    school = db.query(School).filter(School.id == auth_context.school_id).first()
     if not school:
         raise HTTPException(status_code=404, detail="school-not-found")
 
@@ -505,18 +464,10 @@ def get_school_by_id(
 def update_school(
     db: DatabaseDependency,
     body: UpdateSchool,
-    auth_context: UserAuthenticationContextDependency,
+    auth_context: AuthPrincipalDependency,
     school_id: uuid.UUID,
 ):
 
-    user = db.query(User).filter(User.id == auth_context.user_id).first()
-
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="User not authorized",
-        )
-
     school = db.query(School).filter(School.id == school_id).first()
     if not school:
         raise HTTPException(status_code=404, detail="school-not-found")
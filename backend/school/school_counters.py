@@ -0,0 +1,199 @@
+import datetime
+import logging
+import os
+import typing
+import uuid
+from sqlalchemy import ColumnElement, case, func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from backend.classroom.classroom_model import Classroom
+from backend.database.database import SQLAlchemySessionLocal
+from backend.periodic_tasks import PeriodicTask, register_periodic_task
+from backend.school.school_data_version import mark_school_data_written
+from backend.school.school_model import (
+    School,
+    SchoolCounter,
+    SchoolParentAssociation,
+    SchoolStudentAssociation,
+)
+from backend.student.student_model import Student
+from backend.teacher.teacher_model import Teacher
+
+logger = logging.getLogger(__name__)
+
+SCHOOL_COUNTERS_RECONCILE_INTERVAL_SECONDS = float(
+    os.environ.get("SCHOOL_COUNTERS_RECONCILE_INTERVAL_SECONDS", "3600")
+)
+
+SCHOOL_COUNTERS = [
+    "students",
+    "active_students",
+    "teachers",
+    "parents",
+    "classrooms",
+    "enrollments",
+]
+
+
+def current_enrollment_year() -> int:
+    # --- same calendar year as the dashboard's enrollment total
+    return datetime.datetime.now().year
+
+
+def add_to_school_counters(
+    db: Session,
+    school_id: uuid.UUID,
+    students: int = 0,
+    active_students: int = 0,
+    teachers: int = 0,
+    parents: int = 0,
+    classrooms: int = 0,
+    enrollments: int = 0,
+) -> None:
+    """
+    Adds the deltas to the school's counter row in the caller's transaction.
+    The row stays locked until the caller commits, so call this after the
+    request's other writes to keep that window short.
+    """
+    deltas = {
+        "students": students,
+        "active_students": active_students,
+        "teachers": teachers,
+        "parents": parents,
+        "classrooms": classrooms,
+        "enrollments": enrollments,
+    }
+    if not any(deltas.values()):
+        return
+
+    statement = insert(SchoolCounter).values(
+        school_id=school_id, enrollment_year=current_enrollment_year(), **deltas
+    )
+    set_: dict[str, typing.Any] = {
+        counter: getattr(SchoolCounter, counter) + statement.excluded[counter]
+        for counter in SCHOOL_COUNTERS
+    }
+    set_["enrollments"] = case(
+        (
+            SchoolCounter.enrollment_year == statement.excluded.enrollment_year,
+            SchoolCounter.enrollments + statement.excluded.enrollments,
+        ),
+        else_=statement.excluded.enrollments,
+    )
+    set_["enrollment_year"] = statement.excluded.enrollment_year
+    set_["updated_at"] = func.now()
+
+    db.execute(
+        statement.on_conflict_do_update(
+            index_elements=[SchoolCounter.school_id], set_=set_
+        )
+    )
+
+
+def school_enrollments(counter: SchoolCounter, year: int) -> int:
+    return counter.enrollments if counter.enrollment_year == year else 0
+
+
+def count_school_rows(school_id: uuid.UUID, enrollment_year: int):
+    """
+    The counters recounted from the source tables, one scalar subquery each.
+    """
+    year_start = datetime.datetime(enrollment_year, 1, 1)
+    year_end = datetime.datetime(enrollment_year + 1, 1, 1)
+
+    def count(*filters: ColumnElement[bool]) -> typing.Any:
+        return select(func.count()).where(*filters).scalar_subquery()
+
+    return select(
+        count(SchoolStudentAssociation.school_id == school_id).label("students"),
+        count(
+            SchoolStudentAssociation.school_id == school_id,
+            SchoolStudentAssociation.is_active == True,
+        ).label("active_students"),
+        count(Teacher.school_id == school_id).label("teachers"),
+        count(SchoolParentAssociation.school_id == school_id).label("parents"),
+        count(Classroom.school_id == school_id).label("classrooms"),
+        select(func.count(Student.id))
+        .join(SchoolStudentAssociation)
+        .where(
+            SchoolStudentAssociation.school_id == school_id,
+            Student.created_at >= year_start,
+            Student.created_at < year_end,
+        )
+        .scalar_subquery()
+        .label("enrollments"),
+    )
+
+
+def reconcile_school_counters(
+    db: Session, school_id: uuid.UUID, skip_locked: bool = False
+) -> bool:
+    """
+    Recounts the school's counters and overwrites the ones that drifted,
+    returning whether any had. The counter row is locked before counting:
+    a handler holding it has committed by the time the count runs and is
+    counted, one taking it afterwards adds its delta on top of the recount.
+    """
+    enrollment_year = current_enrollment_year()
+    db.execute(
+        insert(SchoolCounter)
+        .values(school_id=school_id, enrollment_year=enrollment_year)
+        .on_conflict_do_nothing()
+    )
+
+    counter = db.scalar(
+        select(SchoolCounter)
+        .where(SchoolCounter.school_id == school_id)
+        .with_for_update(skip_locked=skip_locked)
+        .execution_options(populate_existing=True)
+    )
+    if counter is None:
+        # --- skip_locked and a handler is writing it, left for the next run
+        return False
+
+    # --- a statement of its own, so under READ COMMITTED it sees every
+    # --- transaction that released the lock
+    counts = db.execute(count_school_rows(school_id, enrollment_year)).one()
+
+    # --- a new year restarting enrollments is not drift
+    counter.enrollment_year = enrollment_year
+    drifted = False
+    for name in SCHOOL_COUNTERS:
+        if getattr(counter, name) != getattr(counts, name):
+            drifted = True
+            setattr(counter, name, getattr(counts, name))
+    return drifted
+
+
+def reconcile_all_school_counters() -> int:
+    """
+    Reconciles every school in a short transaction of its own and returns
+    how many had drifted. Rows a handler or another worker holds are
+    skipped until the next run.
+    """
+    with SQLAlchemySessionLocal() as db:
+        school_ids = list(db.scalars(select(School.id).order_by(School.id)))
+
+    drifted = 0
+    for school_id in school_ids:
+        with SQLAlchemySessionLocal() as db:
+            repaired = reconcile_school_counters(db, school_id, skip_locked=True)
+            if repaired:
+                mark_school_data_written(db, [school_id])
+            db.commit()
+        if not repaired:
+            continue
+
+        logger.warning("school counters of %s had drifted, repaired", school_id)
+        drifted += 1
+    return drifted
+
+
+register_periodic_task(
+    PeriodicTask(
+        name="reconcile-school-counters",
+        interval_seconds=SCHOOL_COUNTERS_RECONCILE_INTERVAL_SECONDS,
+        run=reconcile_all_school_counters,
+    )
+)
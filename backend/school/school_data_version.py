@@ -0,0 +1,102 @@
+import datetime
+import threading
+import typing
+import uuid
+from collections import defaultdict
+from sqlalchemy import event
+from sqlalchemy.orm import Session, UOWTransaction
+
+from backend.database.cache_invalidations import (
+    on_cache_invalidation,
+    publish_cache_invalidation,
+)
+
+# --- tables whose writes change a school's list totals or dashboard
+COUNTED_TABLES = {
+    "attendances",
+    "students",
+    "school_student_associations",
+    "teachers",
+    "classrooms",
+    "class_teacher_associations",
+    "payments",
+    "school_parents",
+    "school_parent_associations",
+    "parent_student_associations",
+}
+
+SCHOOL_DATA_CHANNEL = "school-data"
+
+# --- per process, kept in step across processes by the cache invalidation
+# --- poller; the numbers differ between processes, only their moves matter
+_school_data_versions: defaultdict[typing.Optional[uuid.UUID], int] = defaultdict(int)
+_school_data_versions_lock = threading.Lock()
+
+
+def get_school_data_version(school_id: typing.Optional[uuid.UUID]) -> tuple[int, int]:
+    """
+    (school version, global version). Rows without a school_id, e.g. a
+    student moving classroom, bump the global version, which every school's
+    cached data depends on.
+    """
+    with _school_data_versions_lock:
+        return _school_data_versions[school_id], _school_data_versions[None]
+
+
+def bump_school_data_version(school_id: typing.Optional[uuid.UUID]) -> None:
+    with _school_data_versions_lock:
+        _school_data_versions[school_id] += 1
+
+
+def _bump_published_school_data_version(
+    key: typing.Optional[str], published_at: datetime.datetime
+) -> None:
+    bump_school_data_version(uuid.UUID(key) if key else None)
+
+
+on_cache_invalidation(SCHOOL_DATA_CHANNEL, _bump_published_school_data_version)
+
+
+def mark_school_data_written(
+    session: Session, school_ids: typing.Iterable[typing.Optional[uuid.UUID]]
+) -> None:
+    """
+    Publishes a version bump of each school to every process, once per
+    transaction; this process bumps its own when the session commits. Core
+    writes bypass the flush events below and call this before committing.
+    """
+    written_schools: set = session.info.setdefault("written_school_ids", set())
+    for school_id in set(school_ids) - written_schools:
+        publish_cache_invalidation(
+            session.connection(),
+            SCHOOL_DATA_CHANNEL,
+            str(school_id) if school_id else None,
+        )
+        written_schools.add(school_id)
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_written_schools(session: Session, flush_context: UOWTransaction):
+    mark_school_data_written(
+        session,
+        [
+            getattr(instance, "school_id", None)
+            for instance in (*session.new, *session.dirty, *session.deleted)
+            if getattr(instance, "__tablename__", None) in COUNTED_TABLES
+        ],
+    )
+
+
+# --- bump after commit so a concurrent read cannot cache pre-commit data
+# --- under the new version; only holds for reads on the primary, a replica
+# --- may still be behind the commit. Other processes bump when their poller
+# --- reads the published rows, which only become visible at the commit.
+@event.listens_for(Session, "after_commit")
+def _bump_written_schools(session: Session):
+    for school_id in session.info.pop("written_school_ids", ()):
+        bump_school_data_version(school_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_written_schools(session: Session):
+    session.info.pop("written_school_ids", None)
@@ -1,5 +1,5 @@
 import datetime
-from sqlalchemy import String, ForeignKey, UUID, func
+from sqlalchemy import String, ForeignKey, Index, UUID, func
 from sqlalchemy.orm import relationship, mapped_column, Mapped
 import uuid
 from backend.database.base import Base
@@ -118,6 +118,8 @@ class SchoolParentAssociation(Base):
         "SchoolParent", back_populates="school_parent_associations"
     )
 
+    __table_args__ = (Index("ix_school_parent_associations_parent_id", "parent_id"),)
+
     def __init__(self, school_id: uuid.UUID, parent_id: uuid.UUID):
         super().__init__()
         self.school_id = school_id
@@ -141,6 +143,8 @@ class SchoolStudentAssociation(Base):
         "Student", back_populates="school_students_associations"
     )
 
+    __table_args__ = (Index("ix_school_student_associations_student_id", "student_id"),)
+
     def __init__(self, school_id: uuid.UUID, student_id: uuid.UUID):
         super().__init__()
         self.school_id = school_id
@@ -221,3 +225,30 @@ class School(Base):
         self.country = country
         self.address = address
         self.user_id = user_id
+
+
+class SchoolCounter(Base):
+    """
+    A school's headline totals, kept in step by the handlers that create and
+    delete the counted rows and repaired by reconcile_school_counters.
+    """
+
+    __tablename__ = "school_counters"
+
+    school_id: Mapped[uuid.UUID] = mapped_column(
+        UUID, ForeignKey("schools.id"), primary_key=True
+    )
+    # --- school_student_associations, all and active
+    students: Mapped[int] = mapped_column(default=0, nullable=False)
+    active_students: Mapped[int] = mapped_column(default=0, nullable=False)
+    teachers: Mapped[int] = mapped_column(default=0, nullable=False)
+    # --- school_parent_associations
+    parents: Mapped[int] = mapped_column(default=0, nullable=False)
+    classrooms: Mapped[int] = mapped_column(default=0, nullable=False)
+    # --- students created during enrollment_year, restarts from zero with
+    # --- the first write of a new year
+    enrollments: Mapped[int] = mapped_column(default=0, nullable=False)
+    enrollment_year: Mapped[int] = mapped_column(nullable=False)
+    updated_at: Mapped[datetime.datetime] = mapped_column(
+        default=func.now(), onupdate=func.now(), nullable=False
+    )
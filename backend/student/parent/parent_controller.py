@@ -1,37 +1,33 @@
 import uuid
 
+from sqlalchemy import select
 from pydantic import BaseModel
 from fastapi import APIRouter, HTTPException, status, Query
 from backend.database.database import DatabaseDependency
+from backend.database.replica_database import ReadOnlyDatabaseDependency
 from backend.student.parent.parent_model import ParentStudentAssociation
 from backend.student.student_model import Student
-from backend.user.user_models import RoleType, User
+from backend.user.user_models import RoleType
+from backend.school.school_counters import add_to_school_counters
 from backend.school.school_model import School, SchoolParent, SchoolParentAssociation
-from backend.user.user_authentication import UserAuthenticationContextDependency
+from backend.user.user_authentication import AuthPrincipalDependency
 
 router = APIRouter()
 
 
 @router.get("/parents/list", status_code=status.HTTP_200_OK)
 async def get_parent(
-    auth_context: UserAuthenticationContextDependency,
-    db: DatabaseDependency,
+    auth_context: AuthPrincipalDependency,
+    db: ReadOnlyDatabaseDependency,
     limit: int = Query(10, ge=1),
     offset: int = Query(0, ge=0),
 ):
 
-    user = db.query(User).filter(User.id == auth_context.user_id).first()
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="User not authorized",
-        )
-
     if not (
-        user.has_role_type(RoleType.SUPER_ADMIN)
-        or user.has_role_type(RoleType.SCHOOL_ADMIN)
-        or user.has_role_type(RoleType.CLASS_TEACHER)
-        or user.has_role_type(RoleType.TEACHER)
+        auth_context.has_role_type(RoleType.SUPER_ADMIN)
+        or auth_context.has_role_type(RoleType.SCHOOL_ADMIN)
+        or auth_context.has_role_type(RoleType.CLASS_TEACHER)
+        or auth_context.has_role_type(RoleType.TEACHER)
     ):
 
         raise HTTPException(
@@ -40,8 +36,8 @@ async def get_parent(
 
     query = db.query(SchoolParent)
 
-    if not user.has_role_type(RoleType.SUPER_ADMIN):
-        school = db.query(School).filter(School.user_id == user.id).first()
+    if not auth_context.has_role_type(RoleType.SUPER_ADMIN):
+        school = db.query(School).filter(School.user_id == auth_context.user_id).first()
         if not school:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
 
@@ -58,22 +54,14 @@ async def get_parent(
 async def get_student_parents(
     db: DatabaseDependency,
     student_id: uuid.UUID,
-    auth_context: UserAuthenticationContextDependency,
+    auth_context: AuthPrincipalDependency,
 ):
 
-    user = db.query(User).filter(User.id == auth_context.user_id).first()
-
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="User not authorized",
-        )
-
     if not (
-        user.has_role_type(RoleType.SUPER_ADMIN)
-        or user.has_role_type(RoleType.SCHOOL_ADMIN)
-        or user.has_role_type(RoleType.CLASS_TEACHER)
-        or user.has_role_type(RoleType.TEACHER)
+        auth_context.has_role_type(RoleType.SUPER_ADMIN)
+        or auth_context.has_role_type(RoleType.SCHOOL_ADMIN)
+        or auth_context.has_role_type(RoleType.CLASS_TEACHER)
+        or auth_context.has_role_type(RoleType.TEACHER)
     ):
 
         raise HTTPException(
@@ -91,7 +79,7 @@ async def get_student_parents(
         .join(SchoolParentAssociation)
         .filter(
             ParentStudentAssociation.student_id == student_id,
-            SchoolParentAssociation.school_id == user.school_id,  #
+            SchoolParentAssociation.school_id == auth_context.school_id,  #
         )
         .all()
     )
@@ -110,26 +98,20 @@ class updateParent(BaseModel):
 
 @router.put("/parent/update", status_code=status.HTTP_200_OK)
 async def update_parent(
-    auth_context: UserAuthenticationContextDependency,
+    auth_context: AuthPrincipalDependency,
     db: DatabaseDependency,
     body: updateParent,
 ):
-    user = db.query(User).filter(User.id == auth_context.user_id).first()
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="User not authorized",
-        )
 
     if not (
-        user.has_role_type(RoleType.SUPER_ADMIN)
-        or user.has_role_type(RoleType.SCHOOL_ADMIN)
+        auth_context.has_role_type(RoleType.SUPER_ADMIN)
+        or auth_context.has_role_type(RoleType.SCHOOL_ADMIN)
     ):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN, detail="permission-denied"
         )
 
-    school = db.query(School).filter(School.user_id == user.id).first()
+    school = db.query(School).filter(School.user_id == auth_context.user_id).first()
     if not school:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
 
@@ -172,27 +154,21 @@ async def update_parent(
     "/parent/delete/{school_parent_id}", status_code=status.HTTP_204_NO_CONTENT
 )
 async def delete_parent(
-    auth_context: UserAuthenticationContextDependency,
+    auth_context: AuthPrincipalDependency,
     db: DatabaseDependency,
     school_parent_id: uuid.UUID,
 ):
-    user = db.query(User).filter(User.id == auth_context.user_id).first()
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="User not authorized",
-        )
 
     if not (
-        user.has_role_type(RoleType.SUPER_ADMIN)
-        or user.has_role_type(RoleType.SCHOOL_ADMIN)
+        auth_context.has_role_type(RoleType.SUPER_ADMIN)
+        or auth_context.has_role_type(RoleType.SCHOOL_ADMIN)
     ):
 
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN, detail="permission-denied"
         )
 
-    school = db.query(School).filter(School.user_id == user.id).first()
+    school = db.query(School).filter(School.user_id == auth_context.user_id).first()
     if not school:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
 
@@ -224,12 +200,20 @@ async def delete_parent(
         ParentStudentAssociation.parent_id == school_parent.id
     ).delete()
 
+    # --- the parent leaves every school it belonged to
+    parent_school_ids = db.scalars(
+        select(SchoolParentAssociation.school_id)
+        .where(SchoolParentAssociation.parent_id == school_parent.id)
+        .order_by(SchoolParentAssociation.school_id)
+    ).all()
     db.query(SchoolParentAssociation).filter(
         SchoolParentAssociation.parent_id == school_parent.id
     ).delete()
 
     db.delete(school_parent)
     db.flush()
+    for parent_school_id in parent_school_ids:
+        add_to_school_counters(db, parent_school_id, parents=-1)
     db.commit()
 
     return {"message": "School Parent deleted successfully"}
@@ -1,4 +1,4 @@
-from sqlalchemy import ForeignKey, UUID
+from sqlalchemy import ForeignKey, Index, UUID
 from sqlalchemy.orm import relationship, mapped_column, Mapped
 import uuid
 from backend.database.base import Base
@@ -36,6 +36,8 @@ class ParentStudentAssociation(Base):
     )
     relationship_type: Mapped[str] = mapped_column()
 
+    __table_args__ = (Index("ix_parent_student_associations_student_id", "student_id"),)
+
     def __init__(
         self,
         parent_id: uuid.UUID,
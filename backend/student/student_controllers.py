@@ -1,8 +1,10 @@
 import typing
 import uuid
-from sqlalchemy import desc, asc
+from sqlalchemy import select
+from sqlalchemy.orm import contains_eager, joinedload
 from fastapi import APIRouter, HTTPException, status, Query
 
+from backend.school.school_counters import add_to_school_counters
 from backend.school.school_model import (
     School,
     SchoolParent,
@@ -14,9 +16,19 @@ from backend.student.student_model import HealthItem, Student
 from backend.classroom.classroom_model import Classroom
 from backend.student.parent.parent_model import ParentStudentAssociation
 from backend.database.database import DatabaseDependency
-from backend.user.user_authentication import UserAuthenticationContextDependency
-from backend.user.passwords import hash_password
-from backend.paginated_response import PaginatedResponse
+from backend.database.replica_database import (
+    ReadOnlyAsyncDatabaseDependency,
+    ReadOnlyDatabaseDependency,
+)
+from backend.user.user_authentication import AuthPrincipalDependency
+from backend.user.passwords import hash_passwords_async
+from backend.cursor_pagination import Keyset
+from backend.paginated_response import (
+    CountMode,
+    PaginatedResponse,
+    fetch_page,
+    fetch_query_page,
+)
 from backend.student.student_schemas import (
     to_student_dto,
     StudentResponse,
@@ -33,20 +45,13 @@ router = APIRouter()
 async def get_student(
     db: DatabaseDependency,
     student_id: uuid.UUID,
-    auth_context: UserAuthenticationContextDependency,
+    auth_context: AuthPrincipalDependency,
 ):
-    user = db.query(User).filter(User.id == auth_context.user_id).first()
-
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="User not authorized",
-        )
 
     if not (
-        user.has_role_type(RoleType.SCHOOL_ADMIN)
-        or user.has_role_type(RoleType.CLASS_TEACHER)
-        or user.has_role_type(RoleType.TEACHER)
+        auth_context.has_role_type(RoleType.SCHOOL_ADMIN)
+        or auth_context.has_role_type(RoleType.CLASS_TEACHER)
+        or auth_context.has_role_type(RoleType.TEACHER)
     ):
 
         raise HTTPException(
@@ -58,7 +63,7 @@ async def get_student(
         .join(SchoolStudentAssociation)
         .filter(
             Student.id == student_id,
-            SchoolStudentAssociation.school_id == user.school_id,
+            SchoolStudentAssociation.school_id == auth_context.school_id,
             SchoolStudentAssociation.is_active == True,
         )
         .first()
@@ -86,26 +91,21 @@ async def get_student(
 
 @router.get("/students/by-classroom-id/{classroom_id}")
 async def get_students_in_classroom(
-    db: DatabaseDependency,
+    db: ReadOnlyDatabaseDependency,
     classroom_id: uuid.UUID,
-    auth_context: UserAuthenticationContextDependency,
+    auth_context: AuthPrincipalDependency,
     page: int = Query(1, ge=1),
     limit: int = Query(10, ge=1),
     order_field: typing.Optional[StudentSortableFields] = None,
     order_direction: typing.Optional[OrderBy] = None,
+    cursor: typing.Optional[str] = None,
+    count_mode: CountMode = CountMode.EXACT,
 ):
-    user = db.query(User).filter(User.id == auth_context.user_id).first()
-
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="User not authorized",
-        )
 
     if not (
-        user.has_role_type(RoleType.SCHOOL_ADMIN)
-        or user.has_role_type(RoleType.CLASS_TEACHER)
-        or user.has_role_type(RoleType.TEACHER)
+        auth_context.has_role_type(RoleType.SCHOOL_ADMIN)
+        or auth_context.has_role_type(RoleType.CLASS_TEACHER)
+        or auth_context.has_role_type(RoleType.TEACHER)
     ):
 
         raise HTTPException(
@@ -114,7 +114,9 @@ async def get_students_in_classroom(
 
     classroom = (
         db.query(Classroom)
-        .filter(Classroom.id == classroom_id, Classroom.school_id == user.school_id)
+        .filter(
+            Classroom.id == classroom_id, Classroom.school_id == auth_context.school_id
+        )
         .first()
     )
 
@@ -123,79 +125,75 @@ async def get_students_in_classroom(
 
     query = db.query(Student).filter(Student.classroom_id == classroom.id)
 
-    total_count = query.count()
-
-    if order_field and order_direction:
-        sort_column = getattr(Student, order_field.value)
-        if order_direction == OrderBy.DESC:
-            query = query.order_by(desc(sort_column))
-        else:
-            query = query.order_by(asc(sort_column))
-
-    offset = (page - 1) * limit
-    students = query.offset(offset).limit(limit).all()
+    keyset = Keyset.from_order(Student, order_field, order_direction)
+    page_query = keyset.apply(query, cursor)
+    if not cursor:
+        page_query = page_query.offset((page - 1) * limit)
+
+    students, total_count = fetch_query_page(
+        query,
+        page_query.options(joinedload(Student.user)),
+        limit,
+        count_mode,
+        auth_context.school_id,
+    )
 
     return PaginatedResponse[StudentResponse](
         total=total_count,
         page=page,
         limit=limit,
         data=[to_student_dto(student) for student in students],
+        next_cursor=keyset.next_cursor(students, limit),
     )
 
 
 @router.get("/students/by-school-id/list")
 async def get_all_students_for_a_particular_school(
-    db: DatabaseDependency,
-    auth_context: UserAuthenticationContextDependency,
+    db: ReadOnlyAsyncDatabaseDependency,
+    auth_context: AuthPrincipalDependency,
     page: int = Query(1, ge=1),
     limit: int = Query(10, ge=1),
     order_field: typing.Optional[StudentSortableFields] = None,
     order_direction: typing.Optional[OrderBy] = None,
+    cursor: typing.Optional[str] = None,
+    count_mode: CountMode = CountMode.EXACT,
 ):
-    user = db.query(User).filter(User.id == auth_context.user_id).first()
-
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="User not authorized",
-        )
 
     if not (
-        user.has_role_type(RoleType.CLASS_TEACHER)
-        or user.has_role_type(RoleType.TEACHER)
-        or user.has_role_type(RoleType.SCHOOL_ADMIN)
+        auth_context.has_role_type(RoleType.CLASS_TEACHER)
+        or auth_context.has_role_type(RoleType.TEACHER)
+        or auth_context.has_role_type(RoleType.SCHOOL_ADMIN)
     ):
 
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN, detail="permission-denied"
         )
     query = (
-        db.query(Student)
+        select(Student)
         .join(SchoolStudentAssociation)
-        .join(User)
-        .filter(
-            SchoolStudentAssociation.school_id == user.school_id,
+        .join(Student.user)
+        .options(contains_eager(Student.user))
+        .where(
+            SchoolStudentAssociation.school_id == auth_context.school_id,
             SchoolStudentAssociation.is_active == True,
         )
     )
 
-    total_count = query.count()
-
-    if order_field and order_direction:
-        sort_column = getattr(Student, order_field.value)
-        if order_direction == OrderBy.DESC:
-            query = query.order_by(desc(sort_column))
-        else:
-            query = query.order_by(asc(sort_column))
+    keyset = Keyset.from_order(Student, order_field, order_direction)
+    page_query = keyset.apply(query, cursor)
+    if not cursor:
+        page_query = page_query.offset((page - 1) * limit)
 
-    offset = (page - 1) * limit
-    students = query.offset(offset).limit(limit).all()
+    students, total_count = await fetch_page(
+        db, query, page_query, limit, count_mode, auth_context.school_id
+    )
 
     return PaginatedResponse[StudentResponse](
         total=total_count,
         page=page,
         limit=limit,
         data=[to_student_dto(student) for student in students],
+        next_cursor=keyset.next_cursor(students, limit),
     )
 
 
@@ -203,20 +201,13 @@ async def get_all_students_for_a_particular_school(
 async def create_student(
     db: DatabaseDependency,
     body: createStudentFullInfo,
-    auth_context: UserAuthenticationContextDependency,
+    auth_context: AuthPrincipalDependency,
 ):
-    user = db.query(User).filter(User.id == auth_context.user_id).first()
-
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="User not authorized",
-        )
 
     if not (
-        user.has_role_type(RoleType.CLASS_TEACHER)
-        or user.has_role_type(RoleType.TEACHER)
-        or user.has_role_type(RoleType.SCHOOL_ADMIN)
+        auth_context.has_role_type(RoleType.CLASS_TEACHER)
+        or auth_context.has_role_type(RoleType.TEACHER)
+        or auth_context.has_role_type(RoleType.SCHOOL_ADMIN)
     ):
 
         raise HTTPException(
@@ -239,7 +230,7 @@ async def create_student(
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT, detail="School Parent already exists"
         )
-    school = db.query(School).filter(School.user_id == user.id).first()
+    school = db.query(School).filter(School.user_id == auth_context.user_id).first()
 
     if not school:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
@@ -251,7 +242,7 @@ async def create_student(
         email=body.student_parent_info.email,
         gender=body.student_parent_info.gender,
         national_id_number=body.student_parent_info.national_id_number,
-        user_id=user.id,
+        user_id=auth_context.user_id,
     )
 
     db.add(student_parent)
@@ -270,10 +261,14 @@ async def create_student(
             status_code=status.HTTP_409_CONFLICT, detail="Parent email already exists"
         )
 
+    parent_password_hash, student_password_hash = await hash_passwords_async(
+        [body.student_info.password, body.student_info.password]
+    )
+
     parent_user = User(
         email=body.student_parent_info.email,
         username=body.student_parent_info.username,
-        password_hash=hash_password(body.student_info.password),
+        password_hash=parent_password_hash,
     )
     db.add(parent_user)
     db.flush()
@@ -310,7 +305,7 @@ async def create_student(
         db.query(Classroom)
         .filter(
             Classroom.id == body.student_info.classroom_id,
-            Classroom.school_id == user.school_id,
+            Classroom.school_id == auth_context.school_id,
         )
         .first()
     )
@@ -331,7 +326,7 @@ async def create_student(
     new_student_user = User(
         email=body.student_info.email,
         username=body.student_info.username,
-        password_hash=hash_password(body.student_info.password),
+        password_hash=student_password_hash,
     )
     db.add(new_student_user)
     db.flush()
@@ -423,6 +418,10 @@ async def create_student(
     # --- create student upload files
     #
 
+    add_to_school_counters(db, school.id, parents=1)
+    add_to_school_counters(
+        db, classroom.school_id, students=1, active_students=1, enrollments=1
+    )
     db.commit()
 
     return {"message": "student-registered-successfully"}
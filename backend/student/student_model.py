@@ -98,6 +98,7 @@ class Student(Base):
 
     __table_args__ = (
         Index("ix_students_search_vector", "search_vector", postgresql_using="gin"),
+        Index("ix_students_classroom_id", "classroom_id"),
     )
 
     def __init__(
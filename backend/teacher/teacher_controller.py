@@ -2,18 +2,29 @@ import datetime
 import typing
 import uuid
 import enum
-from sqlalchemy import desc, asc
+from sqlalchemy import select
 from fastapi import APIRouter, HTTPException, status, Query, Depends
 from pydantic import BaseModel, StringConstraints, EmailStr
 from backend.classroom.classroom_model import Classroom
 from backend.database.database import DatabaseDependency
+from backend.database.replica_database import (
+    ReadOnlyAsyncDatabaseDependency,
+    ReadOnlyDatabaseDependency,
+)
+from backend.school.school_counters import add_to_school_counters
 from backend.school.school_model import School
 from backend.teacher.teacher_model import ClassTeacherAssociation, Teacher
 from backend.user.user_models import Role, RoleType, User, UserRoleAssociation
-from backend.user.passwords import hash_password
-from backend.user.user_authentication import UserAuthenticationContextDependency
+from backend.user.passwords import hash_password_async, hash_passwords_async
+from backend.user.user_authentication import AuthPrincipalDependency
 from backend.teacher.teacher_schemas import to_teacher_dto, TeacherResponse
-from backend.paginated_response import PaginatedResponse
+from backend.cursor_pagination import Keyset
+from backend.paginated_response import (
+    CountMode,
+    PaginatedResponse,
+    fetch_page,
+    fetch_query_page,
+)
 
 
 router = APIRouter()
@@ -43,73 +54,70 @@ class TeacherFilterParams(BaseModel):
 
 @router.get("/teachers/by-school-id/list")
 async def get_teachers_in_a_particular_school(
-    db: DatabaseDependency,
-    auth_context: UserAuthenticationContextDependency,
+    db: ReadOnlyAsyncDatabaseDependency,
+    auth_context: AuthPrincipalDependency,
     page: int = Query(1, ge=1),
     limit: int = Query(10, ge=1),
     order_field: typing.Optional[TeacherSortableFields] = None,
     order_direction: typing.Optional[OrderBy] = None,
+    cursor: typing.Optional[str] = None,
+    count_mode: CountMode = CountMode.EXACT,
     filters: TeacherFilterParams = Depends(),
 ):
-    user = db.query(User).filter(User.id == auth_context.user_id).first()
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="User not authorized",
-        )
 
-    school = db.query(School).filter(School.id == user.school_id).first()
+    school = await db.scalar(select(School).where(School.id == auth_context.school_id))
     if not school:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="School not found"
         )
 
-    query = db.query(Teacher).filter(Teacher.school_id == school.id)
+    query = select(Teacher).where(Teacher.school_id == school.id)
 
     if filters.first_name:
-        query = query.filter(Teacher.first_name.ilike(f"%{filters.first_name}%"))
+        query = query.where(Teacher.first_name.ilike(f"%{filters.first_name}%"))
 
     if filters.last_name:
-        query = query.filter(Teacher.last_name.ilike(f"%{filters.last_name}%"))
+        query = query.where(Teacher.last_name.ilike(f"%{filters.last_name}%"))
 
     if filters.email:
-        query = query.filter(Teacher.email.ilike(f"%{filters.email}%"))
+        query = query.where(Teacher.email.ilike(f"%{filters.email}%"))
 
     if filters.has_primary_classroom is not None:
         if filters.has_primary_classroom:
-            query = query.join(ClassTeacherAssociation).filter(
+            query = query.join(ClassTeacherAssociation).where(
                 ClassTeacherAssociation.is_primary == True
             )
         else:
-            query = query.outerjoin(ClassTeacherAssociation).filter(
+            query = query.outerjoin(ClassTeacherAssociation).where(
                 ClassTeacherAssociation.is_primary.is_(None)
             )
 
     if filters.created_after:
-        query = query.filter(Teacher.created_at >= filters.created_after)
+        query = query.where(Teacher.created_at >= filters.created_after)
 
     if filters.created_before:
-        query = query.filter(Teacher.created_at <= filters.created_before)
-
-    total_count = query.count()
+        query = query.where(Teacher.created_at <= filters.created_before)
 
-    if order_field and order_direction:
-        sort_column = getattr(Teacher, order_field.value)
-        if order_direction == OrderBy.DESC:
-            query = query.order_by(desc(sort_column))
-        else:
-            query = query.order_by(asc(sort_column))
-    else:
-        query = query.order_by(asc(Teacher.last_name), asc(Teacher.first_name))
+    keyset = Keyset.from_order(
+        Teacher,
+        order_field,
+        order_direction,
+        default=[(Teacher.last_name, False), (Teacher.first_name, False)],
+    )
+    page_query = keyset.apply(query, cursor)
+    if not cursor:
+        page_query = page_query.offset((page - 1) * limit)
 
-    offset = (page - 1) * limit
-    teachers = query.offset(offset).limit(limit).all()
+    teachers, total_count = await fetch_page(
+        db, query, page_query, limit, count_mode, auth_context.school_id
+    )
 
     return PaginatedResponse[TeacherResponse](
         total=total_count,
         page=page,
         limit=limit,
         data=[to_teacher_dto(teacher) for teacher in teachers],
+        next_cursor=keyset.next_cursor(teachers, limit),
     )
 
 
@@ -117,18 +125,12 @@ async def get_teachers_in_a_particular_school(
 async def get_teacher_in_particular_school_by_teacher_id(
     teacher_id: int,
     db: DatabaseDependency,
-    auth_context: UserAuthenticationContextDependency,
+    auth_context: AuthPrincipalDependency,
 ):
-    user = db.query(User).filter(User.id == auth_context.user_id).first()
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="User not authorized",
-        )
     if not (
-        user.has_role_type(RoleType.SUPER_ADMIN)
-        or user.has_role_type(RoleType.CLASS_TEACHER)
-        or user.has_role_type(RoleType.TEACHER)
+        auth_context.has_role_type(RoleType.SUPER_ADMIN)
+        or auth_context.has_role_type(RoleType.CLASS_TEACHER)
+        or auth_context.has_role_type(RoleType.TEACHER)
     ):
 
         raise HTTPException(
@@ -156,26 +158,21 @@ class TeacherClassroomFilterParams(BaseModel):
 @router.get("/teachers/by-classroom-id/{classroom_id}")
 async def get_teacher_in_particular_school_classroom_by_classroom_id(
     classroom_id: uuid.UUID,
-    db: DatabaseDependency,
-    auth_context: UserAuthenticationContextDependency,
+    db: ReadOnlyDatabaseDependency,
+    auth_context: AuthPrincipalDependency,
     page: int = Query(1, ge=1),
     limit: int = Query(10, ge=1),
     order_field: typing.Optional[TeacherSortableFields] = None,
     order_direction: typing.Optional[OrderBy] = None,
+    cursor: typing.Optional[str] = None,
+    count_mode: CountMode = CountMode.EXACT,
     filters: TeacherClassroomFilterParams = Depends(),
 ):
-    user = db.query(User).filter(User.id == auth_context.user_id).first()
-
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="User not authorized",
-        )
 
     if not (
-        user.has_role_type(RoleType.CLASS_TEACHER)
-        or user.has_role_type(RoleType.TEACHER)
-        or user.has_role_type(RoleType.SCHOOL_ADMIN)
+        auth_context.has_role_type(RoleType.CLASS_TEACHER)
+        or auth_context.has_role_type(RoleType.TEACHER)
+        or auth_context.has_role_type(RoleType.SCHOOL_ADMIN)
     ):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN, detail="permission-denied"
@@ -183,7 +180,9 @@ async def get_teacher_in_particular_school_classroom_by_classroom_id(
 
     classroom = (
         db.query(Classroom)
-        .filter(Classroom.id == classroom_id, Classroom.school_id == user.school_id)
+        .filter(
+            Classroom.id == classroom_id, Classroom.school_id == auth_context.school_id
+        )
         .first()
     )
 
@@ -214,26 +213,26 @@ async def get_teacher_in_particular_school_classroom_by_classroom_id(
     if filters.created_before:
         query = query.filter(Teacher.created_at <= filters.created_before)
 
-    total_count = query.count()
-
-    if order_field and order_direction:
-        sort_column = getattr(Teacher, order_field.value)
-        if order_direction == OrderBy.DESC:
-            query = query.order_by(desc(sort_column))
-        else:
-            query = query.order_by(asc(sort_column))
-    else:
-
-        query = query.order_by(asc(Teacher.last_name), asc(Teacher.first_name))
+    keyset = Keyset.from_order(
+        Teacher,
+        order_field,
+        order_direction,
+        default=[(Teacher.last_name, False), (Teacher.first_name, False)],
+    )
+    page_query = keyset.apply(query, cursor)
+    if not cursor:
+        page_query = page_query.offset((page - 1) * limit)
 
-    offset = (page - 1) * limit
-    teachers = query.offset(offset).limit(limit).all()
+    teachers, total_count = fetch_query_page(
+        query, page_query, limit, count_mode, auth_context.school_id
+    )
 
     return PaginatedResponse[TeacherResponse](
         total=total_count,
         page=page,
         limit=limit,
         data=[to_teacher_dto(teacher) for teacher in teachers],
+        next_cursor=keyset.next_cursor(teachers, limit),
     )
 
 
@@ -251,28 +250,21 @@ class TeacherModel(BaseModel):
 async def create_teacher_in_particular_school(
     body: TeacherModel,
     db: DatabaseDependency,
-    auth_context: UserAuthenticationContextDependency,
+    auth_context: AuthPrincipalDependency,
 ):
-    user = db.query(User).filter(User.id == auth_context.user_id).first()
-
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="User not authorized",
-        )
 
     if not (
-        user.has_role_type(RoleType.SCHOOL_ADMIN)
-        or user.has_role_type(RoleType.CLASS_TEACHER)
-        or user.has_role_type(RoleType.TEACHER)
-        or user.has_role_type(RoleType.SUPER_ADMIN)
+        auth_context.has_role_type(RoleType.SCHOOL_ADMIN)
+        or auth_context.has_role_type(RoleType.CLASS_TEACHER)
+        or auth_context.has_role_type(RoleType.TEACHER)
+        or auth_context.has_role_type(RoleType.SUPER_ADMIN)
     ):
 
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN, detail="permission-denied"
         )
 
-    if not user.school_id:
+    if not auth_context.school_id:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN, detail="user-must-be-in-a-school"
         )
@@ -287,7 +279,7 @@ async def create_teacher_in_particular_school(
 
     new_teacher_user = User(
         email=body.email,
-        password_hash=hash_password(password=body.password),
+        password_hash=await hash_password_async(body.password),
         username=body.email,
     )
     db.add(new_teacher_user)
@@ -299,7 +291,7 @@ async def create_teacher_in_particular_school(
             name=RoleType.TEACHER.name,
             type=RoleType.TEACHER,
             description=RoleType.TEACHER.value,
-            school_id=user.school_id,
+            school_id=auth_context.school_id,
         )
         db.add(teacher_role)
         db.flush()
@@ -307,14 +299,16 @@ async def create_teacher_in_particular_school(
     teacher_role_association = UserRoleAssociation(
         user_id=new_teacher_user.id,
         role_id=teacher_role.id,
-        school_id=user.school_id,
+        school_id=auth_context.school_id,
     )
     db.add(teacher_role_association)
     db.flush()
 
     teacher_with_email = (
         db.query(Teacher)
-        .filter(Teacher.email == body.email, Teacher.school_id == user.school_id)
+        .filter(
+            Teacher.email == body.email, Teacher.school_id == auth_context.school_id
+        )
         .first()
     )
     if teacher_with_email:
@@ -327,10 +321,11 @@ async def create_teacher_in_particular_school(
         first_name=body.first_name,
         last_name=body.last_name,
         email=body.email,
-        school_id=user.school_id,
+        school_id=auth_context.school_id,
         user_id=new_teacher_user.id,
     )
     db.add(new_teacher)
+    add_to_school_counters(db, auth_context.school_id, teachers=1)
     db.commit()
 
     return {"message": "teacher-created-successfully"}
@@ -340,25 +335,19 @@ async def create_teacher_in_particular_school(
 async def create_teachers_in_bulk(
     body: list[TeacherModel],
     db: DatabaseDependency,
-    auth_context: UserAuthenticationContextDependency,
+    auth_context: AuthPrincipalDependency,
 ):
-    user = db.query(User).filter(User.id == auth_context.user_id).first()
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="User not authorized",
-        )
 
     if not (
-        user.has_role_type(RoleType.SCHOOL_ADMIN)
-        or user.has_role_type(RoleType.CLASS_TEACHER)
-        or user.has_role_type(RoleType.TEACHER)
+        auth_context.has_role_type(RoleType.SCHOOL_ADMIN)
+        or auth_context.has_role_type(RoleType.CLASS_TEACHER)
+        or auth_context.has_role_type(RoleType.TEACHER)
     ):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN, detail="permission-denied"
         )
 
-    if not user.school_id:
+    if not auth_context.school_id:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN, detail="user-must-be-in-a-school"
         )
@@ -368,7 +357,7 @@ async def create_teachers_in_bulk(
     existing_users = (
         db.query(User)
         .join(Teacher)
-        .filter(User.email.in_(all_emails), Teacher.school_id == user.school_id)
+        .filter(User.email.in_(all_emails), Teacher.school_id == auth_context.school_id)
         .all()
     )
 
@@ -386,7 +375,9 @@ async def create_teachers_in_bulk(
 
     existing_teachers = (
         db.query(Teacher)
-        .filter(Teacher.email.in_(all_emails), Teacher.school_id == user.school_id)
+        .filter(
+            Teacher.email.in_(all_emails), Teacher.school_id == auth_context.school_id
+        )
         .all()
     )
     if existing_teachers:
@@ -400,7 +391,9 @@ async def create_teachers_in_bulk(
 
     teacher_role = (
         db.query(Role)
-        .filter(Role.name == RoleType.TEACHER.name, Role.school_id == user.school_id)
+        .filter(
+            Role.name == RoleType.TEACHER.name, Role.school_id == auth_context.school_id
+        )
         .first()
     )
     if not teacher_role:
@@ -408,17 +401,21 @@ async def create_teachers_in_bulk(
             name=RoleType.TEACHER.name,
             type=RoleType.TEACHER,
             description=RoleType.TEACHER.value,
-            school_id=user.school_id,
+            school_id=auth_context.school_id,
         )
         db.add(teacher_role)
         db.flush()
 
+    password_hashes = await hash_passwords_async(
+        [teacher_data.password for teacher_data in body]
+    )
+
     created_teachers: list[Teacher] = []
-    for teacher_data in body:
+    for teacher_data, password_hash in zip(body, password_hashes):
 
         new_teacher_user = User(
             email=teacher_data.email,
-            password_hash=hash_password(password=teacher_data.password),
+            password_hash=password_hash,
             username=teacher_data.email,
         )
         db.add(new_teacher_user)
@@ -427,7 +424,7 @@ async def create_teachers_in_bulk(
         teacher_role_association = UserRoleAssociation(
             user_id=new_teacher_user.id,
             role_id=teacher_role.id,
-            school_id=user.school_id,
+            school_id=auth_context.school_id,
         )
         db.add(teacher_role_association)
         db.flush()
@@ -436,13 +433,14 @@ async def create_teachers_in_bulk(
             first_name=teacher_data.first_name,
             last_name=teacher_data.last_name,
             email=teacher_data.email,
-            school_id=user.school_id,
+            school_id=auth_context.school_id,
             user_id=new_teacher_user.id,
             phone_number=teacher_data.phone,
         )
         db.add(new_teacher)
         created_teachers.append(new_teacher)
 
+    add_to_school_counters(db, auth_context.school_id, teachers=len(created_teachers))
     db.commit()
 
     return {"message": "teachers-created-successfully", "count": len(created_teachers)}
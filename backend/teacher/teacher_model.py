@@ -1,5 +1,5 @@
 import datetime
-from sqlalchemy import String, DateTime, ForeignKey, UUID, func
+from sqlalchemy import String, DateTime, ForeignKey, Index, UUID, func
 from sqlalchemy.orm import relationship, mapped_column, Mapped
 import uuid
 from backend.database.base import Base
@@ -27,6 +27,8 @@ class TeacherModuleAssociation(Base):
         DateTime, default=func.now(), nullable=False
     )
 
+    __table_args__ = (Index("ix_teacher_module_association_module_id", "module_id"),)
+
     def __init__(self, teacher_id: uuid.UUID, module_id: uuid.UUID):
         super().__init__()
         self.teacher_id = teacher_id
@@ -128,6 +130,10 @@ class ClassTeacherAssociation(Base):
         "Classroom", back_populates="teacher_associations"
     )
 
+    __table_args__ = (
+        Index("ix_class_teacher_associations_classroom_id", "classroom_id"),
+    )
+
     def __init__(
         self, teacher_id: uuid.UUID, classroom_id: uuid.UUID, is_primary: bool
     ):
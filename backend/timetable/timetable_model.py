@@ -1,5 +1,5 @@
 import datetime
-from sqlalchemy import String, DateTime, ForeignKey, UUID, func
+from sqlalchemy import String, DateTime, ForeignKey, Index, UUID, func
 from sqlalchemy.orm import relationship, mapped_column, Mapped
 import uuid
 from backend.database.base import Base
@@ -51,6 +51,10 @@ class TimeSlot(Base):
     classroom_id: Mapped[uuid.UUID] = mapped_column(UUID, ForeignKey("classrooms.id"))
     classroom: Mapped["Classroom"] = relationship("Classroom")
 
+    __table_args__ = (
+        Index("ix_time_slots_timetable_id_day_of_week", "timetable_id", "day_of_week"),
+    )
+
     def __init__(
         self,
         start_time: datetime.datetime,
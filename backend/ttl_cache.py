@@ -0,0 +1,98 @@
+import datetime
+import threading
+import time
+import typing
+from collections import OrderedDict
+from dataclasses import dataclass
+
+K = typing.TypeVar("K")
+V = typing.TypeVar("V")
+
+
+@dataclass
+class CacheStats:
+    hits: int
+    misses: int
+    size: int
+    max_size: int
+
+
+class TTLCache(typing.Generic[K, V]):
+    """
+    Bounded, thread-safe LRU cache whose entries expire after `ttl_seconds`
+    or at an explicit `expire_at` (naive UTC), whichever comes first.
+    """
+
+    def __init__(self, max_size: int, ttl_seconds: float):
+        super().__init__()
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[K, tuple[V, float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: K) -> typing.Optional[V]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            value, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(
+        self,
+        key: K,
+        value: V,
+        expire_at: typing.Optional[datetime.datetime] = None,
+    ) -> None:
+        ttl = self.ttl_seconds
+        if expire_at is not None:
+            remaining = (expire_at - datetime.datetime.utcnow()).total_seconds()
+            ttl = min(ttl, remaining)
+
+        if ttl <= 0:
+            return
+
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, key: K) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def invalidate_where(self, predicate: typing.Callable[[K, V], bool]) -> int:
+        with self._lock:
+            keys = [
+                key
+                for key, (value, _) in self._entries.items()
+                if predicate(key, value)
+            ]
+            for key in keys:
+                del self._entries[key]
+            return len(keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> CacheStats:
+        with self._lock:
+            return CacheStats(
+                hits=self.hits,
+                misses=self.misses,
+                size=len(self._entries),
+                max_size=self.max_size,
+            )
@@ -0,0 +1,219 @@
+import datetime
+import jwt
+import os
+import threading
+import time
+import typing
+import uuid
+from pydantic import BaseModel, ValidationError
+from sqlalchemy.orm import Session
+
+from backend.database.cache_invalidations import (
+    on_cache_invalidation,
+    publish_cache_invalidation,
+    publish_cache_invalidations,
+)
+from backend.user.permissions.permission_bits import PERMISSION_FLAGS_DIGEST
+from backend.user.user_models import RoleType
+
+JWT_SECRET_KEY = os.environ["JWT_SECRET_KEY"]
+
+#
+# --- opt-in dual token mode: `user_access_token` holds a short lived token that
+# --- is verified without touching the database and `user_refresh_token` holds
+# --- the session backed token that is exchanged for new access tokens
+#
+STATELESS_ACCESS_TOKENS = (
+    os.environ.get("STATELESS_ACCESS_TOKENS", "false").lower() == "true"
+)
+ACCESS_TOKEN_TTL_SECONDS = int(os.environ.get("ACCESS_TOKEN_TTL_SECONDS", "300"))
+
+
+class AccessTokenClaims(BaseModel):
+    typ: typing.Literal["access"]
+    sub: uuid.UUID
+    sid: uuid.UUID
+    school_id: typing.Optional[uuid.UUID]
+    teacher_id: typing.Optional[uuid.UUID]
+    student_id: typing.Optional[uuid.UUID]
+    parent_id: typing.Optional[uuid.UUID]
+    roles: list[RoleType]
+    perm: int
+    perm_digest: str
+    iat: float
+    exp: int
+
+
+def encode_access_token(
+    user_id: uuid.UUID,
+    session_id: uuid.UUID,
+    school_id: typing.Optional[uuid.UUID],
+    teacher_id: typing.Optional[uuid.UUID],
+    student_id: typing.Optional[uuid.UUID],
+    parent_id: typing.Optional[uuid.UUID],
+    role_types: typing.Iterable[RoleType],
+    permission_mask: int,
+) -> str:
+    issued_at = time.time()
+
+    claims = AccessTokenClaims(
+        typ="access",
+        sub=user_id,
+        sid=session_id,
+        school_id=school_id,
+        teacher_id=teacher_id,
+        student_id=student_id,
+        parent_id=parent_id,
+        roles=sorted(role_types, key=lambda role_type: role_type.value),
+        perm=permission_mask,
+        perm_digest=PERMISSION_FLAGS_DIGEST,
+        iat=issued_at,
+        exp=int(issued_at) + ACCESS_TOKEN_TTL_SECONDS,
+    )
+
+    return jwt.encode(
+        claims.model_dump(mode="json"),
+        JWT_SECRET_KEY,
+        algorithm="HS256",
+    )
+
+
+def parse_access_token_claims(
+    raw_payload: dict,
+) -> typing.Optional[AccessTokenClaims]:
+    """
+    Returns None for payloads that are not access tokens (e.g. session tokens)
+    or whose permission bits were compiled against another PERMISSIONS layout.
+    """
+    if raw_payload.get("typ") != "access":
+        return None
+
+    try:
+        claims = AccessTokenClaims.model_validate(raw_payload)
+    except ValidationError:
+        return None
+
+    if claims.perm_digest != PERMISSION_FLAGS_DIGEST:
+        return None
+
+    return claims
+
+
+class AccessTokenRevocationList:
+    """
+    Revoked sessions and per user "revoked before" marks. An access token dies
+    on its own after ACCESS_TOKEN_TTL_SECONDS, so entries only have to outlive
+    that window, which keeps the list small without a Bloom filter's false
+    positives.
+    """
+
+    # --- how often lookups prune expired entries
+    PRUNE_INTERVAL_SECONDS = 1.0
+
+    def __init__(self, ttl_seconds: float):
+        super().__init__()
+        self.ttl_seconds = ttl_seconds
+        self._revoked_sessions: dict[uuid.UUID, float] = {}
+        self._users_revoked_before: dict[uuid.UUID, float] = {}
+        self._lock = threading.Lock()
+        self._pruned_at = 0.0
+
+    def revoke_session(
+        self, session_id: uuid.UUID, revoked_at: typing.Optional[float] = None
+    ) -> None:
+        with self._lock:
+            self._prune()
+            self._revoked_sessions[session_id] = max(
+                revoked_at or time.time(), self._revoked_sessions.get(session_id, 0)
+            )
+
+    def revoke_user(
+        self, user_id: uuid.UUID, revoked_at: typing.Optional[float] = None
+    ) -> None:
+        with self._lock:
+            self._prune()
+            self._users_revoked_before[user_id] = max(
+                revoked_at or time.time(), self._users_revoked_before.get(user_id, 0)
+            )
+
+    def is_revoked(self, claims: AccessTokenClaims) -> bool:
+        if time.time() - self._pruned_at >= self.PRUNE_INTERVAL_SECONDS:
+            with self._lock:
+                self._prune()
+
+        if claims.sid in self._revoked_sessions:
+            return True
+
+        revoked_before = self._users_revoked_before.get(claims.sub)
+        return revoked_before is not None and claims.iat <= revoked_before
+
+    def __len__(self) -> int:
+        return len(self._revoked_sessions) + len(self._users_revoked_before)
+
+    def _prune(self) -> None:
+        now = time.time()
+        cutoff = now - self.ttl_seconds
+        for entries in (self._revoked_sessions, self._users_revoked_before):
+            for key in [
+                key for key, revoked_at in entries.items() if revoked_at < cutoff
+            ]:
+                del entries[key]
+        self._pruned_at = now
+
+
+#
+# --- per process, fed by the cache invalidation poller: a revocation
+# --- published on any replica reaches every process within
+# --- CACHE_INVALIDATION_POLL_INTERVAL_SECONDS of its commit
+#
+revocation_list = AccessTokenRevocationList(ttl_seconds=ACCESS_TOKEN_TTL_SECONDS)
+
+REVOKED_SESSIONS_CHANNEL = "revoked-sessions"
+REVOKED_USERS_CHANNEL = "revoked-users"
+
+
+def _epoch_seconds(published_at: datetime.datetime) -> float:
+    return published_at.replace(tzinfo=datetime.timezone.utc).timestamp()
+
+
+def revoke_session_access_tokens(db: Session, session_id: uuid.UUID) -> None:
+    """
+    Revokes the session's access tokens in this process straight away and
+    publishes the revocation to the others in the caller's transaction. A
+    rollback leaves the local revocation behind, which only costs the
+    client a refresh.
+    """
+    revocation_list.revoke_session(session_id)
+    publish_cache_invalidation(db, REVOKED_SESSIONS_CHANNEL, str(session_id))
+
+
+def revoke_user_access_tokens(db: Session, user_id: uuid.UUID) -> None:
+    # --- same as revoke_session_access_tokens, for every session of the user
+    revoke_users_access_tokens(db, [user_id])
+
+
+def revoke_users_access_tokens(
+    db: Session, user_ids: typing.Iterable[uuid.UUID]
+) -> None:
+    user_ids = set(user_ids)
+    for user_id in user_ids:
+        revocation_list.revoke_user(user_id)
+    publish_cache_invalidations(
+        db, REVOKED_USERS_CHANNEL, [str(user_id) for user_id in user_ids]
+    )
+
+
+def _apply_published_session_revocation(
+    key: typing.Optional[str], published_at: datetime.datetime
+) -> None:
+    revocation_list.revoke_session(uuid.UUID(key), _epoch_seconds(published_at))
+
+
+def _apply_published_user_revocation(
+    key: typing.Optional[str], published_at: datetime.datetime
+) -> None:
+    revocation_list.revoke_user(uuid.UUID(key), _epoch_seconds(published_at))
+
+
+on_cache_invalidation(REVOKED_SESSIONS_CHANNEL, _apply_published_session_revocation)
+on_cache_invalidation(REVOKED_USERS_CHANNEL, _apply_published_user_revocation)
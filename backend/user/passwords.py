@@ -1,11 +1,24 @@
+import asyncio
 import bcrypt
+import multiprocessing
+import os
 import secrets
 import string
+import typing
+from concurrent.futures import ProcessPoolExecutor
 
+PASSWORD_HASH_ROUNDS = int(os.environ.get("PASSWORD_HASH_ROUNDS", "12"))
+PASSWORD_HASH_WORKERS = int(
+    os.environ.get("PASSWORD_HASH_WORKERS", str(os.cpu_count() or 1))
+)
+PASSWORD_HASH_MAX_CONCURRENCY = int(
+    os.environ.get("PASSWORD_HASH_MAX_CONCURRENCY", str(PASSWORD_HASH_WORKERS * 2))
+)
 
-def hash_password(password: str) -> str:
+
+def hash_password(password: str, rounds: int = PASSWORD_HASH_ROUNDS) -> str:
     # Generate a salt
-    salt = bcrypt.gensalt()
+    salt = bcrypt.gensalt(rounds=rounds)
 
     # Hash the password with the salt
     hashed_password = bcrypt.hashpw(password.encode("utf-8"), salt)
@@ -17,7 +30,59 @@ def verify_password(password: str, hashed_password: str) -> bool:
     return bcrypt.checkpw(password.encode("utf-8"), hashed_password.encode("utf-8"))
 
 
-def generate_temp_password(length:int=12):
+def password_needs_rehash(hashed_password: str) -> bool:
+    # --- bcrypt hashes look like $2b$<rounds>$<salt+hash>
+    try:
+        rounds = int(hashed_password.split("$")[2])
+    except (IndexError, ValueError):
+        return True
+
+    return rounds != PASSWORD_HASH_ROUNDS
+
+
+def generate_temp_password(length: int = 12):
     alphabet = string.ascii_letters + string.digits + string.punctuation
-    password = ''.join(secrets.choice(alphabet) for _ in range(length))
+    password = "".join(secrets.choice(alphabet) for _ in range(length))
     return password
+
+
+#
+# --- every hash costs PASSWORD_HASH_ROUNDS worth of CPU time; done on the
+# --- event-loop worker, a batch of them would block the loop or eat the
+# --- worker's CPU. Async handlers hash on a bounded process pool instead.
+#
+_executor: typing.Optional[ProcessPoolExecutor] = None
+_semaphore = asyncio.Semaphore(PASSWORD_HASH_MAX_CONCURRENCY)
+
+
+def get_password_hashing_executor() -> ProcessPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(
+            max_workers=PASSWORD_HASH_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _executor
+
+
+def shutdown_password_hashing_executor() -> None:
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+async def hash_password_async(password: str) -> str:
+    async with _semaphore:
+        return await asyncio.get_running_loop().run_in_executor(
+            get_password_hashing_executor(),
+            hash_password,
+            password,
+            PASSWORD_HASH_ROUNDS,
+        )
+
+
+async def hash_passwords_async(passwords: list[str]) -> list[str]:
+    return list(
+        await asyncio.gather(*(hash_password_async(password) for password in passwords))
+    )
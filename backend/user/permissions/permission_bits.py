@@ -0,0 +1,90 @@
+import datetime
+import hashlib
+import threading
+import typing
+from pydantic import BaseModel
+from sqlalchemy.orm import Session
+
+from backend.database.cache_invalidations import (
+    on_cache_invalidation,
+    publish_cache_invalidation,
+)
+from backend.user.permissions.permissions_schemas import PERMISSIONS
+
+#
+# --- every flag of PERMISSIONS gets one bit, in declaration order:
+# --- "student_permissions.can_add_students" -> 1 << 0, ...
+#
+PERMISSION_FLAGS: dict[str, int] = {
+    name: 1 << index
+    for index, name in enumerate(
+        f"{group}.{flag}"
+        for group, field in PERMISSIONS.model_fields.items()
+        for flag in typing.cast(type[BaseModel], field.annotation).model_fields
+    )
+}
+
+# --- changes whenever flags are added, removed or reordered
+PERMISSION_FLAGS_DIGEST = hashlib.sha256(
+    ",".join(PERMISSION_FLAGS).encode()
+).hexdigest()[:16]
+
+
+def permission_mask(*permissions: str) -> int:
+    mask = 0
+    for permission in permissions:
+        if permission not in PERMISSION_FLAGS:
+            raise ValueError(f"Unknown permission: {permission}")
+        mask |= PERMISSION_FLAGS[permission]
+    return mask
+
+
+def compile_permission_mask(permission_description: dict) -> int:
+    mask = 0
+    for group, flags in permission_description.items():
+        if not isinstance(flags, dict):
+            continue
+        for flag, granted in flags.items():
+            if granted is True:
+                mask |= PERMISSION_FLAGS.get(f"{group}.{flag}", 0)
+    return mask
+
+
+#
+# --- bumped on every permission write; compiled masks built under an older
+# --- version are discarded by whoever cached them. Per process, every
+# --- process bumps its own when the cache invalidation poller reads a
+# --- published change.
+#
+PERMISSIONS_CHANNEL = "permissions"
+
+_permissions_version = 0
+_permissions_version_lock = threading.Lock()
+
+
+def get_permissions_version() -> int:
+    return _permissions_version
+
+
+def bump_permissions_version() -> int:
+    global _permissions_version
+    with _permissions_version_lock:
+        _permissions_version += 1
+        return _permissions_version
+
+
+def publish_permissions_change(db: Session) -> None:
+    """
+    Call in the transaction writing the permissions; every process, this one
+    included, bumps its version once it commits.
+    """
+    publish_cache_invalidation(db, PERMISSIONS_CHANNEL)
+
+
+def _bump_published_permissions_version(
+    key: typing.Optional[str], published_at: datetime.datetime
+) -> None:
+    bump_permissions_version()
+
+
+on_cache_invalidation(PERMISSIONS_CHANNEL, _bump_published_permissions_version)
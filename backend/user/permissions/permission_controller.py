@@ -1,20 +1,60 @@
 import json
+import typing
 import uuid
 from pydantic import BaseModel
 from fastapi import APIRouter, HTTPException
 from backend.database.database import DatabaseDependency
+from backend.raise_exception import raise_exception
 from backend.user.user_models import (
+    RolePermissionAssociation,
     User,
     UserPermission,
     UserPermissionAssociation,
+    UserRoleAssociation,
 )
 
-from backend.user.user_authentication import UserAuthenticationContextDependency
-from sqlalchemy import update
+from backend.user.user_authentication import AuthPrincipal, require_permission
+from backend.user.access_tokens import (
+    revoke_user_access_tokens,
+    revoke_users_access_tokens,
+)
+from backend.user.permissions.permission_bits import (
+    bump_permissions_version,
+    publish_permissions_change,
+)
+from sqlalchemy import select, union, update
+from sqlalchemy.orm import Session
 
 
 router = APIRouter()
 
+PermissionManagerDependency = typing.Annotated[
+    AuthPrincipal, require_permission("school_permissions.can_manage_permissions")
+]
+
+
+def get_permission_holder_ids(
+    db: Session, permission_id: uuid.UUID
+) -> set[uuid.UUID]:
+    """
+    The users granted the permission directly or through one of their roles.
+    """
+    return set(
+        db.scalars(
+            union(
+                select(UserPermissionAssociation.user_id).where(
+                    UserPermissionAssociation.user_permission_id == permission_id
+                ),
+                select(UserRoleAssociation.user_id)
+                .join(
+                    RolePermissionAssociation,
+                    RolePermissionAssociation.role_id == UserRoleAssociation.role_id,
+                )
+                .where(RolePermissionAssociation.user_permission_id == permission_id),
+            )
+        )
+    )
+
 
 class updatereateUserPermissionDTO(BaseModel):
     permission_description: dict
@@ -23,29 +63,15 @@ class updatereateUserPermissionDTO(BaseModel):
 @router.patch("/permissions/{permission_id}/{user_id}/update")
 def update_permission(
     db: DatabaseDependency,
-    auth_context: UserAuthenticationContextDependency,
+    auth_context: PermissionManagerDependency,
     user_id: uuid.UUID,
     permission_id: uuid.UUID,
     body: updatereateUserPermissionDTO,
 ):
-
-    user = db.query(User).filter(User.id == auth_context.user_id).first()
-    if not user:
-        raise HTTPException(403, detail="not-authorized")
-
-    if not any(
-        permission.permissions.school_permissions.can_manage_permissions is True
-        for permission in user.all_permissions
-    ):
-        raise HTTPException(status_code=403, detail="Permission denied")
-
     associated_user = db.query(User).filter(User.id == user_id).first()
     if not associated_user:
         raise HTTPException(404)
 
-    if not user.all_permissions:
-        raise HTTPException(404, detail="no-existing-permissions-to-update")
-
     user_permission = (
         db.query(UserPermission).filter(UserPermission.id == permission_id).first()
     )
@@ -63,8 +89,14 @@ def update_permission(
     )
 
     db.execute(stmt)
+    revoke_users_access_tokens(
+        db, {user_id, *get_permission_holder_ids(db, permission_id)}
+    )
+    publish_permissions_change(db)
     db.commit()
 
+    bump_permissions_version()
+
 
 class createUserPermissionDTO(BaseModel):
     user_id: uuid.UUID
@@ -74,24 +106,13 @@ class createUserPermissionDTO(BaseModel):
 @router.post("/permissions/new-user-permission/create")
 def create_permission(
     db: DatabaseDependency,
-    auth_context: UserAuthenticationContextDependency,
+    auth_context: PermissionManagerDependency,
     body: createUserPermissionDTO,
 ):
-
-    user = db.query(User).filter(User.id == auth_context.user_id).first()
-    if not user:
-        raise HTTPException(403, detail="not-authorized")
-
-    if not any(
-        permission.permissions.school_permissions.can_manage_permissions is True
-        for permission in user.all_permissions
-    ):
-        raise HTTPException(status_code=403, detail="Permission denied")
-
     associated_user = db.query(User).filter(User.id == body.user_id).first()
     if not associated_user:
         raise HTTPException(404)
-    if user.all_permissions:
+    if associated_user.permissions:
         raise HTTPException(403, detail="update-existing-permissions")
     new_permission = UserPermission(permission_description=body.permission_description)
     db.add(new_permission)
@@ -100,34 +121,27 @@ def create_permission(
     association = UserPermissionAssociation(
         user_id=associated_user.id,
         user_permission_id=new_permission.id,
-        school_id=user.school_id,
+        school_id=auth_context.school_id or raise_exception(),
     )
     db.add(association)
     db.flush()
+    revoke_user_access_tokens(db, body.user_id)
+    publish_permissions_change(db)
     db.commit()
 
+    bump_permissions_version()
+
 
 @router.delete("/permissions/{user_permission_id}/delete")
 def remove_permission(
     db: DatabaseDependency,
-    auth_context: UserAuthenticationContextDependency,
+    auth_context: PermissionManagerDependency,
     user_permission_id: uuid.UUID,
 ):
-
-    user = db.query(User).filter(User.id == auth_context.user_id).first()
-    if not user:
-        raise HTTPException(403, detail="not-authorized")
-
-    if not any(
-        permission.permissions.school_permissions.can_manage_permissions is True
-        for permission in user.all_permissions
-    ):
-        raise HTTPException(status_code=403, detail="Permission denied")
-
     user_permission_association = (
         db.query(UserPermissionAssociation)
         .filter(
-            UserPermissionAssociation.user_id == user.id,
+            UserPermissionAssociation.user_id == auth_context.user_id,
             UserPermissionAssociation.user_permission_id == user_permission_id,
         )
         .first()
@@ -135,6 +149,9 @@ def remove_permission(
     if not user_permission_association:
         raise HTTPException(404)
 
+    # --- read before the associations go
+    holder_ids = get_permission_holder_ids(db, user_permission_id)
+
     db.delete(user_permission_association)
     permission = (
         db.query(UserPermission).filter(UserPermission.id == user_permission_id).first()
@@ -143,4 +160,8 @@ def remove_permission(
         raise HTTPException(404)
     db.delete(permission)
     db.flush()
+    revoke_users_access_tokens(db, {auth_context.user_id, *holder_ids})
+    publish_permissions_change(db)
     db.commit()
+
+    bump_permissions_version()
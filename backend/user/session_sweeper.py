@@ -0,0 +1,54 @@
+import datetime
+import os
+import typing
+from sqlalchemy import CursorResult, delete, select
+
+from backend.database.database import SQLAlchemySessionLocal
+from backend.periodic_tasks import PeriodicTask, register_periodic_task
+from backend.user.user_models import UserSession
+
+SESSION_SWEEP_INTERVAL_SECONDS = float(
+    os.environ.get("SESSION_SWEEP_INTERVAL_SECONDS", "300")
+)
+SESSION_SWEEP_BATCH_SIZE = int(os.environ.get("SESSION_SWEEP_BATCH_SIZE", "1000"))
+
+
+def sweep_expired_sessions(batch_size: int = SESSION_SWEEP_BATCH_SIZE) -> int:
+    """
+    Deletes expired sessions in batches of `batch_size`, one short transaction
+    per batch. SKIP LOCKED lets several workers sweep at the same time.
+    """
+    deleted = 0
+
+    while True:
+        expired_session_ids = (
+            select(UserSession.id)
+            .where(UserSession.expire_at < datetime.datetime.utcnow())
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+            .scalar_subquery()
+        )
+
+        with SQLAlchemySessionLocal() as db:
+            result = typing.cast(
+                CursorResult,
+                db.execute(
+                    delete(UserSession)
+                    .where(UserSession.id.in_(expired_session_ids))
+                    .execution_options(synchronize_session=False)
+                ),
+            )
+            db.commit()
+
+        deleted += result.rowcount
+        if result.rowcount < batch_size:
+            return deleted
+
+
+register_periodic_task(
+    PeriodicTask(
+        name="sweep-expired-sessions",
+        interval_seconds=SESSION_SWEEP_INTERVAL_SECONDS,
+        run=sweep_expired_sessions,
+    )
+)
@@ -1,15 +1,49 @@
 import jwt
+import functools
+import operator
 import os
 import uuid
-from typing import Annotated
-from fastapi import Cookie, Depends, HTTPException
+import datetime
+from typing import Annotated, Optional
+from fastapi import Cookie, Depends, HTTPException, status
 from dataclasses import dataclass
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, joinedload, selectinload
 
 from pydantic import BaseModel
-from backend.database.database import DatabaseDependency
-from backend.user.user_models import UserSession
+from backend.database.async_database import AsyncSQLAlchemySessionLocal
+from backend.database.cache_invalidations import on_cache_invalidation
+from backend.school.school_model import SchoolParent
+from backend.student.student_model import Student
+from backend.user.access_tokens import (
+    REVOKED_SESSIONS_CHANNEL,
+    REVOKED_USERS_CHANNEL,
+    AccessTokenClaims,
+    encode_access_token,
+    parse_access_token_claims,
+    revocation_list,
+)
+from backend.user.permissions.permission_bits import (
+    compile_permission_mask,
+    get_permissions_version,
+    permission_mask,
+)
+from backend.user.user_models import Role, RoleType, User, UserSession
+from backend.ttl_cache import CacheStats, TTLCache
 
 JWT_SECRET_KEY = os.environ["JWT_SECRET_KEY"]
+SESSION_CACHE_MAX_SIZE = int(os.environ.get("SESSION_CACHE_MAX_SIZE", "10000"))
+SESSION_CACHE_TTL_SECONDS = float(os.environ.get("SESSION_CACHE_TTL_SECONDS", "60"))
+
+#
+# --- session_id -> user_id, per process. Other replicas drop a revoked
+# --- session when their cache invalidation poller reads the revocation.
+#
+session_cache: TTLCache[uuid.UUID, uuid.UUID] = TTLCache(
+    max_size=SESSION_CACHE_MAX_SIZE,
+    ttl_seconds=SESSION_CACHE_TTL_SECONDS,
+)
 
 
 class JWTPayload(BaseModel):
@@ -19,11 +53,11 @@ class JWTPayload(BaseModel):
 @dataclass
 class UserAuthenticationContext:
     user_id: uuid.UUID
+    access_token_claims: Optional[AccessTokenClaims] = None
 
 
-def get_user_authentication_context(
+async def get_user_authentication_context(
     user_access_token: Annotated[str, Cookie(include_in_schema=False)],
-    db: DatabaseDependency,
 ):
     try:
         raw_payload = jwt.decode(
@@ -34,13 +68,39 @@ def get_user_authentication_context(
     except jwt.InvalidTokenError:
         raise HTTPException(status_code=401, headers={"X-Authentication-Type": "user"})
 
+    #
+    # --- stateless access tokens are verified without touching the database
+    #
+    if raw_payload.get("typ") == "access":
+        claims = parse_access_token_claims(raw_payload)
+        if claims is None or revocation_list.is_revoked(claims):
+            raise HTTPException(
+                status_code=401, headers={"X-Authentication-Type": "user"}
+            )
+        return UserAuthenticationContext(user_id=claims.sub, access_token_claims=claims)
+
     payload = JWTPayload.model_validate(raw_payload)
 
-    session = db.query(UserSession).filter(UserSession.id == payload.session_id).first()
+    user_id = session_cache.get(payload.session_id)
+    if user_id is not None:
+        return UserAuthenticationContext(user_id=user_id)
+
+    # --- a session of its own, back in the pool before the handler takes one:
+    # --- a request holding one connection while waiting for a second one
+    # --- deadlocks the pool under load
+    async with AsyncSQLAlchemySessionLocal() as db:
+        session = await db.scalar(
+            select(UserSession).where(
+                UserSession.id == payload.session_id,
+                UserSession.expire_at > datetime.datetime.utcnow(),
+            )
+        )
 
     if not session:
         raise HTTPException(status_code=401, headers={"X-Authentication-Type": "user"})
 
+    session_cache.set(payload.session_id, session.user_id, expire_at=session.expire_at)
+
     return UserAuthenticationContext(user_id=session.user_id)
 
 
@@ -50,12 +110,11 @@ UserAuthenticationContextDependency = Annotated[
 ]
 
 
-def get_optional_user_authentication_context(
-    db: DatabaseDependency,
+async def get_optional_user_authentication_context(
     user_access_token: Annotated[str | None, Cookie(include_in_schema=False)] = None,
 ):
     if user_access_token:
-        return get_user_authentication_context(user_access_token, db)
+        return await get_user_authentication_context(user_access_token)
     else:
         return None
 
@@ -64,3 +123,268 @@ OptionalUserAuthenticationContextDependency = Annotated[
     UserAuthenticationContext | None,
     Depends(get_optional_user_authentication_context),
 ]
+
+
+def get_session_id_from_access_token(user_access_token: str) -> Optional[uuid.UUID]:
+    try:
+        raw_payload = jwt.decode(
+            user_access_token,
+            JWT_SECRET_KEY,
+            algorithms=["HS256"],
+        )
+    except jwt.InvalidTokenError:
+        return None
+
+    if raw_payload.get("typ") == "access":
+        claims = parse_access_token_claims(raw_payload)
+        return claims.sid if claims else None
+
+    return JWTPayload.model_validate(raw_payload).session_id
+
+
+def get_session_id_from_session_token(session_token: str) -> Optional[uuid.UUID]:
+    try:
+        raw_payload = jwt.decode(
+            session_token,
+            JWT_SECRET_KEY,
+            algorithms=["HS256"],
+        )
+    except jwt.InvalidTokenError:
+        return None
+
+    if raw_payload.get("typ") == "access":
+        return None
+
+    return JWTPayload.model_validate(raw_payload).session_id
+
+
+def invalidate_cached_session(session_id: uuid.UUID) -> None:
+    session_cache.invalidate(session_id)
+
+
+def invalidate_cached_user_sessions(user_id: uuid.UUID) -> None:
+    session_cache.invalidate_where(
+        lambda _session_id, cached_user_id: cached_user_id == user_id
+    )
+
+
+def _invalidate_published_session(
+    key: Optional[str], published_at: datetime.datetime
+) -> None:
+    invalidate_cached_session(uuid.UUID(key))
+
+
+def _invalidate_published_user_sessions(
+    key: Optional[str], published_at: datetime.datetime
+) -> None:
+    invalidate_cached_user_sessions(uuid.UUID(key))
+
+
+on_cache_invalidation(REVOKED_SESSIONS_CHANNEL, _invalidate_published_session)
+on_cache_invalidation(REVOKED_USERS_CHANNEL, _invalidate_published_user_sessions)
+
+
+def get_session_cache_stats() -> CacheStats:
+    return session_cache.stats()
+
+
+#
+# --- identity snapshot used by controllers instead of loading the User row
+#
+
+
+@dataclass(frozen=True)
+class AuthPrincipal:
+    user_id: uuid.UUID
+    role_types: frozenset[RoleType]
+    school_id: Optional[uuid.UUID]
+    teacher_id: Optional[uuid.UUID]
+    student_id: Optional[uuid.UUID]
+    parent_id: Optional[uuid.UUID]
+    permission_mask: int
+    permissions_version: int
+
+    def has_role_type(self, role_type: RoleType) -> bool:
+        return role_type in self.role_types
+
+    def has_permission(self, permission: str) -> bool:
+        required_mask = permission_mask(permission)
+        return self.permission_mask & required_mask == required_mask
+
+
+AUTH_PRINCIPAL_CACHE_MAX_SIZE = int(
+    os.environ.get("AUTH_PRINCIPAL_CACHE_MAX_SIZE", "10000")
+)
+AUTH_PRINCIPAL_CACHE_TTL_SECONDS = float(
+    os.environ.get("AUTH_PRINCIPAL_CACHE_TTL_SECONDS", "30")
+)
+
+principal_cache: TTLCache[uuid.UUID, AuthPrincipal] = TTLCache(
+    max_size=AUTH_PRINCIPAL_CACHE_MAX_SIZE,
+    ttl_seconds=AUTH_PRINCIPAL_CACHE_TTL_SECONDS,
+)
+
+
+def resolve_school_id(user: User) -> Optional[uuid.UUID]:
+    if user.school_user:
+        return user.school_user.id
+
+    if user.teacher_user:
+        return user.teacher_user.school_id
+
+    if user.student_user:
+        return next(
+            (
+                association.school_id
+                for association in user.student_user.school_students_associations
+                if association.is_active
+            ),
+            None,
+        )
+
+    if user.school_parent_user:
+        return next(
+            (
+                association.school_id
+                for association in user.school_parent_user.school_parent_associations
+                if association.is_active
+            ),
+            None,
+        )
+
+    return None
+
+
+# --- collections are selectin loaded so the same options work on AsyncSession
+AUTH_PRINCIPAL_LOAD_OPTIONS = (
+    selectinload(User.roles).selectinload(Role.user_permissions),
+    selectinload(User.permissions),
+    joinedload(User.school_user),
+    joinedload(User.teacher_user),
+    joinedload(User.student_user).selectinload(Student.school_students_associations),
+    joinedload(User.school_parent_user).selectinload(
+        SchoolParent.school_parent_associations
+    ),
+)
+
+
+def build_auth_principal(user: User, permissions_version: int) -> AuthPrincipal:
+    return AuthPrincipal(
+        user_id=user.id,
+        role_types=frozenset(RoleType(role.type) for role in user.roles),
+        school_id=resolve_school_id(user),
+        teacher_id=user.teacher_user.id if user.teacher_user else None,
+        student_id=user.student_user.id if user.student_user else None,
+        parent_id=user.school_parent_user.id if user.school_parent_user else None,
+        permission_mask=functools.reduce(
+            operator.or_,
+            (
+                compile_permission_mask(permission.permission_description)
+                for permission in user.all_permissions
+            ),
+            0,
+        ),
+        permissions_version=permissions_version,
+    )
+
+
+def load_auth_principal(db: Session, user_id: uuid.UUID) -> Optional[AuthPrincipal]:
+    permissions_version = get_permissions_version()
+
+    user = db.scalar(
+        select(User).options(*AUTH_PRINCIPAL_LOAD_OPTIONS).where(User.id == user_id)
+    )
+
+    if not user:
+        return None
+
+    return build_auth_principal(user, permissions_version)
+
+
+async def load_auth_principal_async(
+    db: AsyncSession, user_id: uuid.UUID
+) -> Optional[AuthPrincipal]:
+    permissions_version = get_permissions_version()
+
+    user = await db.scalar(
+        select(User).options(*AUTH_PRINCIPAL_LOAD_OPTIONS).where(User.id == user_id)
+    )
+
+    if not user:
+        return None
+
+    return build_auth_principal(user, permissions_version)
+
+
+def principal_from_access_token_claims(claims: AccessTokenClaims) -> AuthPrincipal:
+    return AuthPrincipal(
+        user_id=claims.sub,
+        role_types=frozenset(claims.roles),
+        school_id=claims.school_id,
+        teacher_id=claims.teacher_id,
+        student_id=claims.student_id,
+        parent_id=claims.parent_id,
+        permission_mask=claims.perm,
+        permissions_version=get_permissions_version(),
+    )
+
+
+def issue_access_token(principal: AuthPrincipal, session_id: uuid.UUID) -> str:
+    return encode_access_token(
+        user_id=principal.user_id,
+        session_id=session_id,
+        school_id=principal.school_id,
+        teacher_id=principal.teacher_id,
+        student_id=principal.student_id,
+        parent_id=principal.parent_id,
+        role_types=principal.role_types,
+        permission_mask=principal.permission_mask,
+    )
+
+
+async def get_auth_principal(
+    auth_context: UserAuthenticationContextDependency,
+) -> AuthPrincipal:
+    if auth_context.access_token_claims:
+        return principal_from_access_token_claims(auth_context.access_token_claims)
+
+    principal = principal_cache.get(auth_context.user_id)
+    if principal is not None and (
+        principal.permissions_version == get_permissions_version()
+    ):
+        return principal
+
+    # --- own session, like the session lookup
+    async with AsyncSQLAlchemySessionLocal() as db:
+        principal = await load_auth_principal_async(db, auth_context.user_id)
+
+    if not principal:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="User not authorized",
+        )
+
+    principal_cache.set(auth_context.user_id, principal)
+
+    return principal
+
+
+AuthPrincipalDependency = Annotated[AuthPrincipal, Depends(get_auth_principal)]
+
+
+def require_permission(*permissions: str):
+    """
+    Dependency factory: resolves the AuthPrincipal and rejects it with 403
+    unless every given permission (e.g. "school_permissions.can_manage_permissions")
+    is granted directly or through one of the user's roles.
+    """
+    required_mask = permission_mask(*permissions)
+
+    def check_permission(auth_context: AuthPrincipalDependency) -> AuthPrincipal:
+        if auth_context.permission_mask & required_mask != required_mask:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN, detail="Permission denied"
+            )
+        return auth_context
+
+    return Depends(check_permission)
@@ -20,10 +20,27 @@ from backend.user.user_models import (
 )
 from pydantic import BaseModel, StringConstraints, EmailStr
 from backend.school.school_model import School
-from fastapi import APIRouter, HTTPException, Response, status
+from fastapi import APIRouter, Cookie, HTTPException, Response, status
 from backend.database.database import DatabaseDependency
-from backend.user.passwords import hash_password, verify_password
-from backend.user.user_authentication import UserAuthenticationContextDependency
+from backend.user.passwords import (
+    hash_password,
+    password_needs_rehash,
+    verify_password,
+)
+from backend.user.access_tokens import (
+    STATELESS_ACCESS_TOKENS,
+    revoke_session_access_tokens,
+    revoke_user_access_tokens,
+)
+from backend.user.user_authentication import (
+    UserAuthenticationContextDependency,
+    get_session_id_from_access_token,
+    get_session_id_from_session_token,
+    invalidate_cached_session,
+    invalidate_cached_user_sessions,
+    issue_access_token,
+    load_auth_principal,
+)
 from backend.file.file_model import File
 
 from backend.s3.aws_s3_service import init_s3_client
@@ -186,6 +203,27 @@ def register(
     return {"message": "school-registered-successfully"}
 
 
+# --- the refresh token is only sent to the refresh and logout endpoints
+REFRESH_TOKEN_PATH = "/auth/user"
+
+
+def set_authentication_cookie(
+    response: Response,
+    key: str,
+    value: str,
+    path: str = "/",
+):
+    response.set_cookie(
+        key=key,
+        value=value,
+        httponly=True,
+        secure=True,  # Allow HTTP for local development
+        samesite="none",  # More permissive for local development
+        expires=60 * 60 * 24 * 365,
+        path=path,
+    )
+
+
 class LoginRequestBody(BaseModel):
     identity: typing.Annotated[
         str, StringConstraints(strip_whitespace=True, min_length=1)
@@ -218,12 +256,8 @@ def login(
             detail="invalid-credentials",
         )
 
-    db.query(UserSession).filter(
-        UserSession.user_id == user.id,
-        UserSession.expire_at < datetime.datetime.now(),
-    ).delete()
-
-    db.flush()
+    if password_needs_rehash(user.password_hash):
+        user.password_hash = hash_password(body.password)
 
     session = UserSession(user_id=user.id)
     db.add(session)
@@ -231,7 +265,7 @@ def login(
 
     # ---
 
-    access_token = jwt.encode(
+    session_token = jwt.encode(
         {
             "session_id": str(session.id),
         },
@@ -239,36 +273,106 @@ def login(
         algorithm="HS256",
     )
 
+    if STATELESS_ACCESS_TOKENS:
+        principal = load_auth_principal(db, user.id) or raise_exception()
+        set_authentication_cookie(
+            response, "user_access_token", issue_access_token(principal, session.id)
+        )
+        set_authentication_cookie(
+            response, "user_refresh_token", session_token, path=REFRESH_TOKEN_PATH
+        )
+    else:
+        set_authentication_cookie(response, "user_access_token", session_token)
+
     db.commit()
-    # # TODO: remove the comments here
-    # response.set_cookie(
-    #     key="user_access_token",
-    #     value=access_token,
-    #     httponly=True,
-    #     secure=True,
-    #     expires=60 * 60 * 24 * 365,
-    #     # samesite="strict",#TODO:TURN back to strict on production
-    #     samesite="none",
-    # )
-    response.set_cookie(
-        key="user_access_token",
-        value=access_token,
-        httponly=True,
-        secure=True,  # Allow HTTP for local development
-        samesite="none",  # More permissive for local development
-        expires=60 * 60 * 24 * 365,
-    )
 
     return {"message": "logged-in-successfully"}
 
 
+@router.post("/auth/user/refresh", status_code=status.HTTP_200_OK)
+def refresh_access_token(
+    response: Response,
+    db: DatabaseDependency,
+    user_refresh_token: typing.Annotated[
+        str | None, Cookie(include_in_schema=False)
+    ] = None,
+):
+    session_id = (
+        get_session_id_from_session_token(user_refresh_token)
+        if user_refresh_token
+        else None
+    )
+
+    if not session_id:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            headers={"X-Authentication-Type": "user"},
+        )
+
+    session = (
+        db.query(UserSession)
+        .filter(
+            UserSession.id == session_id,
+            UserSession.expire_at > datetime.datetime.utcnow(),
+        )
+        .first()
+    )
+
+    if not session:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            headers={"X-Authentication-Type": "user"},
+        )
+
+    principal = load_auth_principal(db, session.user_id)
+
+    if not principal:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            headers={"X-Authentication-Type": "user"},
+        )
+
+    set_authentication_cookie(
+        response, "user_access_token", issue_access_token(principal, session.id)
+    )
+
+    return {"message": "access-token-refreshed"}
+
+
 @router.post("/auth/user/logout", status_code=status.HTTP_204_NO_CONTENT)
 def logout(
     response: Response,
+    db: DatabaseDependency,
+    user_access_token: typing.Annotated[
+        str | None, Cookie(include_in_schema=False)
+    ] = None,
+    user_refresh_token: typing.Annotated[
+        str | None, Cookie(include_in_schema=False)
+    ] = None,
 ):
+    session_id = (
+        get_session_id_from_access_token(user_access_token)
+        if user_access_token
+        else None
+    ) or (
+        get_session_id_from_session_token(user_refresh_token)
+        if user_refresh_token
+        else None
+    )
+
+    if session_id:
+        db.query(UserSession).filter(UserSession.id == session_id).delete()
+        revoke_session_access_tokens(db, session_id)
+        db.commit()
+        invalidate_cached_session(session_id)
+
     response.delete_cookie(
         key="user_access_token",
     )
+    response.delete_cookie(
+        key="user_refresh_token",
+        path=REFRESH_TOKEN_PATH,
+    )
     return {"message": "logged-out-successfully"}
 
 
@@ -276,6 +380,9 @@ def logout_all(
     db: DatabaseDependency,
     user_id: uuid.UUID,
 ):
+    # --- the caller revokes the access tokens in the same transaction and
+    # --- invalidates the cached sessions after committing, or a request in
+    # --- between could cache a deleted session
     db.query(UserSession).filter(
         UserSession.user_id == user_id,
     ).delete()
@@ -354,6 +461,7 @@ def generate_link_to_reset_password_and_send_to_users_email(
     )
 
     email_service.send(email_params)
+    db.commit()
 
     return {}
 
@@ -391,6 +499,7 @@ def generate_link_to_reset_password_and_send_to_authenticated_users_email(
     )
 
     email_service.send(email_params)
+    db.commit()
 
     return {"message": "reset-link-sent-to-your-email"}
 
@@ -432,9 +541,11 @@ def reset_password(
     db.flush()
 
     logout_all(db, user.id)
+    revoke_user_access_tokens(db, user.id)
 
     db.flush()
     db.commit()
+    invalidate_cached_user_sessions(user.id)
     return {"message": "password-reset-successfully"}
 
 
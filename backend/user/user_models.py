@@ -1,6 +1,6 @@
 import datetime
 import pyotp
-from sqlalchemy import String, DateTime, ForeignKey, UUID, func
+from sqlalchemy import String, DateTime, ForeignKey, Index, UUID, func
 from sqlalchemy.orm import relationship, mapped_column, Mapped
 import uuid
 from dateutil.relativedelta import relativedelta
@@ -90,6 +90,13 @@ class UserPermissionAssociation(Base):
         DateTime, onupdate=func.now(), nullable=True
     )
 
+    __table_args__ = (
+        Index(
+            "ix_user_permission_associations_user_permission_id", "user_permission_id"
+        ),
+        Index("ix_user_permission_associations_school_id", "school_id"),
+    )
+
     def __init__(
         self, user_id: uuid.UUID, user_permission_id: uuid.UUID, school_id: uuid.UUID
     ):
@@ -115,6 +122,12 @@ class RolePermissionAssociation(Base):
         DateTime, onupdate=func.now(), nullable=True
     )
 
+    __table_args__ = (
+        Index(
+            "ix_role_permission_associations_user_permission_id", "user_permission_id"
+        ),
+    )
+
     def __init__(self, role_id: uuid.UUID, user_permission_id: uuid.UUID):
         super().__init__()
         self.role_id = role_id
@@ -136,6 +149,11 @@ class UserSession(Base):
     )
     user: Mapped["User"] = relationship("User", back_populates="sessions")
 
+    __table_args__ = (
+        Index("ix_user_sessions_user_id_expire_at", "user_id", "expire_at"),
+        Index("ix_user_sessions_expire_at", "expire_at"),
+    )
+
     def __init__(self, user_id: uuid.UUID):
         super().__init__()
 
@@ -160,6 +178,11 @@ class UserRoleAssociation(Base):
         UUID, ForeignKey("schools.id"), nullable=True
     )
 
+    __table_args__ = (
+        Index("ix_user_role_associations_role_id", "role_id"),
+        Index("ix_user_role_associations_school_id", "school_id"),
+    )
+
     def __init__(self, user_id: uuid.UUID, role_id: uuid.UUID, school_id: uuid.UUID):
         super().__init__()
         self.user_id = user_id
@@ -296,7 +319,7 @@ class User(Base):
         if self.school_user:
             return self.school_user.id
         elif self.teacher_user:
-            return self.teacher_user.school.id
+            return self.teacher_user.school_id
         elif self.student_user:
             if not self.student_user.school_students_associations:
                 raise ValueError(
@@ -343,6 +366,8 @@ class User(Base):
     @property
     def all_permissions(self) -> set[UserPermission]:
         all_permissions = set(self.permissions)
+        for role in self.roles:
+            all_permissions.update(role.user_permissions)
         return all_permissions
 
     def __init__(
@@ -0,0 +1,115 @@
+"""
+Measures requests/second and latency of the hot read endpoints against a
+running server, e.g. one uvicorn worker started with
+
+    uvicorn backend.main:app --workers 1 --port 8080
+
+Reports req/s and p50/p95 latency per endpoint for that worker:
+
+    python dev/benchmarks/endpoint_throughput.py \\
+        --base-url http://localhost:8080 --identity school@app.com --password password123
+"""
+
+import argparse
+import statistics
+import threading
+import time
+import requests
+
+DEFAULT_PATHS = [
+    "/students/by-school-id/list?page=1&limit=20",
+    "/teachers/by-school-id/list?page=1&limit=20",
+    "/attendance/list?page=1&limit=20",
+    "/school/dashboard-resources?filter_type=month",
+]
+# --- a request still waiting on the pool after this counts as an error
+REQUEST_TIMEOUT = 60
+
+
+def login(base_url: str, identity: str, password: str) -> dict[str, str]:
+    response = requests.post(
+        f"{base_url}/auth/user/login",
+        json={"identity": identity, "password": password},
+    )
+    response.raise_for_status()
+    # --- plain dict so the secure cookies are also sent over http://localhost
+    return {cookie.name: cookie.value or "" for cookie in response.cookies}
+
+
+def run_worker(
+    base_url: str,
+    path: str,
+    cookies: dict[str, str],
+    deadline: float,
+    latencies: list[float],
+    errors: list[int],
+):
+    session = requests.Session()
+    session.cookies.update(cookies)
+
+    while time.perf_counter() < deadline:
+        started_at = time.perf_counter()
+        try:
+            response = session.get(f"{base_url}{path}", timeout=REQUEST_TIMEOUT)
+        except requests.Timeout:
+            errors.append(0)
+            continue
+        latencies.append(time.perf_counter() - started_at)
+        if response.status_code != 200:
+            errors.append(response.status_code)
+
+
+def benchmark(
+    base_url: str,
+    path: str,
+    cookies: dict[str, str],
+    concurrency: int,
+    duration: float,
+):
+    latencies: list[float] = []
+    errors: list[int] = []
+    started_at = time.perf_counter()
+    deadline = started_at + duration
+
+    threads = [
+        threading.Thread(
+            target=run_worker,
+            args=(base_url, path, cookies, deadline, latencies, errors),
+        )
+        for _ in range(concurrency)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    # --- the requests in flight at the deadline finish after it
+    elapsed = time.perf_counter() - started_at
+
+    quantiles = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else []
+    p50 = quantiles[49] * 1000 if quantiles else 0
+    p95 = quantiles[94] * 1000 if quantiles else 0
+
+    print(
+        f"{path:<50} {len(latencies) / elapsed:>8.1f} req/s"
+        f"  p50 {p50:>7.1f} ms  p95 {p95:>7.1f} ms  errors {len(errors)}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--base-url", default="http://localhost:8080")
+    parser.add_argument("--identity", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=15)
+    parser.add_argument("--path", action="append", dest="paths")
+    args = parser.parse_args()
+
+    cookies = login(args.base_url, args.identity, args.password)
+
+    for path in args.paths or DEFAULT_PATHS:
+        benchmark(args.base_url, path, cookies, args.concurrency, args.duration)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""
+Checks that the hot filters are served by their indexes. Run it against a
+migrated and seeded database, e.g. after dev/seeds/local_seed.py:
+
+    python dev/explain_hot_paths.py
+
+Exits non-zero when a query's plan does not use the expected index.
+"""
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+import datetime
+import json
+import sys
+import uuid
+from sqlalchemy import text
+
+from backend.database.database import SQLAlchemyEngine
+
+START = datetime.datetime(2024, 1, 1)
+END = datetime.datetime(2024, 12, 31)
+
+# --- (expected index, query, parameters)
+HOT_PATHS = [
+    (
+        "ix_attendances_school_id_date",
+        "SELECT * FROM attendances WHERE school_id = :id AND date BETWEEN :start AND :end",
+        {"start": START, "end": END},
+    ),
+    (
+        "ix_attendances_classroom_id_date",
+        "SELECT * FROM attendances WHERE classroom_id = :id AND date BETWEEN :start AND :end",
+        {"start": START, "end": END},
+    ),
+    (
+        "uq_attendances_student_id_date",
+        "SELECT * FROM attendances WHERE student_id = :id AND date = :start",
+        {"start": START},
+    ),
+    (
+        "ix_exam_results_exam_id_class_room_id",
+        "SELECT * FROM exam_results WHERE exam_id = :id AND class_room_id = :other_id",
+        {},
+    ),
+    (
+        "ix_payments_school_id_date",
+        "SELECT * FROM payments WHERE school_id = :id AND date BETWEEN :start AND :end",
+        {"start": START, "end": END},
+    ),
+    (
+        "ix_time_slots_timetable_id_day_of_week",
+        "SELECT * FROM time_slots WHERE timetable_id = :id AND day_of_week = 'monday'",
+        {},
+    ),
+    (
+        "ix_students_classroom_id",
+        "SELECT * FROM students WHERE classroom_id = :id",
+        {},
+    ),
+    (
+        "ix_user_role_associations_role_id",
+        "SELECT * FROM user_role_associations WHERE role_id = :id",
+        {},
+    ),
+    (
+        "ix_school_student_associations_student_id",
+        "SELECT * FROM school_student_associations WHERE student_id = :id",
+        {},
+    ),
+    (
+        "ix_parent_student_associations_student_id",
+        "SELECT * FROM parent_student_associations WHERE student_id = :id",
+        {},
+    ),
+    (
+        "ix_class_teacher_associations_classroom_id",
+        "SELECT * FROM class_teacher_associations WHERE classroom_id = :id",
+        {},
+    ),
+    (
+        "ix_payment_user_associations_user_id",
+        "SELECT * FROM payment_user_associations WHERE user_id = :id",
+        {},
+    ),
+]
+
+
+def used_indexes(plan: dict) -> set[str]:
+    indexes = {plan["Index Name"]} if "Index Name" in plan else set()
+    for child in plan.get("Plans", []):
+        indexes |= used_indexes(child)
+    return indexes
+
+
+def main():
+    failures = 0
+
+    with SQLAlchemyEngine.connect() as connection:
+        for table in {query.split()[3] for _, query, _ in HOT_PATHS}:
+            connection.execute(text(f"ANALYZE {table}"))
+        # --- a seeded dev database is small enough that a sequential scan is
+        # --- always cheapest, this makes the planner show which index it would use
+        connection.execute(text("SET enable_seqscan = off"))
+
+        for index, query, parameters in HOT_PATHS:
+            plan = connection.execute(
+                text(f"EXPLAIN (FORMAT JSON) {query}"),
+                {"id": uuid.uuid4(), "other_id": uuid.uuid4(), **parameters},
+            ).scalar_one()
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+
+            indexes = used_indexes(plan[0]["Plan"])
+            ok = index in indexes
+            failures += not ok
+            print(f"{'ok  ' if ok else 'FAIL'} {index:<48} {sorted(indexes)}")
+
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -47,6 +47,9 @@ from backend.school.school_model import School, SchoolStudentAssociation
 from backend.exam.exam_model import Exam
 from backend.exam.exam_results.exam_result_model import ExamResult
 from backend.attendance.attendance_models import Attendance, AttendanceStatus
+from backend.attendance.attendance_bitmaps import rebuild_attendance_bitmaps
+from backend.attendance.attendance_rollups import rebuild_attendance_rollups
+from backend.school.school_counters import reconcile_school_counters
 from backend.user.passwords import hash_password
 from backend.database.database import get_db
 from backend.database.database import DATABASE_URL
@@ -791,6 +794,9 @@ with get_db() as db:
                 school_id=sunrise_academy.id,
                 academic_term_id=academic_term.id,
             )
+    rebuild_attendance_rollups(db, school_id=sunrise_academy.id)
+    rebuild_attendance_bitmaps(db, school_id=sunrise_academy.id)
+    reconcile_school_counters(db, sunrise_academy.id)
 
     all_modules = [mathematics_module] + additional_modules
 